@@ -2,11 +2,23 @@
 from __future__ import annotations
 
 from pathlib import Path
+import argparse
+import hashlib
 import json
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor
 
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 import matplotlib as mpl
+mpl.use("Agg")  # headless: Figuren werden nur als PNG geschrieben (auch in Worker-Prozessen)
+import matplotlib.pyplot as plt
+
+from mm_sandbox.dataset import RunDataset, folder_fingerprints
+from mm_sandbox.decimate import decimate_frame
+from mm_sandbox.markout import markouts_from_frames
+from mm_sandbox.store import ExperimentStore
 
 
 # === Project paths ===
@@ -14,6 +26,16 @@ ROOT = Path("results/experiment")
 OUTDIR = ROOT / "final_figures"
 OUTDIR.mkdir(parents=True, exist_ok=True)
 
+# Optional: Runs aus einem Experiment-Store (run_scenarios.py --store) statt aus Run-Ordnern
+STORE: ExperimentStore | None = None
+
+# Alle Runs, einmal geladen (main -> load_dataset); alle Figuren lesen nur noch hieraus
+DATASET: RunDataset | None = None
+
+# Punkte pro gezeichneter Reihe (Min/Max-Bucketing, Extrema bleiben erhalten); 0 = alle Steps
+# ~2x Pixelbreite eines Panels (14in * 180dpi / 2 Spalten)
+MAX_POINTS = 2500
+
 # === Scenario setup ===
 SCENARIOS = ["calm", "turbulent", "uptrend", "downtrend"]
 
@@ -28,28 +50,23 @@ SCENARIO_TITLES = {
 # -----------------------------
 # Helpers: gamma discovery + colors
 # -----------------------------
-def collect_all_gammas() -> list[float]:
-    """Collect all gamma values from results folder names: gamma_<value>."""
-    gammas: set[float] = set()
-    for scenario in SCENARIOS:
-        scenario_dir = ROOT / scenario
-        if not scenario_dir.exists():
-            continue
-        for p in scenario_dir.iterdir():
-            if p.is_dir() and p.name.startswith("gamma_"):
-                try:
-                    gammas.add(float(p.name.replace("gamma_", "")))
-                except ValueError:
-                    continue
-    return sorted(gammas)
+def load_dataset(max_workers: int | None = None) -> RunDataset:
+    """Discover + load every run once (threads for folders), keyed by (scenario, gamma)."""
+    if STORE is not None:
+        return RunDataset.from_store(STORE, SCENARIOS)
+    return RunDataset.from_folder(ROOT, SCENARIOS, max_workers=max_workers)
+
 
+def collect_all_gammas() -> list[float]:
+    """Collect all gamma values of the loaded runs (folder names gamma_<value> or the store)."""
+    return DATASET.gammas()
 
 def build_gamma_color_map(gammas: list[float]) -> dict[float, tuple]:
     """
     Deterministic mapping gamma -> color.
     Uses tab10/tab20; if >20, colors repeat (still deterministic).
     """
-    cmap = mpl.cm.get_cmap("tab10") if len(gammas) <= 10 else mpl.cm.get_cmap("tab20")
+    cmap = mpl.colormaps["tab10"] if len(gammas) <= 10 else mpl.colormaps["tab20"]
     return {g: cmap(i % cmap.N) for i, g in enumerate(gammas)}
 
 
@@ -57,13 +74,13 @@ def build_gamma_color_map(gammas: list[float]) -> dict[float, tuple]:
 # Helpers: read runs + var keys
 # -----------------------------
 def find_var_cols(kpi: dict) -> tuple[str, str]:
-    """Find keys like var_95_inv_* and var_99_inv_* in summary.json dict."""
+    """Find keys like var_95_inv_* and var_99_inv_* in summary.json dict (first = main horizon)."""
     v95 = None
     v99 = None
     for k in kpi.keys():
-        if k.startswith("var_95_inv_"):
+        if v95 is None and k.startswith("var_95_inv_"):
             v95 = k
-        if k.startswith("var_99_inv_"):
+        if v99 is None and k.startswith("var_99_inv_"):
             v99 = k
     if v95 is None or v99 is None:
         raise ValueError("Could not find var_95_inv_* and var_99_inv_* in summary.json")
@@ -81,37 +98,28 @@ def read_all_runs_for_scenario(scenario: str) -> list[dict]:
         "run_dir": Path
       }, ...]
     Folder structure: results/experiment/<scenario>/gamma_<g>/
+    With a store, runs come from the store ("run_dir" is None).
+    Served from the preloaded DATASET (no file access here).
     """
-    scenario_dir = ROOT / scenario
-    if not scenario_dir.exists():
-        return []
-
-    run_dirs = sorted([p for p in scenario_dir.iterdir() if p.is_dir() and p.name.startswith("gamma_")])
-    runs: list[dict] = []
-    for rd in run_dirs:
-        ts_path = rd / "timeseries.csv"
-        kpi_path = rd / "summary.json"
-        trades_path = rd / "trades.csv"
-        if not ts_path.exists() or not kpi_path.exists():
-            continue
+    return DATASET.runs(scenario)
 
-        try:
-            gamma = float(rd.name.replace("gamma_", ""))
-        except ValueError:
-            continue
+# -----------------------------
+# Helpers: scenario params (μ, σ) from config_used.yaml
+# -----------------------------
+def read_mu_sigma(run: dict) -> tuple[float | None, float | None]:
+    """mu/sigma of a run: from the store config if present, else from config_used.yaml."""
+    if run.get("config") is not None:
+        return run["config"].get("mu"), run["config"].get("sigma")
+    return read_mu_sigma_from_config_used(run["run_dir"])
 
-        ts = pd.read_csv(ts_path)
-        trades = pd.read_csv(trades_path) if trades_path.exists() else pd.DataFrame()
-        kpi = json.loads(kpi_path.read_text(encoding="utf-8"))
-        runs.append({"gamma": gamma, "ts": ts, "trades": trades, "kpi": kpi, "run_dir": rd})
 
-    runs.sort(key=lambda x: x["gamma"])
-    return runs
+def read_adverse_horizon(run: dict) -> int | None:
+    """adverse_horizon_steps of a run: from the store config if present, else from config_used.yaml."""
+    if run.get("config") is not None:
+        return run["config"].get("adverse_horizon_steps")
+    return read_adverse_horizon_steps(run["run_dir"])
 
 
-# -----------------------------
-# Helpers: scenario params (μ, σ) from config_used.yaml
-# -----------------------------
 def read_mu_sigma_from_config_used(run_dir: Path) -> tuple[float | None, float | None]:
     """
     Reads mu and sigma from config_used.yaml inside a run folder.
@@ -166,7 +174,7 @@ def scenario_title_with_params(scenario: str) -> str:
     if not runs:
         return base
 
-    mu, sigma = read_mu_sigma_from_config_used(runs[0]["run_dir"])
+    mu, sigma = read_mu_sigma(runs[0])
     if mu is None or sigma is None:
         return base
 
@@ -204,18 +212,7 @@ def add_shared_gamma_legend(fig, gamma_values: list[float], gamma_colors: dict[f
 
 def compute_global_ylim_for_timeseries(col: str) -> tuple[float | None, float | None]:
     """Compute global min/max for a timeseries column across all scenarios and gammas."""
-    y_min, y_max = None, None
-    for scenario in SCENARIOS:
-        runs = read_all_runs_for_scenario(scenario)
-        for run in runs:
-            ts = run["ts"]
-            if col not in ts.columns:
-                continue
-            mn = float(ts[col].min())
-            mx = float(ts[col].max())
-            y_min = mn if y_min is None else min(y_min, mn)
-            y_max = mx if y_max is None else max(y_max, mx)
-
+    y_min, y_max = DATASET.value_range([col], SCENARIOS)
     if y_min is None or y_max is None:
         return None, None
 
@@ -228,21 +225,7 @@ def compute_global_ylim_for_quoting() -> tuple[float | None, float | None]:
     Compute global min/max across r/bid/ask (NOT mid) to align quoting panels.
     Mid is shown separately in its own figure.
     """
-    y_min, y_max = None, None
-    cols = ["r", "bid", "ask"]
-
-    for scenario in SCENARIOS:
-        runs = read_all_runs_for_scenario(scenario)
-        for run in runs:
-            ts = run["ts"]
-            present = [c for c in cols if c in ts.columns]
-            if not present:
-                continue
-            mn = float(ts[present].min().min())
-            mx = float(ts[present].max().max())
-            y_min = mn if y_min is None else min(y_min, mn)
-            y_max = mx if y_max is None else max(y_max, mx)
-
+    y_min, y_max = DATASET.value_range(["r", "bid", "ask"], SCENARIOS)
     if y_min is None or y_max is None:
         return None, None
 
@@ -252,19 +235,8 @@ def compute_global_ylim_for_quoting() -> tuple[float | None, float | None]:
 
 def compute_global_ylim_for_mid_only() -> tuple[float | None, float | None]:
     """Global min/max for mid across scenarios (one gamma run per scenario is enough)."""
-    y_min, y_max = None, None
-    for scenario in SCENARIOS:
-        runs = read_all_runs_for_scenario(scenario)
-        if not runs:
-            continue
-        ts = runs[0]["ts"]  # mid should be same across gammas (seed fixed)
-        if "mid" not in ts.columns:
-            continue
-        mn = float(ts["mid"].min())
-        mx = float(ts["mid"].max())
-        y_min = mn if y_min is None else min(y_min, mn)
-        y_max = mx if y_max is None else max(y_max, mx)
-
+    # mid should be same across gammas (seed fixed)
+    y_min, y_max = DATASET.value_range(["mid"], SCENARIOS, first_run_only=True)
     if y_min is None or y_max is None:
         return None, None
 
@@ -308,37 +280,15 @@ def compute_markouts(
     trades: pd.DataFrame,
     timeseries: pd.DataFrame,
     horizon_steps: int,
-) -> list[float]:
+) -> np.ndarray:
     """
     Markout per trade:
       buy:  mid_{t+h} - price_fill
       sell: price_fill - mid_{t+h}
     Negative => adverse selection.
+    (Trades ohne Future-Mid fallen weg; vektorisiert über mm_sandbox.markout.)
     """
-    if trades.empty:
-        return []
-    if "t" not in trades.columns or "price" not in trades.columns or "side" not in trades.columns:
-        return []
-    if "t" not in timeseries.columns or "mid" not in timeseries.columns:
-        return []
-
-    mids = timeseries.set_index("t")["mid"]
-    future_mid = mids.shift(-horizon_steps)
-    markouts: list[float] = []
-
-    for _, row in trades.iterrows():
-        t = int(row["t"])
-        fm = future_mid.get(t)
-        if pd.isna(fm):
-            continue
-        price = float(row["price"])
-        side = str(row["side"])
-        if side == "buy":
-            markouts.append(float(fm - price))
-        elif side == "sell":
-            markouts.append(float(price - fm))
-
-    return markouts
+    return markouts_from_frames(trades, timeseries, horizons=[horizon_steps]).at(horizon_steps)
 
 # -----------------------------
 # NEW Figure 0: Market price overview (mid only, all scenarios in one chart)
@@ -360,7 +310,8 @@ def plot_market_price_overview() -> None:
             continue
 
         label = scenario_title_with_params(scenario)
-        ax.plot(ts["t"], ts["mid"], linewidth=1.6, label=label)
+        d = decimate_frame(ts, ["mid"], MAX_POINTS)
+        ax.plot(d["t"], d["mid"], linewidth=1.6, label=label)
 
     ax.set_title("Mid (Marktpreis) je Marktsituation")
     ax.set_xlabel("Zeit (Schritte)")
@@ -387,7 +338,7 @@ def plot_markout_distributions(gamma_values: list[float], gamma_colors: dict[flo
             ax.set_axis_off()
             continue
 
-        horizon_steps = read_adverse_horizon_steps(runs[0]["run_dir"])
+        horizon_steps = read_adverse_horizon(runs[0])
         horizon_suffix = f"h={horizon_steps} Schritte" if horizon_steps else "h=unbekannt"
 
         gammas = [r["gamma"] for r in runs]
@@ -437,9 +388,11 @@ def plot_quoting(gamma_values: list[float], gamma_colors: dict[float, tuple]) ->
             g = run["gamma"]
             ts = run["ts"]
             if "r" in ts.columns:
-                ax.plot(ts["t"], ts["r"], linewidth=1.1, color=gamma_colors[g])
+                d = decimate_frame(ts, ["r"], MAX_POINTS)
+                ax.plot(d["t"], d["r"], linewidth=1.1, color=gamma_colors[g])
             if {"bid", "ask"}.issubset(ts.columns):
-                ax.fill_between(ts["t"], ts["bid"], ts["ask"], alpha=0.10, color=gamma_colors[g])
+                d = decimate_frame(ts, ["bid", "ask"], MAX_POINTS)
+                ax.fill_between(d["t"], d["bid"], d["ask"], alpha=0.10, color=gamma_colors[g])
 
         ax.set_title(scenario_title_with_params(scenario))
         ax.set_xlabel("Zeit (Schritte)")
@@ -481,7 +434,8 @@ def plot_timeseries_metric(
             ts = run["ts"]
             if col not in ts.columns:
                 continue
-            ax.plot(ts["t"], ts[col], linewidth=1.1, color=gamma_colors[g])
+            d = decimate_frame(ts, [col], MAX_POINTS)
+            ax.plot(d["t"], d[col], linewidth=1.1, color=gamma_colors[g])
 
         ax.set_title(scenario_title_with_params(scenario))
         ax.set_xlabel("Zeit (Schritte)")
@@ -555,46 +509,175 @@ def plot_var_bars(gamma_values: list[float], gamma_colors: dict[float, tuple]) -
     plt.close(fig)
 
 
-def main():
-    gamma_values = collect_all_gammas()
-    if not gamma_values:
-        raise RuntimeError("No gamma folders found under results/experiment/<scenario>/gamma_<...>.")
+# -----------------------------
+# Rendering: Figuren-Registry, Manifest, Process-Pool
+# -----------------------------
+# Figur -> (Dateiname, Run-Inputs, von denen sie abhängt)
+FIGURES = {
+    "mid_overview": ("00_mid_overview.png", ("config", "timeseries")),
+    "quoting": ("01_quoting_2x2.png", ("config", "timeseries")),
+    "pnl": ("02_pnl_2x2.png", ("config", "timeseries")),
+    "inventory": ("03_inventory_2x2.png", ("config", "timeseries")),
+    "var_bars": ("04_var_bars_2x2.png", ("config", "kpi")),
+    "markout": ("05_markout_boxplot_2x2.png", ("config", "timeseries", "trades")),
+}
+MANIFEST_NAME = "manifest.json"
+
 
+def render_figure(name: str) -> str:
+    """Render one figure from the loaded DATASET; returns the written file name."""
+    gamma_values = collect_all_gammas()
     gamma_colors = build_gamma_color_map(gamma_values)
 
-    # NEW: Mid overview figure
-    plot_market_price_overview()
+    if name == "mid_overview":
+        # NEW: Mid overview figure
+        plot_market_price_overview()
+    elif name == "quoting":
+        # 1) Quoting (without mid)
+        plot_quoting(gamma_values, gamma_colors)
+    elif name == "pnl":
+        # 2) PnL
+        plot_timeseries_metric(
+            fig_title="2) Gewinn (PnL) über Zeit — Vergleich aller γ je Marktsituation",
+            col="pnl",
+            y_label="Mark-to-Market PnL",
+            outname="02_pnl_2x2.png",
+            gamma_values=gamma_values,
+            gamma_colors=gamma_colors,
+        )
+    elif name == "inventory":
+        # 3) Inventory
+        plot_timeseries_metric(
+            fig_title="3) Bestand (Inventory) über Zeit — Vergleich aller γ je Marktsituation",
+            col="inventory",
+            y_label="Inventory (Bestand q)",
+            outname="03_inventory_2x2.png",
+            gamma_values=gamma_values,
+            gamma_colors=gamma_colors,
+        )
+    elif name == "var_bars":
+        # 4) VaR bars
+        plot_var_bars(gamma_values, gamma_colors)
+    elif name == "markout":
+        # 5) Markout distributions
+        plot_markout_distributions(gamma_values, gamma_colors)
+    else:
+        raise ValueError(f"unknown figure: {name}")
+    return FIGURES[name][0]
+
+
+def figure_input_hashes(fingerprints: dict) -> dict[str, str]:
+    """
+    Hash pro Figur über alles, was sie beeinflusst: Inhalts-Hashes der benötigten Run-Inputs
+    (aller Szenarien, da Achsenlimits global sind), gamma-Set, Plot-Parameter und dieses Skript.
+    """
+    code = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()
+    out = {}
+    for name, (_, deps) in FIGURES.items():
+        payload = {
+            "figure": name,
+            "code": code,
+            "max_points": MAX_POINTS,
+            "scenarios": SCENARIOS,
+            "runs": [[sc, g, [fp.get(d, "") for d in deps]] for (sc, g), fp in sorted(fingerprints.items())],
+        }
+        out[name] = hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+    return out
+
+
+def read_manifest() -> dict:
+    p = OUTDIR / MANIFEST_NAME
+    if not p.exists():
+        return {}
+    try:
+        return json.loads(p.read_text(encoding="utf-8")).get("figures", {})
+    except (json.JSONDecodeError, AttributeError):
+        return {}
 
-    # 1) Quoting (without mid)
-    plot_quoting(gamma_values, gamma_colors)
 
-    # 2) PnL
-    plot_timeseries_metric(
-        fig_title="2) Gewinn (PnL) über Zeit — Vergleich aller γ je Marktsituation",
-        col="pnl",
-        y_label="Mark-to-Market PnL",
-        outname="02_pnl_2x2.png",
-        gamma_values=gamma_values,
-        gamma_colors=gamma_colors,
-    )
+def write_manifest(figures: dict) -> None:
+    (OUTDIR / MANIFEST_NAME).write_text(json.dumps({"figures": figures}, indent=2, sort_keys=True), encoding="utf-8")
 
-    # 3) Inventory
-    plot_timeseries_metric(
-        fig_title="3) Bestand (Inventory) über Zeit — Vergleich aller γ je Marktsituation",
-        col="inventory",
-        y_label="Inventory (Bestand q)",
-        outname="03_inventory_2x2.png",
-        gamma_values=gamma_values,
-        gamma_colors=gamma_colors,
-    )
 
-    # 4) VaR bars
-    plot_var_bars(gamma_values, gamma_colors)
+def _init_worker(root: str, store_path: str | None, max_points: int) -> None:
+    """Worker-Setup: Pfade/Parameter setzen; Daten nur laden, falls nicht per fork geerbt."""
+    global ROOT, OUTDIR, STORE, DATASET, MAX_POINTS
+    ROOT = Path(root)
+    OUTDIR = ROOT / "final_figures"
+    MAX_POINTS = max_points
+    if DATASET is None:
+        STORE = ExperimentStore(store_path) if store_path else None
+        DATASET = load_dataset()
 
-    # 5) Markout distributions
-    plot_markout_distributions(gamma_values, gamma_colors)
 
-    print("Wrote figures to:", OUTDIR)
+def main():
+    global ROOT, OUTDIR, STORE, DATASET, MAX_POINTS
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--root", default=str(ROOT), help="Experiment-Ordner (Run-Ordner + final_figures)")
+    ap.add_argument("--store", default=None, help="Experiment-Store (SQLite) statt Run-Ordnern lesen")
+    ap.add_argument("--load_workers", type=int, default=None, help="Threads zum Laden der Run-Ordner")
+    ap.add_argument(
+        "--max_points",
+        type=int,
+        default=MAX_POINTS,
+        help="Punkte pro Zeitreihe im Plot (Min/Max-Decimation, Extrema bleiben sichtbar); 0 = alle Steps",
+    )
+    ap.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Prozesse zum Rendern (Default: eine pro veralteter Figur, max. CPU-Anzahl; 1 = seriell)",
+    )
+    ap.add_argument("--force", action="store_true", help="Alle Figuren neu rendern (Manifest ignorieren)")
+    args = ap.parse_args()
+
+    ROOT = Path(args.root)
+    MAX_POINTS = args.max_points
+    OUTDIR = ROOT / "final_figures"
+    OUTDIR.mkdir(parents=True, exist_ok=True)
+    if args.store:
+        STORE = ExperimentStore(args.store)
+
+    # 1) Inhalts-Hashes der Runs (ohne Parsen) -> welche Figuren sind veraltet?
+    fingerprints = STORE.fingerprints() if STORE is not None else folder_fingerprints(ROOT, SCENARIOS)
+    fingerprints = {key: fp for key, fp in fingerprints.items() if key[0] in SCENARIOS}
+    if not fingerprints:
+        raise RuntimeError("No gamma folders found under results/experiment/<scenario>/gamma_<...>.")
+
+    hashes = figure_input_hashes(fingerprints)
+    manifest = read_manifest()
+    stale = [
+        name for name, (outname, _) in FIGURES.items()
+        if args.force or manifest.get(name, {}).get("inputs") != hashes[name] or not (OUTDIR / outname).exists()
+    ]
+    if not stale:
+        print("All figures up to date:", OUTDIR)
+        return
+
+    # 2) Jeder Run wird genau einmal gelesen; Figuren + Achsenlimits arbeiten auf dem Cache
+    DATASET = load_dataset(args.load_workers)
+
+    # 3) Veraltete Figuren rendern (Process-Pool; per fork erben Worker DATASET ohne Kopie)
+    workers = args.workers or min(len(stale), os.cpu_count() or 1)
+    if workers > 1 and len(stale) > 1:
+        ctx = mp.get_context("fork") if "fork" in mp.get_all_start_methods() else None
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=ctx,
+            initializer=_init_worker,
+            initargs=(str(ROOT), args.store, MAX_POINTS),
+        ) as ex:
+            list(ex.map(render_figure, stale))
+    else:
+        for name in stale:
+            render_figure(name)
+
+    for name in stale:
+        manifest[name] = {"file": FIGURES[name][0], "inputs": hashes[name]}
+    write_manifest(manifest)
+
+    print(f"Wrote {len(stale)}/{len(FIGURES)} figures to:", OUTDIR)
 
 
 if __name__ == "__main__":
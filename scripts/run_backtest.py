@@ -1,48 +1,175 @@
 import argparse
+import time
+from pathlib import Path
 
-from mm_sandbox.io import load_config, write_outputs
-from mm_sandbox.simulator import run_simulation
-from mm_sandbox.metrics import compute_kpis, compute_var_inventory_horizon
+from mm_sandbox.io import load_config, write_config, write_outputs, write_summary
+from mm_sandbox.simulator import run_simulation, run_simulation_streaming
+from mm_sandbox.sinks import CsvSink
+from mm_sandbox.online_metrics import OnlineKpis
+from mm_sandbox.profiling import PROFILE_MODES, profile_run
+from mm_sandbox.metrics import compute_kpis, compute_var_es, kpi_timeseries, var_es_kpis
+from mm_sandbox.tape import MidTape
+from mm_sandbox.telemetry import replay_telemetry, reset_peak_rss, run_telemetry
 
 
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--config", required=True)
     ap.add_argument("--outdir", default="results/run_001")
+    ap.add_argument("--format", choices=["csv", "npz", "parquet"], default="csv", help="Format für timeseries/trades")
+    ap.add_argument("--float32", action="store_true", help="float-Spalten als float32 speichern")
+    ap.add_argument("--stream", action="store_true", help="Blockweise simulieren (konstanter Speicher, für sehr lange Runs)")
+    ap.add_argument("--chunk_size", type=int, default=100_000, help="Steps pro Block im --stream Modus")
+    ap.add_argument("--no_timeseries", action="store_true", help="Im --stream Modus keine CSVs schreiben, nur KPIs")
+    ap.add_argument(
+        "--profile",
+        choices=PROFILE_MODES,
+        default=None,
+        help="Run profilieren (cProfile, tracemalloc oder gesampelte Zeilen); Ausgabe in <outdir>/profile/",
+    )
+    ap.add_argument(
+        "--replay",
+        default=None,
+        help="Mid-Tape statt Random Walk (.npy/.bin/.parquet/npz-Chunks); n_steps = Tape-Länge, T = n_steps*dt",
+    )
+    ap.add_argument("--replay_column", default="mid", help="Spalte/Array mit den Mids (parquet/npz)")
+    ap.add_argument("--ticks", type=int, default=None, help="Nur die ersten N Ticks des Tapes abspielen")
     args = ap.parse_args()
 
     cfg = load_config(args.config)
-    res = run_simulation(cfg)
+    if args.replay:
+        cfg = replay_config(cfg, args.replay, column=args.replay_column, ticks=args.ticks)
+        print(f"Replay {args.replay}: {cfg.n_steps:,} ticks, T={cfg.T_seconds:g}s")
+    with profile_run(args.profile, Path(args.outdir) / "profile") as prof:
+        if args.stream:
+            run_streaming(cfg, args.outdir, args.chunk_size, write_files=not args.no_timeseries)
+        else:
+            run_in_memory(cfg, args.outdir, fmt=args.format, float32=args.float32)
+
+    if prof:
+        hot = prof["hot_path"]
+        print(
+            f"Profile ({args.profile}) written to {Path(args.outdir) / 'profile'}: "
+            f"quote {hot['quote_s']:.3f}s, fill {hot['fill_s']:.3f}s, book {hot['book_s']:.3f}s"
+        )
+
+
+def replay_config(cfg, path: str, *, column: str = "mid", ticks: int | None = None):
+    """Config für einen Replay-Run: n_steps aus dem Tape (bzw. ticks), Session-Horizont T = n_steps*dt."""
+    n_ticks = len(MidTape(path, column=column))
+    n_steps = n_ticks if ticks is None else min(ticks, n_ticks)
+    return cfg.model_copy(
+        update={
+            "replay_path": str(path),
+            "replay_column": column,
+            "n_steps": n_steps,
+            "T_seconds": n_steps * cfg.dt_seconds,
+        }
+    )
+
+
+def run_in_memory(cfg, outdir, *, fmt: str = "csv", float32: bool = False) -> dict:
+    """Run komplett im Speicher: Simulation, KPIs + VaR/ES, Outputs + Telemetrie."""
+    reset_peak_rss()
+    timings: dict = {}
+    res = run_simulation(cfg, timings=timings)
 
     ts = res["timeseries"]
     trades = res["trades"]
 
+    t0 = time.perf_counter()
+    # volle Auflösung für KPIs/VaR, auch bei recording="decimated"/"kpi_only"
+    ts_kpi = kpi_timeseries(res)
+
     # 1) Deine bestehenden KPIs (inkl. adverse selection etc.)
     horizon_steps = getattr(cfg, "adverse_horizon_steps", 10)
     kpis = compute_kpis(
-        timeseries=ts,
+        timeseries=ts_kpi,
         trades=trades,
         final_pnl=res["final_pnl"],
         final_inventory=res["final_inventory"],
         horizon_steps=horizon_steps,
     )
 
-    # 2) VaR(60s) 95% und 99% ergänzen
+    # 2) VaR + Expected Shortfall (95%/99%) ergänzen
+    #    Haupt-Horizont var_horizon_seconds + optional weitere Haltedauern (risk_horizons_seconds)
     var_horizon_seconds = getattr(cfg, "var_horizon_seconds", 60)
     var_levels = getattr(cfg, "var_levels", (0.95, 0.99))
-    kpis.update(
-        compute_var_inventory_horizon(
-            ts=ts,
-            horizon_seconds=var_horizon_seconds,
-            dt_seconds=cfg.dt_seconds,
-            levels=var_levels,
-        )
+    horizons = [var_horizon_seconds] + [h for h in getattr(cfg, "risk_horizons_seconds", []) if h != var_horizon_seconds]
+    risk = compute_var_es(
+        mid=ts_kpi["mid"].to_numpy(dtype=float),
+        inventory=ts_kpi["inventory"].to_numpy(dtype=float),
+        horizons_seconds=horizons,
+        dt_seconds=cfg.dt_seconds,
+        levels=var_levels,
     )
+    kpis.update(var_es_kpis(risk))
+    kpi_s = time.perf_counter() - t0
 
-    write_outputs(args.outdir, cfg, ts, trades, kpis)
+    t0 = time.perf_counter()
+    write_outputs(outdir, cfg, ts, trades, None, fmt=fmt, float32=float32)
+    telemetry = run_telemetry(
+        n_steps=cfg.n_steps,
+        n_trades=len(trades),
+        timings=timings,
+        kpi_s=kpi_s,
+        write_s=time.perf_counter() - t0,
+    )
+    _add_replay_telemetry(cfg, telemetry, timings)
+    write_summary(outdir, {**kpis, "telemetry": telemetry})
 
     print("Run complete.")
     print(kpis)
+    _print_throughput(telemetry)
+    return kpis
+
+
+def run_streaming(cfg, outdir, chunk_size: int, write_files: bool = True) -> dict:
+    """
+    Streaming-Run: Blöcke gehen direkt an CSV-Writer und Online-KPIs, nichts wächst mit n_steps.
+    KPIs wie im In-Memory-Pfad; VaR kommt aus einem Quantil-Sketch (Fehlerschranke in OnlineKpis).
+    """
+    online = OnlineKpis.from_config(cfg)
+    sinks = [online]
+    if write_files:
+        sinks.append(CsvSink(outdir))
+
+    reset_peak_rss()
+    timings: dict = {}
+    res = run_simulation_streaming(cfg, sinks, chunk_size=chunk_size, timings=timings)
+
+    t0 = time.perf_counter()
+    kpis = online.result()
+    kpi_s = timings.get("sink:OnlineKpis", 0.0) + time.perf_counter() - t0
+
+    # Telemetrie: Phasen über alle Blöcke summiert; Schreiben = CsvSink
+    write_config(outdir, cfg)
+    telemetry = run_telemetry(
+        n_steps=cfg.n_steps,
+        n_trades=res["n_trades"],
+        timings=timings,
+        kpi_s=kpi_s,
+        write_s=timings.get("sink:CsvSink"),
+    )
+    _add_replay_telemetry(cfg, telemetry, timings)
+    write_summary(outdir, {**kpis, "telemetry": telemetry})
+
+    print("Run complete (stream).")
+    print(kpis)
+    _print_throughput(telemetry)
+    return kpis
+
+
+def _add_replay_telemetry(cfg, telemetry: dict, timings: dict) -> None:
+    if cfg.replay_path is not None:
+        telemetry["replay"] = replay_telemetry(n_ticks=cfg.n_steps, timings=timings)
+
+
+def _print_throughput(telemetry: dict) -> None:
+    print(f"{telemetry['steps_per_sec']:,.0f} steps/s, {telemetry['fills_per_sec']:,.0f} fills/s")
+    if "replay" in telemetry:
+        replay = telemetry["replay"]
+        print(f"Replay: {replay['ticks_per_sec']:,.0f} ticks/s (Tape lesen {replay['read_s']:.3f}s)")
 
 
 if __name__ == "__main__":
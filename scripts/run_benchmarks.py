@@ -0,0 +1,313 @@
+"""
+run_benchmarks.py
+
+Ziel:
+- Laufzeiten der Hot Paths messen (Preisprozess, Simulations-Loop, Quote-Funktion,
+  KPIs, VaR, Output-Schreiben) über eine Leiter von n_steps bzw. Trade-Anzahlen.
+- Ergebnisse als JSON-Baseline speichern (--save) und spätere Läufe dagegen prüfen:
+  Exit-Code 1, wenn ein Fall um mehr als --threshold langsamer ist als die Baseline.
+- --latency: Latenz pro Quote (p50/p99 in ns) von make_quote_as vs. QuoteEngine.
+
+Beispiele:
+    python scripts/run_benchmarks.py --save                 # Baseline anlegen/überschreiben
+    python scripts/run_benchmarks.py                        # gegen Baseline prüfen
+    python scripts/run_benchmarks.py --quick --threshold 1.5
+    python scripts/run_benchmarks.py --latency              # ns pro Quote, p50/p99
+
+Baselines sind maschinenabhängig: immer auf derselben Maschine erzeugen und vergleichen.
+benchmarks/baseline.json ist deshalb lokal und nicht versioniert (.gitignore); ohne Baseline
+bricht der Vergleich mit einem Hinweis ab -> auf der eigenen Maschine zuerst --save laufen lassen.
+Die JSON enthält unter "environment" Python-/numpy-/pandas-Version und Plattform des Laufs.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from mm_sandbox.config import MMConfig
+from mm_sandbox.io import write_outputs
+from mm_sandbox.metrics import compute_kpis, compute_var_inventory_horizon
+from mm_sandbox.price_process import simulate_rw_paper
+from mm_sandbox.simulator import run_simulation
+from mm_sandbox.strategy import QuoteEngine, make_quote_as
+
+LADDER = [1_000, 10_000, 100_000]
+QUICK_LADDER = [1_000, 10_000]
+TRADE_LADDER = [100, 1_000, 10_000]
+QUICK_TRADE_LADDER = [100, 1_000]
+# gammas des Szenario-Sweeps in run_scenarios.py
+SWEEP_GAMMAS = [0.001, 0.01, 0.05, 0.1, 0.3]
+
+
+def bench_config(n_steps: int) -> MMConfig:
+    """Paper-Setup mit T=1s, dt = T / n_steps (mehr Steps = feinere Zeitauflösung)."""
+    return MMConfig(
+        seed=42, dt_seconds=1.0 / n_steps, n_steps=n_steps, T_seconds=1.0, trade_size=1.0,
+        s0=100.0, mu=0.0, sigma=2.0, gamma=0.1, A=140.0, k=1.5, fee_bps=0.0,
+        adverse_horizon_steps=10, var_horizon_seconds=0.05,
+    )
+
+
+def synthetic_run(n_steps: int, n_trades: int, seed: int = 0) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Timeseries + Trades mit fester Trade-Anzahl (unabhängig von der Fill-Intensität)."""
+    rng = np.random.default_rng(seed)
+    mid = 100.0 + np.cumsum(rng.choice([-0.01, 0.01], n_steps))
+    ts = pd.DataFrame(
+        {
+            "t": np.arange(n_steps),
+            "mid": mid,
+            "r": mid,
+            "bid": mid - 0.5,
+            "ask": mid + 0.5,
+            "half_spread": np.full(n_steps, 0.5),
+            "inventory": np.cumsum(rng.choice([-1.0, 0.0, 1.0], n_steps)),
+            "pnl": np.cumsum(rng.normal(0.0, 0.01, n_steps)),
+        }
+    )
+    t = np.sort(rng.choice(n_steps, min(n_trades, n_steps), replace=False))
+    trades = pd.DataFrame(
+        {
+            "t": t,
+            "side": rng.choice(["buy", "sell"], t.size).astype(object),
+            "price": mid[t],
+            "size": np.ones(t.size),
+            "mid": mid[t],
+        }
+    )
+    return ts, trades
+
+
+def build_cases(ladder: list[int], trade_ladder: list[int], tmpdir: Path) -> dict[str, Callable[[], object]]:
+    """Name -> parameterlose Funktion. Setup (Configs, Daten) passiert hier, nicht in der Messung."""
+    cases: dict[str, Callable[[], object]] = {}
+
+    for n in ladder:
+        cfg = bench_config(n)
+        cases[f"simulate_rw_paper[n_steps={n}]"] = lambda cfg=cfg: simulate_rw_paper(
+            s0=cfg.s0, mu=cfg.mu, sigma=cfg.sigma, dt=cfg.dt_seconds, n_steps=cfg.n_steps,
+            rng=np.random.default_rng(cfg.seed),
+        )
+        cases[f"run_simulation[n_steps={n}]"] = lambda cfg=cfg: run_simulation(cfg)
+
+        # Gamma-Sweep (ein Mid-Pfad für alle gammas) vs. ein Run pro gamma; siehe sweep_speedups
+        cases[f"gamma_sweep[n_steps={n}]"] = lambda cfg=cfg: run_simulation(cfg, gammas=SWEEP_GAMMAS)
+        cases[f"separate_runs[n_steps={n}]"] = lambda cfg=cfg: [
+            run_simulation(cfg.model_copy(update={"gamma": g})) for g in SWEEP_GAMMAS
+        ]
+
+        # n Aufrufe, wie im Loop (ein Quote pro Step)
+        def quotes(n=n):
+            for i in range(n):
+                make_quote_as(mid=100.0, sigma=2.0, inventory=float(i % 7 - 3), gamma=0.1, k=1.5, tau_seconds=0.5)
+        cases[f"make_quote_as[calls={n}]"] = quotes
+
+        # dasselbe mit QuoteEngine + tau-Tabelle (wie im Simulations-Loop)
+        def engine_quotes(n=n):
+            engine = QuoteEngine(sigma=2.0, gamma=0.1, k=1.5)
+            engine.set_tau_grid(T_seconds=1.0, dt_seconds=1.0 / n, n_steps=n)
+            for i in range(n):
+                engine.quote_step(100.0, float(i % 7 - 3), i)
+        cases[f"quote_engine[calls={n}]"] = engine_quotes
+
+        ts, trades = synthetic_run(n, n // 100)
+        cases[f"compute_var_inventory_horizon[n_steps={n}]"] = lambda ts=ts: compute_var_inventory_horizon(
+            ts=ts, horizon_seconds=0.05, dt_seconds=0.005
+        )
+        for fmt in ("csv", "npz"):
+            cases[f"write_outputs[fmt={fmt},n_steps={n}]"] = lambda ts=ts, trades=trades, cfg=cfg, fmt=fmt: write_outputs(
+                tmpdir / fmt, cfg, ts, trades, {}, fmt=fmt
+            )
+
+    n_steps = max(ladder)
+    for n_trades in trade_ladder:
+        ts, trades = synthetic_run(n_steps, n_trades)
+        cases[f"compute_kpis[n_steps={n_steps},n_trades={n_trades}]"] = lambda ts=ts, trades=trades: compute_kpis(
+            timeseries=ts, trades=trades, final_pnl=0.0, final_inventory=0.0, horizon_steps=10
+        )
+    return cases
+
+
+def time_case(fn: Callable[[], object], repeat: int, min_time: float) -> dict:
+    """repeat Messungen (mindestens min_time Sekunden insgesamt); Sekunden pro Aufruf."""
+    fn()  # Warm-up (Imports, Caches, Allokationen)
+    samples: list[float] = []
+    start = time.perf_counter()
+    while len(samples) < repeat or (time.perf_counter() - start < min_time and len(samples) < 100):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return {"median_s": statistics.median(samples), "min_s": min(samples), "n": len(samples)}
+
+
+def quote_latency(n_calls: int = 200_000, n_steps: int = 10_000) -> dict:
+    """
+    Latenz pro Quote in ns (p50/p99, min/max) über n_calls einzeln getimte Aufrufe
+    (perf_counter_ns), Eingaben wie im Loop: tau vom Session-Raster, wechselndes Inventory.
+
+      make_quote_as       : bisherige Funktion inkl. tau = max(T - t*dt, 0) beim Aufrufer
+      QuoteEngine.quote   : vorberechnete Terme, tau vom Aufrufer
+      QuoteEngine.quote_step: vorberechnete Terme + tau-Tabelle (set_tau_grid)
+
+    Der Mess-Overhead (Timer-Paar + Aufruf der Mess-Closure, Median eines leeren Aufrufs)
+    ist abgezogen.
+    """
+    T, dt = 1.0, 1.0 / n_steps
+    steps = [i % n_steps for i in range(n_calls)]
+    inventory = [float(i % 7 - 3) for i in range(n_calls)]
+    engine = QuoteEngine(sigma=2.0, gamma=0.1, k=1.5)
+    engine.set_tau_grid(T_seconds=T, dt_seconds=dt, n_steps=n_steps)
+    quote, quote_step = engine.quote, engine.quote_step
+
+    def with_function(i):
+        make_quote_as(
+            mid=100.0, sigma=2.0, inventory=inventory[i], gamma=0.1, k=1.5,
+            tau_seconds=max(T - steps[i] * dt, 0.0),
+        )
+
+    variants = {
+        "make_quote_as": with_function,
+        "QuoteEngine.quote": lambda i: quote(100.0, inventory[i], max(T - steps[i] * dt, 0.0)),
+        "QuoteEngine.quote_step": lambda i: quote_step(100.0, inventory[i], steps[i]),
+    }
+    overhead = statistics.median(_time_calls(lambda i: None, n_calls))
+
+    out = {}
+    for name, fn in variants.items():
+        samples = np.array(_time_calls(fn, n_calls), dtype=float) - overhead
+        out[name] = {
+            "p50_ns": float(np.percentile(samples, 50)),
+            "p99_ns": float(np.percentile(samples, 99)),
+            "min_ns": float(samples.min()),
+            "max_ns": float(samples.max()),
+        }
+    return {"n_calls": n_calls, "overhead_ns": overhead, "results": out}
+
+
+def _time_calls(fn: Callable[[int], object], n_calls: int) -> list[int]:
+    clock = time.perf_counter_ns
+    for i in range(min(n_calls, 10_000)):  # Warm-up
+        fn(i)
+    samples = [0] * n_calls
+    for i in range(n_calls):
+        t0 = clock()
+        fn(i)
+        samples[i] = clock() - t0
+    return samples
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Fälle, deren Median mehr als threshold-mal langsamer ist als die Baseline."""
+    failures = []
+    for name, res in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        ratio = res["median_s"] / base["median_s"]
+        if ratio > threshold:
+            failures.append(f"{name}: {ratio:.2f}x slower ({base['median_s']:.6f}s -> {res['median_s']:.6f}s)")
+    return failures
+
+
+def sweep_speedups(results: dict) -> dict[str, float]:
+    """separate_runs / gamma_sweep pro n_steps (>= 1: der Sweep ist mindestens so schnell)."""
+    out = {}
+    for name, res in results.items():
+        if name.startswith("gamma_sweep["):
+            separate = results.get(name.replace("gamma_sweep[", "separate_runs[", 1))
+            if separate is not None:
+                out[name] = separate["median_s"] / res["median_s"]
+    return out
+
+
+def environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--baseline", default="benchmarks/baseline.json", help="JSON-Baseline (lesen bzw. mit --save schreiben)")
+    ap.add_argument("--save", action="store_true", help="Ergebnisse als neue Baseline speichern")
+    ap.add_argument("--threshold", type=float, default=1.25, help="max. erlaubter Faktor gegenüber der Baseline")
+    ap.add_argument("--quick", action="store_true", help="kleine Leiter (schnell, z.B. für CI)")
+    ap.add_argument("--repeat", type=int, default=5, help="Messungen pro Fall (Median zählt)")
+    ap.add_argument("--min_time", type=float, default=0.2, help="min. Messzeit pro Fall in Sekunden")
+    ap.add_argument("--filter", default=None, help="nur Fälle, deren Name diesen Text enthält")
+    ap.add_argument("--output", default=None, help="Ergebnisse zusätzlich als JSON schreiben")
+    ap.add_argument("--latency", action="store_true", help="nur Latenz pro Quote messen (p50/p99 ns), keine Baseline")
+    ap.add_argument("--calls", type=int, default=200_000, help="Anzahl getimter Quotes für --latency")
+    args = ap.parse_args()
+
+    if args.latency:
+        report = {"environment": environment(), "latency": quote_latency(args.calls)}
+        print(f"{'quote':<25} {'p50 ns':>8} {'p99 ns':>8}   (n={args.calls}, overhead {report['latency']['overhead_ns']:.0f} ns abgezogen)")
+        for name, res in report["latency"]["results"].items():
+            print(f"{name:<25} {res['p50_ns']:8.0f} {res['p99_ns']:8.0f}")
+        if args.output:
+            Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        return
+
+    ladder = QUICK_LADDER if args.quick else LADDER
+    trade_ladder = QUICK_TRADE_LADDER if args.quick else TRADE_LADDER
+
+    results: dict[str, dict] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        cases = build_cases(ladder, trade_ladder, Path(tmp))
+        for name, fn in cases.items():
+            if args.filter and args.filter not in name:
+                continue
+            results[name] = time_case(fn, args.repeat, args.min_time)
+            print(f"{name:<55} {results[name]['median_s'] * 1e3:10.3f} ms  (n={results[name]['n']})")
+
+    for name, speedup in sweep_speedups(results).items():
+        print(f"{name}: {speedup:.2f}x vs. separate runs")
+
+    report = {"environment": environment(), "results": results}
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    baseline_path = Path(args.baseline)
+    if args.save:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        # bestehende Fälle behalten (z.B. bei --filter oder --quick), gemessene ersetzen
+        old = json.loads(baseline_path.read_text(encoding="utf-8"))["results"] if baseline_path.exists() else {}
+        report["results"] = {**old, **results}
+        baseline_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print("Baseline written:", baseline_path)
+        return
+
+    if not baseline_path.exists():
+        print(f"No baseline at {baseline_path}; run with --save first.")
+        return
+
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    if baseline.get("environment") != report["environment"]:
+        print("Warning: baseline was recorded in a different environment:", baseline.get("environment"))
+
+    failures = compare(results, baseline["results"], args.threshold)
+    if failures:
+        print(f"{len(failures)} benchmark(s) slower than {args.threshold}x baseline:")
+        for line in failures:
+            print("  " + line)
+        sys.exit(1)
+    print(f"All {len(results)} benchmarks within {args.threshold}x of baseline.")
+
+
+if __name__ == "__main__":
+    main()
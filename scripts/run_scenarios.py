@@ -8,59 +8,258 @@ Ziel:
     Szenarien (mu/sigma)  ×  Gamma-Werte
 - Pro Run schreiben wir einen auditierbaren Output-Ordner:
     config_used.yaml, timeseries.csv, trades.csv, summary.json
+  (timeseries/trades optional binär: --format npz|parquet, oder alle Runs in einer
+   Store-Datei: --store results/experiment.sqlite)
+- Runs werden über einen Hash der Config (+ Simulator-Version) gecacht (<outdir>/.cache);
+  unveränderte Zellen werden nicht neu simuliert (--force / --no_cache).
 - Zusätzlich schreiben wir eine zentrale Ergebnis-Tabelle:
     results/.../experiment_summary.csv
+  und daneben die Laufzeit-Telemetrie pro Run (Phasen, Durchsatz, Peak-RSS):
+    results/.../experiment_profile.csv
+- --shared_memory: Mid-Pfad + Fill-Uniforms pro Szenario einmal im Elternprozess erzeugen
+  (multiprocessing.shared_memory); ein Job pro (Szenario, Gamma), Worker rechnen zero-copy
+  auf den geteilten Puffern (gleiche Ergebnisse wie --seed_mode shared).
+- --profile cprofile|tracemalloc|lines profiliert jeden Job (Simulation, KPIs, Schreiben)
+  nach results/.../profiles/<scenario>/<gamma_g | sweep>/ (inkl. Hot-Path-Breakdown).
 """
 
 from __future__ import annotations
 
 import argparse
+import hashlib
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
 from pathlib import Path
 
 import pandas as pd
 
-from mm_sandbox.io import load_config, write_outputs
+from mm_sandbox.cache import ResultCache
+from mm_sandbox.io import load_config, write_outputs, write_summary
+from mm_sandbox.store import ExperimentStore
 from mm_sandbox.simulator import run_simulation
-from mm_sandbox.metrics import compute_kpis, compute_var_inventory_horizon
+from mm_sandbox.metrics import compute_kpis, compute_var_es, kpi_timeseries, var_es_kpis
+from mm_sandbox.profiling import PROFILE_MODES, profile_run
+from mm_sandbox.shm import SharedPaths, run_shared
+from mm_sandbox.telemetry import PROFILE_COLUMNS, reset_peak_rss, run_telemetry
 
 
-def run_one(cfg, outdir: Path) -> dict:
-    """
-    Führt genau einen Simulations-Run aus und schreibt die Outputs in einen Run-Ordner.
-
-    cfg   : MMConfig (pydantic model) – enthält alle Parameter (dt, T, mu, sigma, gamma, A, k, ...)
-    outdir: Zielordner für auditierbare Outputs (pro Run ein eigener Ordner)
-    """
-    # 1) Simulation ausführen (Preisprozess + Quotes + Fills -> Timeseries & Trades)
-    res = run_simulation(cfg)
+def compute_run_kpis(cfg, res: dict) -> dict:
+    """KPIs eines simulierten Runs: PnL, Trades, Inventory, adverse selection proxy, VaR/ES."""
+    # volle Auflösung auch bei recording="decimated"/"kpi_only" (aus Mid-Pfad + Trades)
+    ts = kpi_timeseries(res)
 
     # 2) KPIs berechnen (PnL, Trades, Inventory, adverse selection proxy, ...)
     horizon_steps = getattr(cfg, "adverse_horizon_steps", 10)
     kpis = compute_kpis(
-        timeseries=res["timeseries"],
+        timeseries=ts,
         trades=res["trades"],
         final_pnl=res["final_pnl"],
         final_inventory=res["final_inventory"],
         horizon_steps=horizon_steps,
     )
 
-    # 3) VaR über kurzen Horizont (Inventory-Risk Proxy)
+    # 3) VaR + Expected Shortfall über kurzen Horizont (Inventory-Risk Proxy)
     #    (z.B. 0.05s im Paper-Setup oder 60s in früheren Toy-Setups)
+    #    Haupt-Horizont var_horizon_seconds + optional weitere Haltedauern (risk_horizons_seconds)
     var_horizon_seconds = getattr(cfg, "var_horizon_seconds", 0.05)
     var_levels = getattr(cfg, "var_levels", (0.95, 0.99))
-    kpis.update(
-        compute_var_inventory_horizon(
-            ts=res["timeseries"],
-            horizon_seconds=var_horizon_seconds,
-            dt_seconds=cfg.dt_seconds,
-            levels=var_levels,
-        )
+    horizons = [var_horizon_seconds] + [h for h in getattr(cfg, "risk_horizons_seconds", []) if h != var_horizon_seconds]
+    risk = compute_var_es(
+        mid=ts["mid"].to_numpy(dtype=float),
+        inventory=ts["inventory"].to_numpy(dtype=float),
+        horizons_seconds=horizons,
+        dt_seconds=cfg.dt_seconds,
+        levels=var_levels,
     )
+    kpis.update(var_es_kpis(risk))
+    return kpis
 
-    # 4) Auditierbare Outputs schreiben: Config + Timeseries + Trades + KPI Summary
-    write_outputs(outdir, cfg, res["timeseries"], res["trades"], kpis)
 
-    return kpis
+def derive_seed(base_seed: int, scenario: str, gamma: float) -> int:
+    """
+    Deterministischer Seed pro Zelle aus dem Key (base_seed, scenario, gamma).
+    Hängt nur vom Key ab – nicht von Job-Reihenfolge, Worker oder Prozess.
+    """
+    key = f"{base_seed}|{scenario}|{gamma!r}".encode("utf-8")
+    return int.from_bytes(hashlib.sha256(key).digest()[:4], "little")
+
+
+def build_jobs(
+    cfg,
+    scenarios: list[dict],
+    gammas: list[float],
+    out_root: Path,
+    seed_mode: str,
+    fmt: str = "csv",
+    float32: bool = False,
+    store: Path | None = None,
+    cache: Path | None = None,
+    cache_max_bytes: int | None = None,
+    force: bool = False,
+    profile: str | None = None,
+    split_gammas: bool = False,
+) -> list[dict]:
+    """
+    Zerlegt das Grid Szenario × Gamma in Jobs.
+
+    seed_mode="shared"  : ein Job pro Szenario mit allen gammas (ein Mid-Pfad, common random numbers)
+    seed_mode="per_cell": ein Job pro (scenario, gamma) mit derive_seed(...)
+    split_gammas        : bei seed_mode="shared" trotzdem ein Job pro (scenario, gamma), gleicher
+                          Seed pro Szenario (für --shared_memory: Pfade kommen aus job["shared"])
+
+    Größere Jobs (~ n_steps × Anzahl gammas) kommen zuerst, damit der Pool am Ende
+    nicht auf einen einzelnen langen Job wartet.
+    """
+    jobs: list[dict] = []
+    for sc in scenarios:
+        # pydantic v2: model_copy(deep=True)
+        # Falls du v1 nutzt: cfg.copy(deep=True)
+        cfg_sc = cfg.model_copy(deep=True)
+
+        # Override der Regime-Parameter
+        cfg_sc.mu = sc["mu"]
+        cfg_sc.sigma = sc["sigma"]
+
+        if seed_mode == "shared" and not split_gammas:
+            jobs.append({"scenario": sc["name"], "cfg": cfg_sc, "gammas": list(gammas)})
+            continue
+        if seed_mode == "shared":
+            jobs.extend({"scenario": sc["name"], "cfg": cfg_sc, "gammas": [g]} for g in gammas)
+            continue
+
+        for g in gammas:
+            cfg_cell = cfg_sc.model_copy(deep=True)
+            cfg_cell.seed = derive_seed(cfg.seed, sc["name"], g)
+            jobs.append({"scenario": sc["name"], "cfg": cfg_cell, "gammas": [g]})
+
+    for job in jobs:
+        job.update(
+            out_root=out_root, fmt=fmt, float32=float32, store=store,
+            cache=cache, cache_max_bytes=cache_max_bytes, force=force, profile=profile,
+            shared=None,
+        )
+
+    # stabile Sortierung: bei gleichen Kosten bleibt die Grid-Reihenfolge erhalten
+    jobs.sort(key=lambda job: job["cfg"].n_steps * len(job["gammas"]), reverse=True)
+    return jobs
+
+
+def run_job(job: dict) -> tuple[list[dict], list[dict]]:
+    """
+    Ein Job: alle gammas des Jobs in einem Simulations-Durchlauf (gleicher Mid-Pfad und
+    gleiche Fill-Uniforms), danach KPIs + Outputs pro Zelle. Top-level, damit der
+    Process-Pool den Job picklen kann.
+
+    Mit Cache werden nur die gammas simuliert, deren Config (+ Simulator-Version) noch
+    nicht im Cache liegt; Treffer übernehmen summary + Tabellen aus dem Cache.
+    Mit job["profile"] wird der ganze Job profiliert (siehe profile_dir).
+
+    Rückgabe: (rows, profile) – pro gamma eine Zeile für experiment_summary.csv
+    und eine für experiment_profile.csv.
+    """
+    with profile_run(job["profile"], profile_dir(job)):
+        return _run_job(job)
+
+
+def profile_dir(job: dict) -> Path:
+    """Profil-Ordner eines Jobs: ein Simulations-Durchlauf = ein Profil (Sweep oder Einzelzelle)."""
+    name = f"gamma_{job['gammas'][0]}" if len(job["gammas"]) == 1 else "sweep"
+    return job["out_root"] / "profiles" / job["scenario"] / name
+
+
+def _run_job(job: dict) -> tuple[list[dict], list[dict]]:
+    cfg_sc = job["cfg"]
+    # Peak-RSS pro Job (Worker laufen Jobs nacheinander), nicht über die Worker-Lebenszeit
+    reset_peak_rss()
+
+    cfg_runs = {}
+    for g in job["gammas"]:
+        cfg_run = cfg_sc.model_copy(deep=True)
+
+        # Override der Forschungsvariable
+        cfg_run.gamma = g
+        cfg_runs[g] = cfg_run
+
+    # Cache-Lookup pro Zelle (Key = vollständig aufgelöste Config)
+    cache = ResultCache(job["cache"], max_bytes=job["cache_max_bytes"]) if job["cache"] is not None else None
+    cached: dict = {}
+    if cache is not None and not job["force"]:
+        for g, cfg_run in cfg_runs.items():
+            hit = cache.get(cfg_run)
+            if hit is not None:
+                cached[g] = hit
+
+    # nur die fehlenden gammas simulieren (gleicher Mid-Pfad wie im vollen Sweep)
+    missing = [g for g in job["gammas"] if g not in cached]
+    timings: dict = {}
+    if not missing:
+        results = {}
+    elif job["shared"] is not None:
+        # Pfade aus dem Shared-Memory-Block des Szenarios (zero-copy), skalarer Loop pro gamma
+        results = {g: run_shared(job["shared"], cfg_runs[g], timings=timings) for g in missing}
+    else:
+        results = dict(zip(missing, run_simulation(cfg_sc, gammas=missing, timings=timings)))
+
+    # Experiment-Store: jeder Worker öffnet eine eigene Verbindung
+    store = ExperimentStore(job["store"]) if job["store"] is not None else None
+
+    rows: list[dict] = []
+    profile: list[dict] = []
+    for g, cfg_run in cfg_runs.items():
+        t0 = time.perf_counter()
+        if g in cached:
+            hit = cached[g]
+            ts, trades, kpis = hit["timeseries"], hit["trades"], hit["summary"]
+            kpi_s = None
+        else:
+            res = results[g]
+            ts, trades = res["timeseries"], res["trades"]
+            kpis = compute_run_kpis(cfg_run, res)
+            kpi_s = time.perf_counter() - t0
+            if cache is not None:
+                cache.put(cfg_run, ts, trades, kpis)
+
+        t0 = time.perf_counter()
+        if store is not None:
+            # ein Datensatz pro Run im Store statt eines Ordners
+            store.put_run(job["scenario"], g, cfg_run, ts, trades, kpis, float32=job["float32"])
+        else:
+            # Output-Ordner pro Run (auditierbar, reproduzierbar)
+            # Beispiel: results/experiment/calm/gamma_0.1/
+            outdir = job["out_root"] / job["scenario"] / f"gamma_{g}"
+            outdir.mkdir(parents=True, exist_ok=True)
+            write_outputs(outdir, cfg_run, ts, trades, None, fmt=job["fmt"], float32=job["float32"])
+        write_s = time.perf_counter() - t0
+
+        # Telemetrie (Phasen-Zeiten, Durchsatz, Peak-RSS) in summary.json, nicht in die KPI-Tabelle
+        telemetry = run_telemetry(
+            n_steps=cfg_run.n_steps,
+            n_trades=len(trades),
+            timings={} if g in cached else timings,
+            batch_size=max(len(missing), 1),
+            kpi_s=kpi_s,
+            write_s=write_s,
+            cache_hit=g in cached,
+        )
+        if store is not None:
+            store.set_summary(job["scenario"], g, {**kpis, "telemetry": telemetry})
+        else:
+            write_summary(outdir, {**kpis, "telemetry": telemetry})
+
+        # Eine Zeile in die zentrale Summary + eine in die Profil-Tabelle
+        rows.append(
+            {
+                "scenario": job["scenario"],
+                "gamma": g,
+                **kpis,
+            }
+        )
+        profile.append({"scenario": job["scenario"], "gamma": g, **telemetry})
+
+    if store is not None:
+        store.close()
+    return rows, profile
 
 
 def main() -> None:
@@ -81,7 +280,76 @@ def main() -> None:
         help="Output root directory (z.B. results/experiment).",
     )
 
+    # Parallelisierung: Jobs (Szenario bzw. Szenario×Gamma) im Process-Pool
+    ap.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Anzahl Worker-Prozesse (1 = seriell). Output ist unabhängig von der Worker-Anzahl.",
+    )
+
+    # Seeds: "shared" = base seed für alle Zellen (common random numbers über gammas),
+    #        "per_cell" = eigener Seed pro (scenario, gamma), deterministisch aus dem Key abgeleitet
+    ap.add_argument(
+        "--seed_mode",
+        choices=["shared", "per_cell"],
+        default="shared",
+        help="Seed-Vergabe pro Zelle (shared: base seed, per_cell: aus (scenario, gamma) abgeleitet).",
+    )
+
+    # Output-Format der Tabellen (CSV bleibt Default für auditierbare Runs)
+    ap.add_argument(
+        "--format",
+        choices=["csv", "npz", "parquet"],
+        default="csv",
+        help="Format für timeseries/trades (npz/parquet sind binär und deutlich schneller).",
+    )
+    ap.add_argument("--float32", action="store_true", help="float-Spalten als float32 speichern.")
+
+    # Experiment-Store: alle Runs in einer Datei statt eines Ordners pro Run
+    ap.add_argument(
+        "--store",
+        default=None,
+        help="Pfad zu einem Experiment-Store (SQLite, z.B. results/experiment.sqlite); "
+        "ersetzt die Run-Ordner. experiment_summary.csv wird weiterhin in --outdir geschrieben.",
+    )
+
+    # Ergebnis-Cache: Runs mit identischer Config (+ Simulator-Version) werden wiederverwendet
+    ap.add_argument(
+        "--cache_dir",
+        default=None,
+        help="Ordner des Ergebnis-Caches (Default: <outdir>/.cache).",
+    )
+    ap.add_argument("--no_cache", action="store_true", help="Cache weder lesen noch schreiben.")
+    ap.add_argument("--force", action="store_true", help="Alle Zellen neu rechnen (Cache wird aktualisiert).")
+    ap.add_argument(
+        "--cache_max_mb",
+        type=float,
+        default=2048.0,
+        help="Maximale Cache-Größe in MB; älteste Einträge werden verdrängt.",
+    )
+
+    # Shared Memory: Pfade pro Szenario einmal erzeugen, Worker hängen sich an (nur seed_mode shared)
+    ap.add_argument(
+        "--shared_memory",
+        action="store_true",
+        help="Mid-Pfad + Fill-Uniforms pro Szenario einmal in Shared Memory erzeugen; "
+        "ein Job pro (Szenario, Gamma). Nur mit --seed_mode shared und engine=discrete.",
+    )
+
+    # Profiling pro Job (Cache-Treffer werden nicht simuliert -> ggf. mit --force kombinieren)
+    ap.add_argument(
+        "--profile",
+        choices=PROFILE_MODES,
+        default=None,
+        help="Jobs profilieren (cProfile, tracemalloc oder gesampelte Zeilen); Ausgabe in <outdir>/profiles/.",
+    )
+
     args = ap.parse_args()
+    if args.workers < 1:
+        ap.error("--workers must be >= 1")
+    if args.shared_memory and args.seed_mode != "shared":
+        ap.error("--shared_memory requires --seed_mode shared")
 
     base_cfg_path = Path(args.base_config)
     out_root = Path(args.outdir)
@@ -90,6 +358,8 @@ def main() -> None:
     # 1) Base-Config laden (Paper-Baseline Parameter + Defaults)
     #    Wichtig: diese Config enthält z.B. A, k, dt, T, s0, fee_bps, ...
     cfg = load_config(base_cfg_path)
+    if args.shared_memory and cfg.engine != "discrete":
+        ap.error("--shared_memory requires engine: discrete")
 
     # 2) Definition der Marktregime (nur mu/sigma Overrides)
     #    - calm      : niedrigere Volatilität (ruhiger Markt)
@@ -110,43 +380,59 @@ def main() -> None:
     #    gamma groß  -> risikoaverser, konservativer
     gammas = [0.001, 0.01, 0.05, 0.1, 0.3]
 
-    rows: list[dict] = []
-
-    # 4) Grid-Search: Szenario × Gamma
-    for sc in scenarios:
-        for g in gammas:
-            # pydantic v2: model_copy(deep=True)
-            # Falls du v1 nutzt: cfg.copy(deep=True)
-            cfg_run = cfg.model_copy(deep=True)
-
-            # Override der Regime-Parameter
-            cfg_run.mu = sc["mu"]
-            cfg_run.sigma = sc["sigma"]
-
-            # Override der Forschungsvariable
-            cfg_run.gamma = g
-
-            # Output-Ordner pro Run (auditierbar, reproduzierbar)
-            # Beispiel: results/experiment/calm/gamma_0.1/
-            outdir = out_root / sc["name"] / f"gamma_{g}"
-            outdir.mkdir(parents=True, exist_ok=True)
-
-            # Run durchführen + KPIs sammeln
-            kpis = run_one(cfg_run, outdir)
+    # 4) Grid-Search: Szenario × Gamma als Jobs (serial oder im Process-Pool)
+    jobs = build_jobs(
+        cfg, scenarios, gammas, out_root, seed_mode=args.seed_mode, fmt=args.format, float32=args.float32,
+        store=Path(args.store) if args.store else None,
+        cache=None if args.no_cache else Path(args.cache_dir or out_root / ".cache"),
+        cache_max_bytes=int(args.cache_max_mb * 1024 * 1024),
+        force=args.force,
+        profile=args.profile,
+        split_gammas=args.shared_memory,
+    )
 
-            # Eine Zeile in die zentrale Summary
-            rows.append(
-                {
-                    "scenario": sc["name"],
-                    "gamma": g,
-                    **kpis,
-                }
+    rows: list[dict] = []
+    profile: list[dict] = []
+    with ExitStack() as stack:
+        if args.shared_memory:
+            # ein Block pro Szenario, gehört diesem Prozess; wird nach allen Jobs freigegeben
+            shared: dict[str, SharedPaths] = {}
+            for job in jobs:
+                if job["scenario"] not in shared:
+                    shared[job["scenario"]] = stack.enter_context(SharedPaths(job["cfg"]))
+                job["shared"] = shared[job["scenario"]].handle
+            print(
+                f"shared memory: {len(shared)} scenarios, "
+                f"{sum(sp.n_steps for sp in shared.values()) * 16 / 2**20:.1f} MB, "
+                f"generated in {sum(sp.generate_s for sp in shared.values()):.2f}s"
             )
 
+        if args.workers > 1:
+            with ProcessPoolExecutor(max_workers=args.workers) as ex:
+                for job_rows, job_profile in ex.map(run_job, jobs):
+                    rows.extend(job_rows)
+                    profile.extend(job_profile)
+        else:
+            for job in jobs:
+                job_rows, job_profile = run_job(job)
+                rows.extend(job_rows)
+                profile.extend(job_profile)
+
     # 5) Zentrale Summary-Tabelle schreiben
+    #    Reihenfolge unabhängig von Worker-Anzahl / Fertigstellungsreihenfolge
     df = pd.DataFrame(rows).sort_values(["scenario", "gamma"])
     df.to_csv(out_root / "experiment_summary.csv", index=False)
 
+    # 6) Profil-Tabelle (Telemetrie pro Run) daneben: Durchsatz-Regressionen direkt sichtbar
+    prof = pd.DataFrame(profile, columns=["scenario", "gamma", *PROFILE_COLUMNS]).sort_values(["scenario", "gamma"])
+    prof.to_csv(out_root / "experiment_profile.csv", index=False)
+    simulated = prof[~prof["cache_hit"]]
+    print(
+        f"{len(prof)} runs ({len(simulated)} simulated, {len(prof) - len(simulated)} cached), "
+        f"sim {simulated['price_s'].sum() + simulated['loop_s'].sum():.2f}s, "
+        f"kpi {simulated['kpi_s'].sum():.2f}s, write {prof['write_s'].sum():.2f}s"
+    )
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,106 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from pathlib import Path
+
+import pandas as pd
+
+from .config import MMConfig
+from .io import config_yaml, ensure_dir, frame_from_npz_bytes, frame_to_npz_bytes
+from .simulator import SIMULATOR_VERSION
+
+_ENTRY_FILES = ("summary.json", "timeseries.npz", "trades.npz")
+
+
+def cache_key(cfg: MMConfig, version: str = SIMULATOR_VERSION) -> str:
+    """
+    Inhaltsadresse eines Runs: sha256 über die vollständig aufgelöste Config
+    (model_dump, Keys sortiert) plus Simulator-Version. Gleiche Config + gleiche
+    Simulator-Version -> gleiche Ergebnisse -> gleicher Key.
+    """
+    payload = json.dumps({"config": cfg.model_dump(), "simulator": version}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    Run-Cache auf Dateibasis: <root>/<key[:2]>/<key>/ mit summary.json, timeseries.npz,
+    trades.npz (+ config_used.yaml zur Nachvollziehbarkeit).
+
+    max_bytes begrenzt die Gesamtgröße; beim Überschreiten werden die am längsten nicht
+    benutzten Einträge (mtime, wird bei jedem Treffer aktualisiert) gelöscht.
+    Einträge werden über einen temporären Ordner + rename geschrieben, parallele
+    Worker sehen also nie halbe Einträge.
+    """
+
+    def __init__(self, root: str | Path, max_bytes: int | None = None):
+        self.root = ensure_dir(root)
+        self.max_bytes = max_bytes
+
+    def _entry(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def get(self, cfg: MMConfig) -> dict | None:
+        """Treffer: {"summary", "timeseries", "trades"}; sonst None."""
+        entry = self._entry(cache_key(cfg))
+        try:
+            summary = json.loads((entry / "summary.json").read_text(encoding="utf-8"))
+            ts = frame_from_npz_bytes((entry / "timeseries.npz").read_bytes())
+            trades = frame_from_npz_bytes((entry / "trades.npz").read_bytes())
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        os.utime(entry)  # LRU: zuletzt benutzt
+        return {"summary": summary, "timeseries": ts, "trades": trades}
+
+    def put(self, cfg: MMConfig, timeseries: pd.DataFrame, trades: pd.DataFrame, summary: dict) -> None:
+        key = cache_key(cfg)
+        entry = self._entry(key)
+        tmp = ensure_dir(self.root / "tmp" / f"{key}.{uuid.uuid4().hex}")
+        (tmp / "config_used.yaml").write_text(config_yaml(cfg), encoding="utf-8")
+        (tmp / "timeseries.npz").write_bytes(frame_to_npz_bytes(timeseries))
+        (tmp / "trades.npz").write_bytes(frame_to_npz_bytes(trades))
+        (tmp / "summary.json").write_text(json.dumps(summary, indent=2), encoding="utf-8")
+
+        ensure_dir(entry.parent)
+        try:
+            os.replace(tmp, entry)
+        except OSError:
+            # Eintrag existiert bereits (z.B. paralleler Worker) -> neuer Stand ersetzt alten
+            shutil.rmtree(entry, ignore_errors=True)
+            try:
+                os.replace(tmp, entry)
+            except OSError:
+                shutil.rmtree(tmp, ignore_errors=True)
+
+        if self.max_bytes is not None:
+            self.evict(self.max_bytes)
+
+    def entries(self) -> list[tuple[Path, float, int]]:
+        """Alle vollständigen Einträge als (Pfad, mtime, Bytes)."""
+        out = []
+        for entry in self.root.glob("??/*"):
+            try:
+                size = sum((entry / f).stat().st_size for f in _ENTRY_FILES)
+                out.append((entry, entry.stat().st_mtime, size))
+            except FileNotFoundError:
+                continue
+        return out
+
+    def size_bytes(self) -> int:
+        return sum(size for _, _, size in self.entries())
+
+    def evict(self, max_bytes: int) -> int:
+        """Älteste Einträge löschen, bis die Gesamtgröße <= max_bytes ist. Rückgabe: Anzahl gelöscht."""
+        entries = sorted(self.entries(), key=lambda e: e[1])
+        total = sum(size for _, _, size in entries)
+        removed = 0
+        for entry, _, size in entries:
+            if total <= max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            removed += 1
+        return removed
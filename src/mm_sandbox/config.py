@@ -1,10 +1,16 @@
 from __future__ import annotations
+from typing import Literal
+
 from pydantic import BaseModel, Field
 
 
 class MMConfig(BaseModel):
     # --- Reproduzierbarkeit ---
     seed: int = 42  # fixiert die Zufallszahlen -> identische Ergebnisse bei gleicher Config
+    rng_layout: Literal["legacy", "streams"] = "legacy"
+    # "legacy" : ein Stream default_rng(seed); erst Mid-Pfad(e), dann Fill-Draws (bisherige Ergebnisse)
+    # "streams": SeedSequence(seed) -> eigener Stream pro Pfad und Zweck (price / fills),
+    #            unabhängig von Batch-Größe, Chunking und Worker-Anzahl (siehe mm_sandbox.rng)
 
     # --- Zeitdiskretisierung (Paper) ---
     dt_seconds: float = Field(gt=0)   # dt > 0: Zeitschritt in Sekunden (Paper nutzt sehr kleines dt)
@@ -15,6 +21,19 @@ class MMConfig(BaseModel):
     # "session": tau = max(T - t*dt, 0) fällt gegen 0
     # (rolling wäre eine Extension; im Paper wird session betrachtet)
 
+    engine: Literal["discrete", "event"] = "discrete"
+    # "discrete": Paper-Loop, pro Step eine Fill-Entscheidung (P ≈ λ(δ)*dt)
+    # "event"   : Poisson-Fills, nächster Fill-Zeitpunkt pro Seite direkt gesampelt
+    #             (Aufwand ~ Anzahl Fills statt n_steps; äquivalent für dt -> 0)
+
+    recording: Literal["full", "decimated", "kpi_only"] = "full"
+    # was run_simulation in "timeseries" aufzeichnet (KPIs/VaR sind in jeder Stufe exakt gleich):
+    # "full"     : jeder Step, alle Spalten
+    # "decimated": jeder record_every-te Step + jeder Fill-Step + letzter Step
+    # "kpi_only" : keine Timeseries (nur Trades + Endwerte), für große Sweeps
+    # (Streaming-Blöcke sind immer vollständig; dort entscheiden die Sinks, was bleibt)
+    record_every: int = Field(default=100, ge=1)
+
     # --- Execution / Ordergröße ---
     trade_size: float = Field(gt=0)   # Stückzahl pro Fill (Paper: 1)
 
@@ -23,6 +42,12 @@ class MMConfig(BaseModel):
     mu: float                         # Drift μ in Preis-Einheiten pro Sekunde (arithmetisch)
     sigma: float = Field(ge=0)        # σ in Preis-Einheiten; Step ~ ±σ*sqrt(dt) (Paper)
 
+    # --- Replay historischer Mids (statt Random Walk) ---
+    replay_path: str | None = None    # Tape mit einem Mid pro Step (.npy/.bin/.parquet/npz-Chunks, siehe mm_sandbox.tape)
+    replay_column: str = "mid"        # Spalte bzw. Array-Name in parquet/npz-Tapes
+    # gesetzt: die ersten n_steps Ticks ersetzen den Mid-Pfad (s0/mu werden nicht verwendet,
+    # sigma bleibt Quote-Parameter); Fill-Uniforms wie im synthetischen Run
+
     # --- Avellaneda–Stoikov Risikoaversion ---
     gamma: float = Field(gt=0)        # γ > 0 (steht im AS-Reservation-Price + Spread-Term)
 
@@ -37,3 +62,5 @@ class MMConfig(BaseModel):
     adverse_horizon_steps: int = Field(ge=1)  # Markout-Horizont in Steps (z.B. 10)
     var_horizon_seconds: float = Field(gt=0)  # VaR-Horizont in Sekunden (z.B. 0.05 = 10 Steps bei dt=0.005)
     var_levels: list[float] = Field(default_factory=lambda: [0.95, 0.99])  # 95% und 99%
+    risk_horizons_seconds: list[float] = Field(default_factory=list)
+    # zusätzliche Haltedauern (Sekunden) für VaR/ES in summary.json, z.B. [0.01, 0.25]
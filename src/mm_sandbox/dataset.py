@@ -0,0 +1,177 @@
+from __future__ import annotations
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from .io import find_frame, read_frame
+from .store import ExperimentStore, summary_fingerprint
+
+
+class RunDataset:
+    """
+    Alle Runs eines Experiments einmal geladen, im Speicher indexiert nach (scenario, gamma).
+
+    Ein Run ist ein dict wie bisher in plot_4fig_story:
+      {"scenario", "gamma", "ts", "trades", "kpi", "config", "run_dir", "stats"}
+    "stats" enthält pro numerischer Timeseries-Spalte (min, max) und wird beim Laden
+    berechnet -> globale Achsenlimits brauchen keinen weiteren Durchlauf über die Daten.
+    """
+
+    def __init__(self, runs: Iterable[dict]):
+        self._runs: dict[tuple[str, float], dict] = {}
+        for run in runs:
+            run.setdefault("stats", _column_stats(run["ts"]))
+            self._runs[(run["scenario"], run["gamma"])] = run
+
+    # -----------------------------
+    # Laden
+    # -----------------------------
+    @classmethod
+    def from_folder(cls, root: str | Path, scenarios: Iterable[str], max_workers: int | None = None) -> "RunDataset":
+        """Run-Ordner <root>/<scenario>/gamma_<g>/ finden und parallel (Threads) laden."""
+        targets = _discover_run_dirs(root, scenarios)
+
+        # Parsing (pandas/numpy/zlib) gibt größtenteils den GIL frei -> Threads reichen
+        with ThreadPoolExecutor(max_workers=max_workers) as ex:
+            runs = list(ex.map(lambda t: _load_run_dir(*t), targets))
+        return cls(run for run in runs if run is not None)
+
+    @classmethod
+    def from_store(cls, store: ExperimentStore, scenarios: Iterable[str]) -> "RunDataset":
+        runs = []
+        for scenario in scenarios:
+            for run in store.load_runs(scenario):
+                run.update(scenario=scenario, run_dir=None)
+                runs.append(run)
+        return cls(runs)
+
+    # -----------------------------
+    # Abfragen
+    # -----------------------------
+    def __len__(self) -> int:
+        return len(self._runs)
+
+    def get(self, scenario: str, gamma: float) -> dict | None:
+        return self._runs.get((scenario, gamma))
+
+    def runs(self, scenario: str) -> list[dict]:
+        """Alle Runs eines Szenarios, nach gamma sortiert."""
+        return sorted((r for (sc, _), r in self._runs.items() if sc == scenario), key=lambda r: r["gamma"])
+
+    def gammas(self) -> list[float]:
+        return sorted({g for _, g in self._runs})
+
+    def value_range(
+        self,
+        cols: Iterable[str],
+        scenarios: Iterable[str] | None = None,
+        first_run_only: bool = False,
+    ) -> tuple[float | None, float | None]:
+        """
+        Globales (min, max) über die Spalten cols aller Runs (NaN ignoriert).
+        first_run_only: nur der erste Run (kleinstes gamma) pro Szenario.
+        """
+        cols = list(cols)
+        if scenarios is None:
+            scenarios = sorted({sc for sc, _ in self._runs})
+        lo, hi = None, None
+        for scenario in scenarios:
+            runs = self.runs(scenario)
+            for run in runs[:1] if first_run_only else runs:
+                for col in cols:
+                    if col not in run["stats"]:
+                        continue
+                    mn, mx = run["stats"][col]
+                    if np.isnan(mn):
+                        continue
+                    lo = mn if lo is None else min(lo, mn)
+                    hi = mx if hi is None else max(hi, mx)
+        return lo, hi
+
+
+def folder_fingerprints(root: str | Path, scenarios: Iterable[str]) -> dict[tuple[str, float], dict[str, str]]:
+    """
+    Inhalts-Hashes der Run-Ordner ohne Parsen (Gegenstück zu ExperimentStore.fingerprints):
+      {(scenario, gamma): {"config", "kpi", "timeseries", "trades"}}  (sha256 hex)
+    Zum Erkennen, welche Runs sich seit dem letzten Plot geändert haben.
+    """
+    out: dict[tuple[str, float], dict[str, str]] = {}
+    for scenario, gamma, rd in _discover_run_dirs(root, scenarios):
+        if find_frame(rd, "timeseries") is None or not (rd / "summary.json").exists():
+            continue
+        files = {
+            "config": rd / "config_used.yaml",
+            "kpi": rd / "summary.json",
+            "timeseries": find_frame(rd, "timeseries"),
+            "trades": find_frame(rd, "trades"),
+        }
+        fp = {key: _file_sha256(path) if path is not None and path.exists() else "" for key, path in files.items()}
+        fp["kpi"] = summary_fingerprint(files["kpi"].read_text(encoding="utf-8"))
+        out[(scenario, gamma)] = fp
+    return out
+
+
+def _discover_run_dirs(root: str | Path, scenarios: Iterable[str]) -> list[tuple[str, float, Path]]:
+    """(scenario, gamma, run_dir) für alle Ordner <root>/<scenario>/gamma_<g>/."""
+    root = Path(root)
+    targets = []
+    for scenario in scenarios:
+        scenario_dir = root / scenario
+        if not scenario_dir.exists():
+            continue
+        for rd in sorted(p for p in scenario_dir.iterdir() if p.is_dir() and p.name.startswith("gamma_")):
+            try:
+                gamma = float(rd.name.replace("gamma_", ""))
+            except ValueError:
+                continue
+            targets.append((scenario, gamma, rd))
+    return targets
+
+
+def _file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _load_run_dir(scenario: str, gamma: float, rd: Path) -> dict | None:
+    kpi_path = rd / "summary.json"
+    if find_frame(rd, "timeseries") is None or not kpi_path.exists():
+        return None
+
+    # Format (csv/npz/parquet) wird an der Dateiendung erkannt
+    ts = read_frame(rd, "timeseries")
+    trades = read_frame(rd, "trades") if find_frame(rd, "trades") is not None else pd.DataFrame()
+    kpi = json.loads(kpi_path.read_text(encoding="utf-8"))
+    cfg_path = rd / "config_used.yaml"
+    config = yaml.safe_load(cfg_path.read_text(encoding="utf-8")) if cfg_path.exists() else None
+    return {
+        "scenario": scenario,
+        "gamma": gamma,
+        "ts": ts,
+        "trades": trades,
+        "kpi": kpi,
+        "config": config,
+        "run_dir": rd,
+    }
+
+
+def _column_stats(ts: pd.DataFrame) -> dict[str, tuple[float, float]]:
+    stats = {}
+    for col in ts.columns:
+        values = ts[col].to_numpy()
+        if values.dtype.kind not in "fiu" or values.size == 0:
+            continue
+        if values.dtype.kind == "f" and np.isnan(values).all():
+            stats[col] = (float("nan"), float("nan"))
+            continue
+        stats[col] = (float(np.nanmin(values)), float(np.nanmax(values)))
+    return stats
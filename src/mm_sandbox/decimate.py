@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import numpy as np
+
+
+def minmax_indices(y, n_points: int) -> np.ndarray:
+    """
+    Min/Max-Bucketing für Plots: Indizes, die eine lange Reihe auf ~n_points Punkte
+    reduzieren und dabei alle Extrema erhalten.
+
+    Die Reihe wird in n_points // 2 gleich große Buckets geteilt; pro Bucket bleiben
+    Minimum und Maximum (in zeitlicher Reihenfolge), dazu erster und letzter Punkt.
+    Als Linie gezeichnet entspricht das Ergebnis pixelgenau der vollen Reihe, solange
+    n_points >= 2 * Pixelbreite der Achse. NaN wird ignoriert.
+
+    n_points <= 0 oder len(y) <= n_points -> alle Indizes.
+    """
+    y = np.asarray(y, dtype=float)
+    n = y.size
+    if n_points <= 0 or n <= n_points:
+        return np.arange(n)
+
+    n_buckets = max(n_points // 2, 1)
+    size = -(-n // n_buckets)  # ceil
+    n_buckets = -(-n // size)
+    padded = np.full(n_buckets * size, np.nan)
+    padded[:n] = y
+    blocks = padded.reshape(n_buckets, size)
+
+    nan = np.isnan(blocks)
+    lo = np.argmin(np.where(nan, np.inf, blocks), axis=1)
+    hi = np.argmax(np.where(nan, -np.inf, blocks), axis=1)
+    offset = np.arange(n_buckets) * size
+    idx = np.concatenate([[0, n - 1], offset + lo, offset + hi])
+    idx = idx[idx < n]
+    return np.unique(idx)
+
+
+def decimate_frame(df, cols, n_points: int):
+    """
+    Zeilen von df, die für alle Spalten cols die Min/Max-Punkte enthalten (Vereinigung,
+    Reihenfolge bleibt). Für Bänder (bid/ask) beide Spalten gemeinsam übergeben.
+    """
+    cols = [c for c in cols if c in df.columns]
+    if n_points <= 0 or len(df) <= n_points or not cols:
+        return df
+    idx = np.unique(np.concatenate([minmax_indices(df[c].to_numpy(dtype=float), n_points) for c in cols]))
+    return df.iloc[idx]
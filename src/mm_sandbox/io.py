@@ -1,9 +1,18 @@
 from __future__ import annotations
 from pathlib import Path
+import io
 import yaml
 import json
 
+import numpy as np
+import pandas as pd
+
 from .config import MMConfig
+from .rng import stream_layout
+
+# Tabellen-Formate für timeseries/trades: Dateiendung je Format.
+# Reihenfolge = Priorität beim Auto-Detect in read_frame (binär vor Text).
+TABLE_FORMATS = {"parquet": ".parquet", "npz": ".npz", "csv": ".csv"}
 
 
 def load_config(path: str | Path) -> MMConfig:
@@ -18,10 +27,129 @@ def ensure_dir(path: str | Path) -> Path:
     return p
 
 
-def write_outputs(outdir: str | Path, cfg: MMConfig, timeseries_df, trades_df, summary: dict) -> Path:
+def config_yaml(cfg: MMConfig) -> str:
+    """Inhalt von config_used.yaml: alle Config-Felder + das RNG-Stream-Layout (rng_streams)."""
+    return yaml.safe_dump({**cfg.model_dump(), "rng_streams": stream_layout(cfg)})
+
+
+def write_config(outdir: str | Path, cfg: MMConfig) -> Path:
+    out = ensure_dir(outdir)
+    (out / "config_used.yaml").write_text(config_yaml(cfg), encoding="utf-8")
+    return out
+
+
+def write_summary(outdir: str | Path, summary: dict) -> Path:
     out = ensure_dir(outdir)
-    (out / "config_used.yaml").write_text(yaml.safe_dump(cfg.model_dump()), encoding="utf-8")
-    timeseries_df.to_csv(out / "timeseries.csv", index=False)
-    trades_df.to_csv(out / "trades.csv", index=False)
     (out / "summary.json").write_text(json.dumps(summary, indent=2), encoding="utf-8")
     return out
+
+
+def write_outputs(
+    outdir: str | Path,
+    cfg: MMConfig,
+    timeseries_df,
+    trades_df,
+    summary: dict | None,
+    *,
+    fmt: str = "csv",
+    float32: bool = False,
+) -> Path:
+    """
+    Schreibt config_used.yaml, timeseries.<ext>, trades.<ext> und summary.json
+    (summary=None: summary.json später selbst per write_summary schreiben).
+
+    fmt    : "csv" (Text, auditierbar), "npz" (komprimiert, nur NumPy nötig) oder
+             "parquet" (benötigt pyarrow). Spalten-Schema ist in allen Formaten gleich.
+    float32: float64-Spalten vor dem Schreiben auf float32 casten (halbe Dateigröße).
+    """
+    out = write_config(outdir, cfg)
+    write_frame(out, "timeseries", timeseries_df, fmt=fmt, float32=float32)
+    write_frame(out, "trades", trades_df, fmt=fmt, float32=float32)
+    if summary is not None:
+        write_summary(out, summary)
+    return out
+
+
+def write_frame(outdir: str | Path, name: str, df: pd.DataFrame, *, fmt: str = "csv", float32: bool = False) -> Path:
+    """
+    Schreibt eine Tabelle als <name>.<ext>. Dateien derselben Tabelle in anderen Formaten
+    werden entfernt, damit read_frame nicht auf einen veralteten Stand fällt.
+    """
+    if fmt not in TABLE_FORMATS:
+        raise ValueError(f"unknown format {fmt!r}; choose from {sorted(TABLE_FORMATS)}")
+    out = ensure_dir(outdir)
+    path = out / f"{name}{TABLE_FORMATS[fmt]}"
+
+    if float32:
+        df = df.astype({c: np.float32 for c in df.columns if df[c].dtype == np.float64})
+
+    if fmt == "csv":
+        df.to_csv(path, index=False)
+    elif fmt == "npz":
+        path.write_bytes(frame_to_npz_bytes(df))
+    else:
+        _require_pyarrow()
+        df.to_parquet(path, index=False)
+
+    for other in TABLE_FORMATS.values():
+        stale = out / f"{name}{other}"
+        if stale != path and stale.exists():
+            stale.unlink()
+    return path
+
+
+def find_frame(run_dir: str | Path, name: str) -> Path | None:
+    """Pfad von <name>.<ext> im Run-Ordner (erstes vorhandene Format), sonst None."""
+    for ext in TABLE_FORMATS.values():
+        p = Path(run_dir) / f"{name}{ext}"
+        if p.exists():
+            return p
+    return None
+
+
+def read_frame(run_dir: str | Path, name: str, columns: list[str] | None = None) -> pd.DataFrame:
+    """
+    Liest <name> aus einem Run-Ordner; das Format wird an der Dateiendung erkannt.
+    columns: optional nur diese Spalten laden (bei npz/parquet ohne den Rest zu lesen).
+    """
+    p = find_frame(run_dir, name)
+    if p is None:
+        raise FileNotFoundError(f"no {name}.(parquet|npz|csv) in {run_dir}")
+
+    if p.suffix == ".csv":
+        try:
+            return pd.read_csv(p, usecols=columns)
+        except pd.errors.EmptyDataError:
+            # z.B. trades.csv eines Runs ohne Fills
+            return pd.DataFrame()
+    if p.suffix == ".npz":
+        return frame_from_npz_bytes(p.read_bytes(), columns=columns)
+    _require_pyarrow()
+    return pd.read_parquet(p, columns=columns)
+
+
+def frame_to_npz_bytes(df: pd.DataFrame, float32: bool = False) -> bytes:
+    """DataFrame -> komprimiertes npz (eine Spalte pro Array), z.B. für Dateien oder Store-Blobs."""
+    if float32:
+        df = df.astype({c: np.float32 for c in df.columns if df[c].dtype == np.float64})
+    cols = {}
+    for c in df.columns:
+        arr = df[c].to_numpy()
+        # Strings (z.B. side) als Fixed-Width Unicode -> ohne Pickle ladbar
+        cols[c] = arr.astype(str) if arr.dtype == object else arr
+    buf = io.BytesIO()
+    np.savez_compressed(buf, **cols)
+    return buf.getvalue()
+
+
+def frame_from_npz_bytes(data: bytes, columns: list[str] | None = None) -> pd.DataFrame:
+    with np.load(io.BytesIO(data), allow_pickle=False) as npz:
+        keys = npz.files if columns is None else [c for c in npz.files if c in columns]
+        return pd.DataFrame({c: npz[c] for c in keys})
+
+
+def _require_pyarrow() -> None:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as e:
+        raise ImportError("format 'parquet' requires pyarrow (pip install pyarrow); use 'npz' otherwise") from e
@@ -0,0 +1,121 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_HORIZONS = (1, 5, 10, 50, 100)
+
+
+@dataclass(frozen=True)
+class MarkoutResult:
+    """
+    Markouts aller Trades für mehrere Horizonte.
+
+    markouts[i, j]: Markout von Trade i nach horizons[j] Steps
+        buy:  mid_{t+h} - price
+        sell: price - mid_{t+h}
+    NaN, wenn t+h hinter dem Ende der Timeseries liegt (oder side weder buy noch sell).
+    Negativ => adverse selection.
+    """
+    horizons: np.ndarray      # (H,)
+    markouts: np.ndarray      # (n_trades, H)
+    adverse_rate: np.ndarray  # (H,) Anteil Markouts < 0 unter den gültigen
+    mean_curve: np.ndarray    # (H,) mittlerer Markout je Horizont
+
+    def at(self, horizon: int) -> np.ndarray:
+        """Gültige Markouts (ohne NaN) für einen Horizont, in Trade-Reihenfolge."""
+        j = int(np.flatnonzero(self.horizons == horizon)[0])
+        col = self.markouts[:, j]
+        return col[~np.isnan(col)]
+
+    def to_frame(self) -> pd.DataFrame:
+        """Eine Zeile pro Horizont: horizon, n, adverse_rate, mean_markout."""
+        return pd.DataFrame(
+            {
+                "horizon": self.horizons,
+                "n": np.count_nonzero(~np.isnan(self.markouts), axis=0),
+                "adverse_rate": self.adverse_rate,
+                "mean_markout": self.mean_curve,
+            }
+        )
+
+
+def compute_markouts(
+    *,
+    pos,
+    side,
+    price,
+    mid,
+    horizons: Sequence[int] = DEFAULT_HORIZONS,
+) -> MarkoutResult:
+    """
+    Vektorisierte Markouts für alle Trades und Horizonte in einem Durchgang.
+
+    pos  : Zeilenindex des Fill-Steps in mid (bei t = 0..n-1 einfach trade["t"])
+    side : "buy"/"sell" (oder bool-Array: True = buy)
+    price: Fill-Preise
+    mid  : Mid-Timeseries
+    """
+    horizons = np.asarray(horizons, dtype=np.int64).ravel()
+    if np.any(horizons < 0):
+        raise ValueError("horizons must be >= 0")
+    pos = np.asarray(pos, dtype=np.int64).ravel()
+    price = np.asarray(price, dtype=float).ravel()
+    mid = np.asarray(mid, dtype=float).ravel()
+    side = np.asarray(side).ravel()
+    if side.dtype == bool:
+        buy, sell = side, ~side
+    else:
+        buy, sell = side == "buy", side == "sell"
+
+    # (n_trades, H): Index des Future-Mids, außerhalb -> NaN
+    target = pos[:, None] + horizons[None, :]
+    valid = (target < mid.size) & (buy | sell)[:, None]
+    fm = np.where(valid, mid[np.where(valid, target, 0)] if mid.size else np.nan, np.nan)
+    return _markout_result(horizons, buy, price, fm, valid)
+
+
+def _markout_result(horizons: np.ndarray, buy: np.ndarray, price: np.ndarray, fm: np.ndarray, valid: np.ndarray) -> MarkoutResult:
+    """Markouts + Kennzahlen aus den Future-Mids fm (n_trades, H); valid markiert vorhandene."""
+    markouts = np.where(buy[:, None], fm - price[:, None], price[:, None] - fm)
+
+    n_valid = np.count_nonzero(valid, axis=0)
+    n_adverse = np.count_nonzero(markouts < 0, axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        adverse_rate = np.where(n_valid > 0, n_adverse / n_valid, np.nan)
+        mean_curve = np.where(n_valid > 0, np.nansum(markouts, axis=0) / n_valid, np.nan)
+
+    return MarkoutResult(horizons=horizons, markouts=markouts, adverse_rate=adverse_rate, mean_curve=mean_curve)
+
+
+def markouts_from_frames(
+    trades: pd.DataFrame,
+    timeseries: pd.DataFrame,
+    horizons: Sequence[int] = DEFAULT_HORIZONS,
+) -> MarkoutResult:
+    """
+    compute_markouts für die Run-Tabellen (trades: t/side/price, timeseries: t/mid).
+    Der Horizont zählt Steps, nicht Zeilen: Future-Mid = mid im Step t + h, per
+    searchsorted in timeseries["t"] gesucht. Fehlt der Step (z.B. recording="decimated"
+    behält nur jeden record_every-ten Step + Fill-Steps), ist der Markout NaN statt
+    der Mid einer späteren Zeile. Bei vollständiger Timeseries identisch zu mids.shift(-h).
+    """
+    horizons = np.asarray(horizons, dtype=np.int64).ravel()
+    cols_ok = {"t", "side", "price"} <= set(trades.columns) and {"t", "mid"} <= set(timeseries.columns)
+    if trades.empty or not cols_ok or timeseries.empty:
+        return compute_markouts(pos=[], side=[], price=[], mid=[], horizons=horizons)
+    if np.any(horizons < 0):
+        raise ValueError("horizons must be >= 0")
+
+    ts_t = timeseries["t"].to_numpy()
+    mid = timeseries["mid"].to_numpy(dtype=float)
+    side = trades["side"].to_numpy(dtype=object)
+    buy, sell = side == "buy", side == "sell"
+
+    target = trades["t"].to_numpy(dtype=np.int64)[:, None] + horizons[None, :]
+    idx = np.minimum(np.searchsorted(ts_t, target), ts_t.size - 1)
+    valid = (ts_t[idx] == target) & (buy | sell)[:, None]
+    fm = np.where(valid, mid[idx], np.nan)
+    return _markout_result(horizons, buy, trades["price"].to_numpy(dtype=float), fm, valid)
@@ -3,6 +3,8 @@ from __future__ import annotations
 import numpy as np
 import pandas as pd
 
+from .markout import markouts_from_frames
+
 
 def compute_adverse_selection_proxy(
     trades: pd.DataFrame,
@@ -15,28 +17,30 @@ def compute_adverse_selection_proxy(
     - After a SELL fill: if the future mid is ABOVE the fill price -> likely adverse
 
     Returns share of trades that look adverse (0..1). NaNs are ignored.
+    (Vectorized via markout.markouts_from_frames; multi-horizon: use that directly.)
     """
-    if trades.empty:
-        return float("nan")
+    res = markouts_from_frames(trades, timeseries, horizons=[horizon_steps])
+    return float(res.adverse_rate[0])
 
-    mids = timeseries.set_index("t")["mid"]
-    future_mid = mids.shift(-horizon_steps)
 
-    def is_adverse(row) -> float:
-        t = int(row["t"])
-        fm = future_mid.loc[t]
-        if pd.isna(fm):
-            return np.nan
-        price = float(row["price"])
-        side = str(row["side"])
-        if side == "buy":
-            return 1.0 if fm < price else 0.0
-        if side == "sell":
-            return 1.0 if fm > price else 0.0
-        return np.nan
+def kpi_timeseries(res: dict) -> pd.DataFrame:
+    """
+    Timeseries in voller Auflösung für KPIs und VaR, unabhängig von MMConfig.recording.
 
-    adverse = trades.apply(is_adverse, axis=1)
-    return float(np.nanmean(adverse))
+    recording="full" -> res["timeseries"] unverändert.
+    sonst            -> (t, mid, inventory) aus res["mid"] (ganzer Mid-Pfad) und den Trades:
+                        Inventory ändert sich nur bei Fills (höchstens einer pro Step), die
+                        kumulierte Summe der ±size ist bitgleich zum Inventory im Loop.
+    """
+    if "mid" not in res:
+        return res["timeseries"]
+    mid = np.asarray(res["mid"], dtype=float)
+    delta = np.zeros(mid.size)
+    trades = res["trades"]
+    if len(trades):
+        size = trades["size"].to_numpy(dtype=float)
+        delta[trades["t"].to_numpy()] = np.where(trades["side"].to_numpy() == "buy", size, -size)
+    return pd.DataFrame({"t": np.arange(mid.size), "mid": mid, "inventory": np.cumsum(delta)})
 
 
 def compute_kpis(
@@ -74,26 +78,101 @@ def compute_var_inventory_horizon(ts: pd.DataFrame, horizon_seconds: int, dt_sec
     Inventory VaR over a fixed holding horizon.
     PnL shock(t) = inventory[t] * (mid[t+h] - mid[t])
     VaR_level = -Quantile(PnL_shock, 1-level)
+    (Single-horizon view of compute_var_es; values identical to np.quantile.)
     """
+    table = compute_var_es(
+        mid=ts["mid"].to_numpy(dtype=float),
+        inventory=ts["inventory"].to_numpy(dtype=float),
+        horizons_seconds=[horizon_seconds],
+        dt_seconds=dt_seconds,
+        levels=levels,
+    )
+    return {k: v for k, v in var_es_kpis(table).items() if k.startswith("var_")}
+
+
+def horizon_to_steps(horizon_seconds: float, dt_seconds: float) -> int:
     if dt_seconds <= 0:
         raise ValueError("dt_seconds must be > 0")
-
     h = int(round(horizon_seconds / dt_seconds))
     if h < 1:
         raise ValueError("horizon is < 1 step; increase horizon_seconds or reduce dt_seconds")
-    if len(ts) <= h:
-        raise ValueError("timeseries too short for chosen horizon")
+    return h
 
-    mid = ts["mid"].to_numpy(dtype=float)
-    inv = ts["inventory"].to_numpy(dtype=float)
 
-    shocks = inv[:-h] * (mid[h:] - mid[:-h])  # 60s holding PnL (inventory frozen at t)
+def compute_var_es(
+    *,
+    mid,
+    inventory,
+    horizons_seconds,
+    dt_seconds: float,
+    levels=(0.95, 0.99),
+) -> pd.DataFrame:
+    """
+    Inventory VaR + Expected Shortfall for several holding horizons and levels.
+
+    mid/inventory: (n_steps,) or batched (n_paths, n_steps); shocks of all paths are pooled
+                   (Monte-Carlo VaR), the horizon never crosses a path boundary.
+    Per horizon the shocks inventory[t] * (mid[t+h] - mid[t]) are sorted once; every level
+    is read from that sort:
+        VaR_level = -Quantile(shocks, 1-level)          (same values as np.quantile, "linear")
+        ES_level  = -mean(worst ceil((1-level)*n) shocks)
+
+    Returns a tidy table: horizon_seconds, horizon_steps, level, n_shocks, var, es.
+    """
+    mid = np.atleast_2d(np.asarray(mid, dtype=float))
+    inv = np.atleast_2d(np.asarray(inventory, dtype=float))
+    if mid.shape != inv.shape:
+        raise ValueError("mid and inventory must have the same shape")
+    levels = [float(lvl) for lvl in levels]
+    alphas = np.array([1.0 - lvl for lvl in levels])
+
+    rows = []
+    for horizon_seconds in horizons_seconds:
+        h = horizon_to_steps(horizon_seconds, dt_seconds)
+        if mid.shape[1] <= h:
+            raise ValueError("timeseries too short for chosen horizon")
+
+        shocks = np.sort((inv[:, :-h] * (mid[:, h:] - mid[:, :-h])).ravel())
+        q = _quantile_sorted(shocks, alphas)
+        n = shocks.size
+        for lvl, alpha, q_lvl in zip(levels, alphas, q):
+            k = max(1, int(np.ceil(alpha * n - 1e-9)))
+            rows.append(
+                {
+                    "horizon_seconds": horizon_seconds,
+                    "horizon_steps": h,
+                    "level": lvl,
+                    "n_shocks": n,
+                    "var": float(-q_lvl),
+                    "es": float(-shocks[:k].mean()),
+                }
+            )
+    return pd.DataFrame(rows, columns=["horizon_seconds", "horizon_steps", "level", "n_shocks", "var", "es"])
+
+
+def var_es_kpis(table: pd.DataFrame) -> dict:
+    """Flatten compute_var_es output into summary keys var_95_inv_0.05s / es_95_inv_0.05s."""
     out = {}
-    for lvl in levels:
-        alpha = 1.0 - float(lvl)
-        out[f"var_{int(lvl*100)}_inv_{horizon_seconds}s"] = float(-np.quantile(shocks, alpha))
+    for kind in ("var", "es"):
+        for row in table.itertuples(index=False):
+            out[f"{kind}_{int(row.level*100)}_inv_{row.horizon_seconds}s"] = getattr(row, kind)
     return out
 
+
+def _quantile_sorted(xs: np.ndarray, qs: np.ndarray) -> np.ndarray:
+    """np.quantile(xs, qs) (method="linear") for an already sorted 1-D array, without re-partitioning."""
+    n = xs.size
+    if n == 0 or np.isnan(xs[-1]):
+        return np.full(qs.shape, np.nan)
+    virtual = (n - 1) * qs
+    prev = np.clip(np.floor(virtual), 0, n - 1).astype(np.intp)
+    nxt = np.clip(prev + 1, 0, n - 1)
+    t = virtual - prev
+    a, b = xs[prev], xs[nxt]
+    diff = b - a
+    # gleiche Rundung wie numpy._lerp
+    return np.where(t >= 0.5, b - diff * (1 - t), a + diff * t)
+
 def compute_basic_kpis(ts: pd.DataFrame, trades: pd.DataFrame) -> dict:
     # hier packst du deine bestehenden KPIs rein
     return {
@@ -0,0 +1,280 @@
+from __future__ import annotations
+import math
+from typing import Any, Dict, Sequence
+
+import numpy as np
+
+from .config import MMConfig
+from .metrics import horizon_to_steps
+
+
+class QuantileSketch:
+    """
+    Streaming-Quantile mit relativer Fehlerschranke (DDSketch-Prinzip: logarithmische Buckets).
+
+    Ein Wert x mit |x| >= min_value landet im Bucket k = ceil(log_g |x|), g = (1+a)/(1-a),
+    und wird durch 2*g^k/(g+1) repräsentiert -> relativer Fehler <= a (relative_accuracy).
+    Werte mit |x| < min_value zählen als 0.
+
+    Fehlerschranke gegen np.quantile(x, q) (Default-Methode "linear", Position r = q*(n-1)):
+        |quantile(q) - np.quantile(x, q)| <= a * max(|x_(floor r)|, |x_(ceil r)|) + min_value
+    (bis auf Gleitkomma-Rundung an Bucket-Grenzen). Speicher O(Anzahl belegter Buckets),
+    unabhängig von der Anzahl Werte; Sketches sind per merge() kombinierbar.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.005, min_value: float = 1e-12):
+        if not 0.0 < relative_accuracy < 1.0:
+            raise ValueError("relative_accuracy must be in (0, 1)")
+        if min_value <= 0:
+            raise ValueError("min_value must be > 0")
+        self.relative_accuracy = float(relative_accuracy)
+        self.min_value = float(min_value)
+        self._gamma = (1.0 + relative_accuracy) / (1.0 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._pos: Dict[int, int] = {}
+        self._neg: Dict[int, int] = {}
+        self._zero = 0
+        self.count = 0
+
+    def add(self, values) -> None:
+        x = np.asarray(values, dtype=float).ravel()
+        x = x[~np.isnan(x)]
+        self.count += int(x.size)
+
+        small = np.abs(x) < self.min_value
+        self._zero += int(np.count_nonzero(small))
+        for store, v in ((self._pos, x[(x > 0) & ~small]), (self._neg, -x[(x < 0) & ~small])):
+            if not v.size:
+                continue
+            idx = np.ceil(np.log(v) / self._log_gamma).astype(np.int64)
+            keys, counts = np.unique(idx, return_counts=True)
+            for key, c in zip(keys.tolist(), counts.tolist()):
+                store[key] = store.get(key, 0) + c
+
+    def merge(self, other: "QuantileSketch") -> None:
+        if other._gamma != self._gamma or other.min_value != self.min_value:
+            raise ValueError("can only merge sketches with identical parameters")
+        for store, src in ((self._pos, other._pos), (self._neg, other._neg)):
+            for key, c in src.items():
+                store[key] = store.get(key, 0) + c
+        self._zero += other._zero
+        self.count += other.count
+
+    def quantile(self, q: float) -> float:
+        """Schätzung von np.quantile(x, q) (lineare Interpolation zwischen Nachbar-Rängen)."""
+        if not 0.0 <= q <= 1.0:
+            raise ValueError("q must be in [0, 1]")
+        if self.count == 0:
+            return float("nan")
+        pos = q * (self.count - 1)
+        lo = int(math.floor(pos))
+        hi = min(lo + 1, self.count - 1)
+        v_lo = self._value_at_rank(lo)
+        v_hi = self._value_at_rank(hi) if hi != lo else v_lo
+        return v_lo + (v_hi - v_lo) * (pos - lo)
+
+    def tail_mean(self, q: float) -> float:
+        """Mittelwert der kleinsten ceil(q*n) Werte (Expected Shortfall), gleiche Fehlerschranke wie quantile."""
+        if not 0.0 < q <= 1.0:
+            raise ValueError("q must be in (0, 1]")
+        if self.count == 0:
+            return float("nan")
+        k = max(1, int(math.ceil(q * self.count - 1e-9)))
+        total, left = 0.0, k
+        buckets = [(-self._bucket_value(key), c) for key, c in sorted(self._neg.items(), reverse=True)]
+        buckets.append((0.0, self._zero))
+        buckets += [(self._bucket_value(key), c) for key, c in sorted(self._pos.items())]
+        for value, c in buckets:
+            take = min(c, left)
+            total += value * take
+            left -= take
+            if left == 0:
+                break
+        return total / k
+
+    def _value_at_rank(self, rank: int) -> float:
+        # aufsteigend: negative Werte (größter Betrag zuerst), Nullen, positive Werte
+        cum = 0
+        for key in sorted(self._neg, reverse=True):
+            cum += self._neg[key]
+            if rank < cum:
+                return -self._bucket_value(key)
+        cum += self._zero
+        if rank < cum:
+            return 0.0
+        for key in sorted(self._pos):
+            cum += self._pos[key]
+            if rank < cum:
+                return self._bucket_value(key)
+        raise IndexError("rank out of range")
+
+    def _bucket_value(self, key: int) -> float:
+        return 2.0 * self._gamma ** key / (self._gamma + 1.0)
+
+
+class OnlineKpis:
+    """
+    Inkrementelle Variante von metrics.compute_kpis + compute_var_inventory_horizon.
+
+    Wird step- oder blockweise mit den Werten des Simulators gefüttert (update / consume)
+    und behält nur O(Horizont) Zustand:
+    - Trade-Zähler und finale PnL/Inventory
+    - Adverse Selection: offene Fills warten, bis der Mid h Steps später eintrifft
+      (gleiche Regel wie compute_adverse_selection_proxy, exakt)
+    - VaR/ES: Ring der letzten max(h) (inventory, mid) Werte -> PnL-Schocks
+      inventory[t] * (mid[t+h] - mid[t]) gehen pro Horizont in einen QuantileSketch
+      (Fehlerschranke siehe QuantileSketch)
+
+    result() liefert dieselben Keys wie der In-Memory-Pfad in run_backtest/run_scenarios.
+    """
+
+    def __init__(
+        self,
+        *,
+        horizon_steps: int,
+        var_horizon_seconds: float,
+        dt_seconds: float,
+        var_levels: Sequence[float] = (0.95, 0.99),
+        risk_horizons_seconds: Sequence[float] = (),
+        relative_accuracy: float = 0.005,
+    ):
+        self.horizon_steps = int(horizon_steps)
+        self.var_horizon_seconds = var_horizon_seconds
+        self.var_levels = list(var_levels)
+
+        # Haupt-Horizont zuerst, dann weitere Haltedauern (Reihenfolge wie metrics.var_es_kpis)
+        self.risk_horizons_seconds = [var_horizon_seconds] + [
+            h for h in risk_horizons_seconds if h != var_horizon_seconds
+        ]
+        self.risk_steps = [horizon_to_steps(h, dt_seconds) for h in self.risk_horizons_seconds]
+        self.var_steps = self.risk_steps[0]
+        self.sketches = [QuantileSketch(relative_accuracy=relative_accuracy) for _ in self.risk_steps]
+        self.shocks = self.sketches[0]
+
+        self.n_steps = 0
+        self.n_trades = 0
+        self.final_pnl = float("nan")
+        self.final_inventory = 0.0
+
+        self._n_adverse = 0
+        self._n_resolved = 0
+        self._pending_t = np.empty(0, dtype=np.int64)
+        self._pending_buy = np.empty(0, dtype=bool)
+        self._pending_price = np.empty(0, dtype=float)
+
+        self._tail_inv = np.empty(0, dtype=float)
+        self._tail_mid = np.empty(0, dtype=float)
+
+    @classmethod
+    def from_config(cls, cfg: MMConfig, relative_accuracy: float = 0.005) -> "OnlineKpis":
+        return cls(
+            horizon_steps=cfg.adverse_horizon_steps,
+            var_horizon_seconds=cfg.var_horizon_seconds,
+            dt_seconds=cfg.dt_seconds,
+            var_levels=cfg.var_levels,
+            risk_horizons_seconds=cfg.risk_horizons_seconds,
+            relative_accuracy=relative_accuracy,
+        )
+
+    def update(
+        self,
+        *,
+        mid,
+        inventory,
+        pnl,
+        trade_t=(),
+        trade_side=(),
+        trade_price=(),
+    ) -> None:
+        """
+        Nächste Steps [n_steps, n_steps + len(mid)) einspeisen (ein Step = Arrays der Länge 1).
+        trade_t sind globale Step-Indizes innerhalb dieses Blocks.
+        """
+        mid = np.asarray(mid, dtype=float)
+        inventory = np.asarray(inventory, dtype=float)
+        pnl = np.asarray(pnl, dtype=float)
+        n = mid.size
+        if n == 0:
+            return
+        t0 = self.n_steps
+
+        # --- Trades + Adverse Selection (Future-Mid h Steps nach dem Fill) ---
+        trade_t = np.asarray(trade_t, dtype=np.int64)
+        self.n_trades += int(trade_t.size)
+        pend_t = np.concatenate([self._pending_t, trade_t])
+        pend_buy = np.concatenate([self._pending_buy, np.asarray(trade_side) == "buy"])
+        pend_price = np.concatenate([self._pending_price, np.asarray(trade_price, dtype=float)])
+
+        target = pend_t + self.horizon_steps
+        ready = target < t0 + n
+        fm = mid[target[ready] - t0]
+        price = pend_price[ready]
+        adverse = np.where(pend_buy[ready], fm < price, fm > price)
+        self._n_adverse += int(np.count_nonzero(adverse))
+        self._n_resolved += int(adverse.size)
+
+        self._pending_t = pend_t[~ready]
+        self._pending_buy = pend_buy[~ready]
+        self._pending_price = pend_price[~ready]
+
+        # --- VaR-Schocks: inventory[t] * (mid[t+h] - mid[t]) pro Horizont ---
+        # neu sind nur Schocks, deren Ende t+h in diesem Block liegt (Start >= len(tail) - h)
+        n_tail = self._tail_inv.size
+        inv_all = np.concatenate([self._tail_inv, inventory])
+        mid_all = np.concatenate([self._tail_mid, mid])
+        for h, sketch in zip(self.risk_steps, self.sketches):
+            s0 = max(n_tail - h, 0)
+            if inv_all.size - h > s0:
+                sketch.add(inv_all[s0:-h] * (mid_all[s0 + h:] - mid_all[s0:-h]))
+        h_max = max(self.risk_steps)
+        self._tail_inv = inv_all[-h_max:]
+        self._tail_mid = mid_all[-h_max:]
+
+        self.n_steps += n
+        self.final_pnl = float(pnl[-1])
+        self.final_inventory = float(inventory[-1])
+
+    def consume(self, chunk: Dict[str, Any]) -> None:
+        """Sink-Schnittstelle für simulator.run_simulation_streaming."""
+        ts = chunk["timeseries"]
+        tr = chunk["trades"]
+        self.update(
+            mid=ts["mid"],
+            inventory=ts["inventory"],
+            pnl=ts["pnl"],
+            trade_t=tr["t"],
+            trade_side=tr["side"],
+            trade_price=tr["price"],
+        )
+
+    def close(self) -> None:
+        pass
+
+    @property
+    def adverse_selection_rate(self) -> float:
+        if self._n_resolved == 0:
+            return float("nan")
+        return self._n_adverse / self._n_resolved
+
+    def var(self) -> dict:
+        """VaR + ES je Horizont und Level (Keys wie metrics.var_es_kpis)."""
+        if self.n_steps <= max(self.risk_steps):
+            raise ValueError("timeseries too short for chosen horizon")
+        var, es = {}, {}
+        for horizon_seconds, sketch in zip(self.risk_horizons_seconds, self.sketches):
+            for lvl in self.var_levels:
+                alpha = 1.0 - float(lvl)
+                suffix = f"{int(lvl*100)}_inv_{horizon_seconds}s"
+                var[f"var_{suffix}"] = float(-sketch.quantile(alpha))
+                es[f"es_{suffix}"] = float(-sketch.tail_mean(alpha))
+        return {**var, **es}
+
+    def result(self) -> dict:
+        out = {
+            "final_pnl": self.final_pnl,
+            "final_inventory": self.final_inventory,
+            "n_trades": self.n_trades,
+            "adverse_selection_rate": self.adverse_selection_rate,
+        }
+        out.update(self.var())
+        return out
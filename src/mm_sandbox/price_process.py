@@ -1,5 +1,7 @@
 from __future__ import annotations
 import math
+from typing import Iterator
+
 import numpy as np
 
 
@@ -11,6 +13,8 @@ def simulate_rw_paper(
     dt: float,
     n_steps: int,
     rng: np.random.Generator,
+    n_paths: int | None = None,
+    legacy_loop: bool = False,
 ) -> np.ndarray:
     """
     Midpreis Bildung abhänig von gewähltem Drift
@@ -20,14 +24,101 @@ def simulate_rw_paper(
     - sign: +1 oder -1 mit 50/50 Wahrscheinlichkeit
     - sigma*sqrt(dt): typische Schrittgröße (Paper beschreibt ±σ√dt)
 
-    Ergebnis: Mid-Preis-Zeitreihe als numpy array der Länge n_steps.
+    Vektorisiert: alle Vorzeichen werden in einem einzigen rng.random()-Aufruf gezogen
+    und der Pfad per kumulativer Summe aufgebaut (Additionsreihenfolge wie im Loop,
+    siehe _walk -> bitgleich zu legacy_loop=True, auch bei mu != 0).
+
+    n_paths:
+        None -> Mid-Preis-Zeitreihe als numpy array der Länge n_steps (wie bisher).
+        int  -> Array der Form (n_paths, n_steps), ein Pfad pro Zeile.
+
+    legacy_loop:
+        True -> ursprüngliche Schritt-für-Schritt Schleife (ein rng.random() pro Step).
+        Beide Modi verbrauchen den RNG identisch (n_steps-1 Draws pro Pfad, Pfad für Pfad),
+        d.h. nachfolgende Draws (z.B. Fill-Uniforms im Simulator) bleiben gleich, und die
+        Pfade sind bitgleich.
+    """
+    if n_steps < 1:
+        raise ValueError("n_steps must be >= 1")
+    if n_paths is not None and n_paths < 1:
+        raise ValueError("n_paths must be >= 1")
+
+    rows = 1 if n_paths is None else int(n_paths)
+    step = sigma * math.sqrt(dt)
+
+    if legacy_loop:
+        s = np.empty((rows, n_steps), dtype=float)
+        for p in range(rows):
+            s[p, 0] = s0
+            for t in range(1, n_steps):
+                sign = 1.0 if rng.random() < 0.5 else -1.0
+                s[p, t] = s[p, t - 1] + mu * dt + sign * step
+        return s[0] if n_paths is None else s
+
+    draws = rng.random((rows, n_steps - 1))
+    s = _walk(np.full(rows, float(s0)), draws, mu * dt, step)
+
+    return s[0] if n_paths is None else s
+
+
+def _walk(start: np.ndarray, draws: np.ndarray, drift: float, step: float) -> np.ndarray:
+    """
+    Pfade (rows, m+1) ab start (rows,) aus draws (rows, m), gerechnet wie der Loop:
+        s[t] = (s[t-1] + mu*dt) + sign*step
+    np.cumsum akkumuliert sequenziell; Drift und ±step werden daher als eigene Summanden
+    abwechselnd eingefügt und nur jeder zweite Zwischenwert behalten -> bitgleich zum Loop.
+    (Ein Inkrement drift ± step pro Step würde anders runden, sobald drift != 0.)
+    """
+    rows, m = draws.shape
+    # sign*step ist exakt ±step
+    signed = np.where(draws < 0.5, step, -step)
+    if drift == 0.0:
+        # s + 0.0 == s: ein Summand pro Step reicht
+        s = np.empty((rows, m + 1), dtype=float)
+        s[:, 0] = start
+        s[:, 1:] = signed
+        np.cumsum(s, axis=1, out=s)
+        return s
+    buf = np.empty((rows, 2 * m + 1), dtype=float)
+    buf[:, 0] = start
+    buf[:, 1::2] = drift
+    buf[:, 2::2] = signed
+    np.cumsum(buf, axis=1, out=buf)
+    return np.ascontiguousarray(buf[:, ::2])
+
+
+def iter_rw_paper_chunks(
+    *,
+    s0: float,
+    mu: float,
+    sigma: float,
+    dt: float,
+    n_steps: int,
+    rng: np.random.Generator,
+    chunk_size: int,
+) -> Iterator[np.ndarray]:
+    """
+    Gleicher Random Walk wie simulate_rw_paper, aber in Blöcken der Länge chunk_size
+    (letzter Block ggf. kürzer). Speicherbedarf O(chunk_size) statt O(n_steps).
+
+    Die Blöcke hintereinander gehängt sind bitgleich zu simulate_rw_paper(...) mit
+    gleichem rng-Zustand, und der RNG wird identisch verbraucht (n_steps-1 Draws).
     """
-    s = np.empty(n_steps, dtype=float)
-    s[0] = s0
+    if n_steps < 1:
+        raise ValueError("n_steps must be >= 1")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be >= 1")
 
     step = sigma * math.sqrt(dt)
-    for t in range(1, n_steps):
-        sign = 1.0 if rng.random() < 0.5 else -1.0
-        s[t] = s[t - 1] + mu * dt + sign * step
 
-    return s
+    last = None
+    for start in range(0, n_steps, chunk_size):
+        n = min(chunk_size, n_steps - start)
+        # Block-Anfang: s0 (erster Block) bzw. letzter Wert des Vorblocks als Anker
+        anchor = np.array([s0 if last is None else last], dtype=float)
+        draws = rng.random((1, n - 1 if last is None else n))
+        s = _walk(anchor, draws, mu * dt, step)[0]
+        if last is not None:
+            s = s[1:]
+        last = s[-1]
+        yield s
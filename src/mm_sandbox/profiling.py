@@ -0,0 +1,142 @@
+from __future__ import annotations
+import cProfile
+import io
+import json
+import linecache
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+from .simulator import hot_path_timer
+
+# Modi für --profile in run_backtest / run_scenarios
+PROFILE_MODES = ("cprofile", "tracemalloc", "lines")
+
+_PACKAGE_DIR = str(Path(__file__).resolve().parent)
+
+
+class LineSampler:
+    """
+    Sampling-Profiler auf Zeilenebene: ein Hintergrund-Thread liest alle interval Sekunden
+    den Stack des Ziel-Threads und zählt die innerste Zeile, die unter einem der roots liegt
+    (Default: das mm_sandbox-Paket). Zeit in numpy/pandas landet so auf der aufrufenden
+    Zeile im Simulator.
+
+    Kein Tracing -> der profilierte Code läuft unverändert; der Sampler braucht nur
+    periodisch den GIL (Genauigkeit ~ interval, bei kurzen Runs entsprechend grob).
+    """
+
+    def __init__(self, interval: float = 0.001, roots: tuple[str, ...] = (_PACKAGE_DIR,)):
+        self.interval = interval
+        self.roots = roots
+        self.counts: Counter[tuple[str, int, str]] = Counter()
+        self.n_samples = 0
+        self._target: int | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._target = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="LineSampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            self.n_samples += 1
+            while frame is not None:
+                filename = frame.f_code.co_filename
+                if filename.startswith(self.roots):
+                    self.counts[(filename, frame.f_lineno, frame.f_code.co_name)] += 1
+                    break
+                frame = frame.f_back
+
+    def report(self, top: int = 40) -> str:
+        """Tabelle der häufigsten Zeilen: Anteil an allen Samples, Ort und Quelltext."""
+        lines = [f"{self.n_samples} samples, interval {self.interval * 1e3:g} ms", ""]
+        lines.append(f"{'share':>7} {'samples':>8}  location")
+        for (filename, lineno, func), n in self.counts.most_common(top):
+            share = n / self.n_samples if self.n_samples else 0.0
+            source = linecache.getline(filename, lineno).strip()
+            lines.append(f"{share:7.1%} {n:8d}  {Path(filename).name}:{lineno} ({func})  {source}")
+        return "\n".join(lines) + "\n"
+
+
+@contextmanager
+def profile_run(mode: str | None, outdir: str | Path) -> Iterator[dict]:
+    """
+    Profiliert den with-Block und schreibt das Ergebnis nach outdir:
+
+      "cprofile"   : profile.pstats (für snakeviz/pstats) + profile.txt (Top nach cumtime)
+      "tracemalloc": tracemalloc.txt (Top-Allokationen nach Zeile, aktueller + Peak-Speicher)
+      "lines"      : profile_lines.txt (gesampelte Zeilen im mm_sandbox-Paket)
+
+    In jedem Modus zusätzlich hot_path.json (quote/fill/book des Simulations-Loops, siehe
+    simulator.hot_path_timer). mode=None -> kein Profiling, nichts wird geschrieben.
+    Gibt ein dict zurück, das nach dem Block den Hot-Path-Breakdown enthält.
+    """
+    if mode is None:
+        yield {}
+        return
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"unknown profile mode {mode!r}; expected one of {PROFILE_MODES}")
+
+    outdir = Path(outdir)
+    outdir.mkdir(parents=True, exist_ok=True)
+    summary: dict = {"mode": mode}
+
+    profiler = cProfile.Profile() if mode == "cprofile" else None
+    sampler = LineSampler() if mode == "lines" else None
+    started_tracemalloc = False
+    if mode == "tracemalloc" and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        started_tracemalloc = True
+
+    t0 = time.perf_counter()
+    with hot_path_timer() as hot:
+        if profiler is not None:
+            profiler.enable()
+        if sampler is not None:
+            sampler.start()
+        try:
+            yield summary
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            if sampler is not None:
+                sampler.stop()
+            if mode == "tracemalloc":
+                snapshot = tracemalloc.take_snapshot()
+                current, peak = tracemalloc.get_traced_memory()
+                if started_tracemalloc:
+                    tracemalloc.stop()
+    summary.update(wall_s=time.perf_counter() - t0, hot_path=hot.as_dict())
+
+    if profiler is not None:
+        profiler.dump_stats(outdir / "profile.pstats")
+        buf = io.StringIO()
+        pstats.Stats(profiler, stream=buf).sort_stats("cumulative").print_stats(40)
+        (outdir / "profile.txt").write_text(buf.getvalue(), encoding="utf-8")
+    if sampler is not None:
+        (outdir / "profile_lines.txt").write_text(sampler.report(), encoding="utf-8")
+    if mode == "tracemalloc":
+        stats = snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)]).statistics("lineno")
+        lines = [f"current {current / 2**20:.1f} MB, peak {peak / 2**20:.1f} MB", ""]
+        lines += [str(stat) for stat in stats[:30]]
+        (outdir / "tracemalloc.txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+        summary.update(traced_current_mb=current / 2**20, traced_peak_mb=peak / 2**20)
+
+    (outdir / "hot_path.json").write_text(json.dumps(summary, indent=2), encoding="utf-8")
@@ -0,0 +1,149 @@
+from __future__ import annotations
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+TIMESERIES_COLUMNS = ["t", "mid", "r", "bid", "ask", "half_spread", "inventory", "pnl"]
+TRADE_COLUMNS = ["t", "side", "price", "size", "mid"]
+
+# Seite eines Fills aus Sicht des Market Makers, im Trade-Log als int8 kodiert
+SIDE_BUY = 1
+SIDE_SELL = -1
+
+# Ein Trade = 32 Bytes (aligned, damit die Felder als memoryview beschreibbar sind)
+TRADE_DTYPE = np.dtype(
+    [("t", np.int32), ("side", np.int8), ("price", np.float64), ("size", np.float64), ("mid", np.float64)],
+    align=True,
+)
+
+
+class TradeLog:
+    """
+    Wachsendes strukturiertes Array (TRADE_DTYPE) für die Fills eines Blocks.
+
+    append() schreibt über memoryviews der Felder (keine Objekte pro Trade, kein Boxing
+    in numpy-Skalare); bei voller Kapazität wird das Array verdoppelt (amortisiert O(1)).
+    DataFrame / Spalten-Arrays im bisherigen Format erst auf Anfrage (columns, frame).
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._arr = np.zeros(max(int(capacity), 1), dtype=TRADE_DTYPE)
+        self._n = 0
+        self._bind()
+
+    def _bind(self) -> None:
+        arr = self._arr
+        self._t, self._side, self._price, self._size, self._mid = (memoryview(arr[name]) for name in TRADE_DTYPE.names)
+
+    def append(self, t: int, side: int, price: float, size: float, mid: float) -> None:
+        i = self._n
+        if i == self._arr.size:
+            self._arr = np.concatenate([self._arr, np.zeros(self._arr.size, dtype=TRADE_DTYPE)])
+            self._bind()
+        self._t[i] = t
+        self._side[i] = side
+        self._price[i] = price
+        self._size[i] = size
+        self._mid[i] = mid
+        self._n = i + 1
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def array(self) -> np.ndarray:
+        """Die bisher geschriebenen Trades (View, TRADE_DTYPE)."""
+        return self._arr[: self._n]
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Spalten wie bisher in Blöcken/Trades-Tabellen: t int64, side "buy"/"sell" (object), floats."""
+        return trade_columns(self.array)
+
+    def frame(self) -> pd.DataFrame:
+        """Trades als DataFrame (leerer DataFrame ohne Spalten, wenn es keine Fills gab)."""
+        return pd.DataFrame(self.columns()) if self._n else pd.DataFrame()
+
+
+class PathLog:
+    """
+    Wachsende Timeseries-Spalten für recording="decimated": nur die behaltenen Steps
+    werden geschrieben (t + Quote-/Pfad-Spalten, über memoryviews), Speicher ~ Anzahl
+    behaltener Zeilen statt n_steps. Verdopplung bei voller Kapazität wie TradeLog.
+    """
+
+    PATH_COLUMNS = ("r", "bid", "ask", "half_spread", "inventory", "pnl")
+
+    def __init__(self, capacity: int = 1024):
+        self._cols = {"t": np.zeros(max(int(capacity), 1), dtype=np.int64)}
+        self._cols.update({c: np.zeros(self._cols["t"].size) for c in self.PATH_COLUMNS})
+        self._n = 0
+        self._bind()
+
+    def _bind(self) -> None:
+        self._t, self._r, self._bid, self._ask, self._half_spread, self._inventory, self._pnl = (
+            memoryview(a) for a in self._cols.values()
+        )
+
+    def append(self, t: int, r: float, bid: float, ask: float, half_spread: float, inventory: float, pnl: float) -> None:
+        i = self._n
+        if i == self._t.shape[0]:
+            self._cols = {c: np.concatenate([a, np.zeros_like(a)]) for c, a in self._cols.items()}
+            self._bind()
+        self._t[i] = t
+        self._r[i] = r
+        self._bid[i] = bid
+        self._ask[i] = ask
+        self._half_spread[i] = half_spread
+        self._inventory[i] = inventory
+        self._pnl[i] = pnl
+        self._n = i + 1
+
+    def __len__(self) -> int:
+        return self._n
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Geschriebene Zeilen als Spalten-Dict (Kopien, auf die Länge gekürzt)."""
+        return {c: a[: self._n].copy() for c, a in self._cols.items()}
+
+
+def trade_columns(trades: np.ndarray) -> Dict[str, np.ndarray]:
+    """Strukturiertes Trade-Array (TRADE_DTYPE) -> Spalten-Dict im Tabellen-Format."""
+    return {
+        "t": trades["t"].astype(np.int64),
+        "side": np.where(trades["side"] == SIDE_BUY, "buy", "sell").astype(object),
+        "price": trades["price"].copy(),
+        "size": trades["size"].copy(),
+        "mid": trades["mid"].copy(),
+    }
+
+
+def recorded_steps(level: str, n_steps: int, every: int, fill_t) -> np.ndarray | None:
+    """
+    Step-Indizes, die eine Recording-Stufe (MMConfig.recording) in der Timeseries behält:
+      "full"     -> None (alle)
+      "decimated"-> jeder every-te Step, jeder Fill-Step und der letzte Step (sortiert)
+      "kpi_only" -> keine (leeres Array)
+    """
+    if level == "full":
+        return None
+    if level == "kpi_only" or n_steps == 0:
+        return np.empty(0, dtype=np.int64)
+    if level != "decimated":
+        raise ValueError(f"unknown recording level {level!r}")
+    rows = np.concatenate([np.arange(0, n_steps, every), np.asarray(fill_t, dtype=np.int64), [n_steps - 1]])
+    return np.unique(rows)
+
+
+def timeseries_frame(level: str, every: int, columns: Dict[str, np.ndarray], fill_t) -> pd.DataFrame:
+    """
+    Timeseries-DataFrame einer Recording-Stufe aus Spalten-Arrays in voller Länge.
+    Bei "kpi_only" dürfen die Quote-/Pfad-Spalten fehlen (es wird nichts aufgezeichnet).
+    """
+    n_steps = columns["mid"].size
+    rows = recorded_steps(level, n_steps, every, fill_t)
+    if rows is None:
+        return pd.DataFrame(columns)
+    if rows.size == 0:
+        return pd.DataFrame({c: np.empty(0, dtype=np.int64 if c == "t" else float) for c in TIMESERIES_COLUMNS})
+    return pd.DataFrame({c: columns[c][rows] for c in TIMESERIES_COLUMNS})
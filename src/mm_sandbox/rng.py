@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import numpy as np
+
+from .config import MMConfig
+
+# Zwecke, für die getrennte Streams gezogen werden (Index = zweite Stelle im spawn_key)
+RNG_PURPOSES = ("price", "fills")
+
+
+def stream_seed(seed: int, purpose: str, path: int = 0) -> np.random.SeedSequence:
+    """
+    SeedSequence eines Streams: Wurzel SeedSequence(seed), pro Pfad ein Kind, pro Zweck
+    ein Enkel. Identisch zu SeedSequence(seed).spawn(path + 1)[path].spawn(2)[i_purpose],
+    ohne die Geschwister erzeugen zu müssen -> Pfad p hängt nicht von der Batch-Größe ab.
+    """
+    if purpose not in RNG_PURPOSES:
+        raise ValueError(f"unknown rng purpose {purpose!r}; expected one of {RNG_PURPOSES}")
+    if path < 0:
+        raise ValueError("path must be >= 0")
+    return np.random.SeedSequence(seed, spawn_key=(path, RNG_PURPOSES.index(purpose)))
+
+
+def stream(seed: int, purpose: str, path: int = 0, skip: int = 0) -> np.random.Generator:
+    """
+    Generator für (seed, purpose, path), um skip Doubles vorgespult (PCG64.advance, O(log skip)).
+    Ein Block, der bei Step t0 beginnt, nimmt z.B. stream(seed, "fills", skip=t0).
+    """
+    bit_gen = np.random.PCG64(stream_seed(seed, purpose, path))
+    if skip:
+        bit_gen.advance(skip)
+    return np.random.Generator(bit_gen)
+
+
+def legacy_stream(seed: int, skip: int = 0) -> np.random.Generator:
+    """np.random.default_rng(seed), um skip Doubles vorgespult (bisheriges Ein-Stream-Layout)."""
+    bit_gen = np.random.PCG64(seed)
+    if skip:
+        bit_gen.advance(skip)
+    return np.random.Generator(bit_gen)
+
+
+def run_generators(cfg: MMConfig, path: int = 0, n_paths: int = 1) -> tuple[np.random.Generator, np.random.Generator]:
+    """
+    (price_rng, fill_rng) für Pfad path eines Runs.
+
+    cfg.rng_layout == "streams": eigene Streams pro Pfad und Zweck (stream_seed).
+    cfg.rng_layout == "legacy" : ein Stream aus cfg.seed; erst n_paths Mid-Pfade
+        (je n_steps-1 Draws), dann die Fill-Draws. Der Fill-Generator ist eine Kopie,
+        die hinter alle Preis-Draws gesprungen ist -> gleiche Werte wie ein geteilter
+        Generator, auch wenn Preis und Fills blockweise abwechselnd gezogen werden.
+        Nur path=0 (Batches ziehen im Legacy-Layout alle Pfade aus einem Stream).
+    """
+    if cfg.rng_layout == "streams":
+        return stream(cfg.seed, "price", path), stream(cfg.seed, "fills", path)
+    if path != 0:
+        raise ValueError("rng_layout='legacy' has a single stream; use path=0 and n_paths")
+    return legacy_stream(cfg.seed), legacy_stream(cfg.seed, skip=n_paths * (cfg.n_steps - 1))
+
+
+def stream_layout(cfg: MMConfig) -> dict:
+    """Beschreibung des RNG-Layouts für config_used.yaml (reicht zum Nachbauen der Generatoren)."""
+    if cfg.rng_layout == "streams":
+        return {
+            "layout": "streams",
+            "bit_generator": "PCG64",
+            "root": {"entropy": cfg.seed},
+            "spawn_key": ["path", "purpose"],
+            "purposes": {name: i for i, name in enumerate(RNG_PURPOSES)},
+        }
+    return {
+        "layout": "legacy",
+        "bit_generator": "PCG64",
+        "seed": cfg.seed,
+        "order": ["price: n_paths x (n_steps-1) doubles", "fills: remaining draws"],
+    }
@@ -0,0 +1,89 @@
+from __future__ import annotations
+import time
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from .config import MMConfig
+from .simulator import _lap, run_simulation, simulate_inputs
+
+
+class SharedPaths:
+    """
+    Mid-Pfad + Fill-Uniforms eines Szenarios einmal erzeugt und in einem
+    multiprocessing.shared_memory-Block abgelegt (float64, Form (2, n_steps)):
+      Zeile 0 = mids, Zeile 1 = uniforms (wie simulator.simulate_inputs).
+
+    Der erzeugende Prozess besitzt den Block (close + unlink über close() bzw. with);
+    Worker bekommen nur handle (picklebar, ein paar Bytes) und rechnen mit
+    run_shared(...) direkt auf dem Puffer, ohne Kopie und ohne die Pfade neu zu ziehen.
+    """
+
+    def __init__(self, cfg: MMConfig):
+        if cfg.engine != "discrete":
+            raise ValueError("shared paths require engine='discrete'")
+        self.n_steps = cfg.n_steps
+        t_start = time.perf_counter()
+        mids, uniforms = simulate_inputs(cfg)
+        self._shm = shared_memory.SharedMemory(create=True, size=2 * self.n_steps * 8)
+        self.name = self._shm.name
+        buf = np.ndarray((2, self.n_steps), dtype=np.float64, buffer=self._shm.buf)
+        buf[0] = mids
+        buf[1] = uniforms
+        del buf, mids, uniforms
+        # Zeit der einmaligen Erzeugung (für Telemetrie im Elternprozess)
+        self.generate_s = time.perf_counter() - t_start
+
+    @property
+    def handle(self) -> Dict[str, Any]:
+        return {"name": self.name, "n_steps": self.n_steps}
+
+    def close(self) -> None:
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self) -> "SharedPaths":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def run_shared(
+    handle: Dict[str, Any],
+    cfg: MMConfig,
+    *,
+    gammas: Sequence[float] | None = None,
+    timings: Dict[str, float] | None = None,
+) -> Dict[str, Any] | List[Dict[str, Any]]:
+    """
+    run_simulation(cfg, gammas=...) auf den Pfaden eines SharedPaths-Blocks (per Name
+    angehängt, read-only, zero-copy). Ergebnis identisch zum Run ohne Shared Memory,
+    sofern cfg dieselben Zufalls-Eingaben hat wie die Config, mit der der Block erzeugt wurde
+    (gleicher seed/rng_layout/n_steps/mu/sigma/dt/s0; gamma darf abweichen).
+    """
+    if handle["n_steps"] != cfg.n_steps:
+        raise ValueError("shared paths were generated for a different n_steps")
+    t_start = time.perf_counter()
+    shm = _attach(handle["name"])
+    buf = np.ndarray((2, handle["n_steps"]), dtype=np.float64, buffer=shm.buf)
+    try:
+        buf.flags.writeable = False
+        _lap(timings, "attach_s", t_start)
+        # Ergebnis-Tabellen und res["mid"] (recording != "full") sind Kopien -> nach dem Run hält nichts mehr den Puffer
+        return run_simulation(cfg, gammas=gammas, timings=timings, mids=buf[0], uniforms=buf[1])
+    finally:
+        del buf
+        shm.close()
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """
+    An einen bestehenden Block anhängen. Pool-Worker sind Kindprozesse und teilen den
+    resource_tracker des Elternprozesses -> die Anmeldung hier ist ein No-op, entfernt
+    wird der Block erst durch SharedPaths.close() im Elternprozess.
+    """
+    return shared_memory.SharedMemory(name=name)
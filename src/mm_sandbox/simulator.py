@@ -1,22 +1,81 @@
 from __future__ import annotations
 import math
-from dataclasses import dataclass
-from typing import Any, Dict, List
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Sequence
 
 import numpy as np
 import pandas as pd
 
 from .config import MMConfig
-from .price_process import simulate_rw_paper
-from .strategy import make_quote_as, Quote
+from .price_process import iter_rw_paper_chunks, simulate_rw_paper
+from .recording import SIDE_BUY, SIDE_SELL, TIMESERIES_COLUMNS, PathLog, TradeLog, timeseries_frame
+from .rng import run_generators
+from .tape import replay_tape
+from .strategy import QuoteEngine, liquidity_spread, make_quotes_as
+
+# Versions-Tag der Simulationslogik: erhöhen, sobald sich Ergebnisse für dieselbe Config
+# ändern (z.B. RNG-Layout, Quote-/Fill-Regeln, KPI-Set in summary.json).
+# Teil des Cache-Keys (mm_sandbox.cache).
+SIMULATOR_VERSION = "3"
+
+# Abschnitte des Simulations-Loops für den Hot-Path-Timer
+HOT_PATH_SECTIONS = ("quote", "fill", "book")
+
+
+class HotPathTimer:
+    """
+    Kumulierte Wall-Time der Loop-Abschnitte über alle Runs, solange aktiv:
+      "quote": Reservation Price + Spread (QuoteEngine / make_quotes_as)
+      "fill" : Fill-Wahrscheinlichkeiten bzw. Hazard + Fill-Entscheidung
+      "book" : Inventory/Cash-Update, Trades und Pfad-Aufzeichnung
+    steps zählt die simulierten Steps (pro Pfad-Zeile einmal, auch bei Gamma-Sweeps).
+    """
+
+    def __init__(self) -> None:
+        self.seconds: Dict[str, float] = dict.fromkeys(HOT_PATH_SECTIONS, 0.0)
+        self.steps = 0
+
+    def add(self, quote: float, fill: float, book: float, steps: int) -> None:
+        self.seconds["quote"] += quote
+        self.seconds["fill"] += fill
+        self.seconds["book"] += book
+        self.steps += steps
+
+    def as_dict(self) -> Dict[str, Any]:
+        total = sum(self.seconds.values())
+        return {
+            "steps": self.steps,
+            "total_s": total,
+            **{f"{name}_s": sec for name, sec in self.seconds.items()},
+            **{f"{name}_ns_per_step": sec * 1e9 / self.steps if self.steps else math.nan for name, sec in self.seconds.items()},
+        }
+
+
+# aktiver Timer (None = aus); die Loops lesen ihn einmal pro Aufruf, nicht pro Step
+_HOT_PATH: HotPathTimer | None = None
+
+
+@contextmanager
+def hot_path_timer() -> Iterator[HotPathTimer]:
+    """
+    Hot-Path-Timer für alle Simulationen innerhalb des with-Blocks (prozessweit):
+
+        with hot_path_timer() as hot:
+            run_simulation(cfg)
+        hot.as_dict()  # quote_s, fill_s, book_s, ns pro Step
+
+    Ohne aktiven Timer laufen die Loops ohne Uhr-Aufrufe (nur ein None-Check pro Abschnitt).
+    """
+    global _HOT_PATH
+    prev = _HOT_PATH
+    timer = HotPathTimer()
+    _HOT_PATH = timer
+    try:
+        yield timer
+    finally:
+        _HOT_PATH = prev
 
-@dataclass
-class Trade:
-    t: int
-    side: str   # "buy" or "sell" from the market maker perspective
-    price: float
-    size: float
-    mid: float
 
 def fill_prob_paper(A: float, k: float, delta: float, dt: float) -> float:
     """
@@ -26,97 +85,757 @@ def fill_prob_paper(A: float, k: float, delta: float, dt: float) -> float:
     lam = A * math.exp(-k * max(delta, 0.0))
     return min(lam * dt, 1.0)
 
-def run_simulation(cfg: MMConfig) -> Dict[str, Any]:
-    rng = np.random.default_rng(cfg.seed)
+def run_simulation(
+    cfg: MMConfig,
+    *,
+    gammas: Sequence[float] | None = None,
+    timings: Dict[str, float] | None = None,
+    mids: np.ndarray | None = None,
+    uniforms: np.ndarray | None = None,
+) -> Dict[str, Any] | List[Dict[str, Any]]:
+    """
+    Ein Simulations-Run (Preisprozess + Quotes + Fills -> Timeseries & Trades).
+
+    gammas:
+        None     -> ein Run mit cfg.gamma, Rückgabe: Ergebnis-Dict.
+        Sequenz  -> alle gammas in einem Durchlauf gegen denselben Mid-Pfad und dieselben
+                    Fill-Uniforms (common random numbers). Rückgabe: Liste von Ergebnis-Dicts
+                    in der Reihenfolge von gammas; jedes Dict ist identisch zu
+                    run_simulation(cfg mit gamma=g).
+    timings:
+        optionales Dict; addiert die Wall-Time der Phasen in Sekunden:
+        "price_s" (Mid-Pfad bzw. Tape-Lesen + Fill-Uniforms) und "loop_s" (Quotes/Fills, Ergebnis-Tabellen).
+    mids, uniforms:
+        optional vorab erzeugter Mid-Pfad und Fill-Uniforms (je Länge n_steps, z.B. aus
+        simulate_inputs oder einem Shared-Memory-Block, siehe mm_sandbox.shm). Werden nur
+        gelesen; Ergebnis identisch zum Run, der sie selbst erzeugt. Nur engine="discrete".
+    """
+    if (mids is None) != (uniforms is None):
+        raise ValueError("mids and uniforms must be given together")
+    if cfg.engine == "event":
+        if mids is not None:
+            raise ValueError("precomputed mids/uniforms require engine='discrete'")
+        if gammas is not None:
+            return [run_simulation_event(cfg.model_copy(update={"gamma": g}), timings=timings) for g in gammas]
+        return run_simulation_event(cfg, timings=timings)
+    if gammas is not None:
+        return _run_simulation_gammas(cfg, gammas, timings=timings, mids=mids, uniforms=uniforms)
+
+    _check_horizon(cfg)
+    mids, uniforms, t_price = _inputs(cfg, timings, mids, uniforms)
+    res = _run_discrete(cfg, mids, uniforms)
+    _lap(timings, "loop_s", t_price)
+    return res
+
 
-    mids = simulate_rw_paper(
+def _run_discrete(cfg: MMConfig, mids: np.ndarray, uniforms: np.ndarray) -> Dict[str, Any]:
+    """Skalarer Loop über den ganzen Horizont (ein Block) -> Ergebnis-Dict von run_simulation."""
+    state = _initial_state()
+    chunk = _simulate_chunk(cfg, state, mids, uniforms, t0=0, recording=cfg.recording, record_every=cfg.record_every)
+
+    # Block enthält bereits nur die Zeilen der Recording-Stufe
+    ts = pd.DataFrame(chunk["timeseries"])
+    trades_df = pd.DataFrame(chunk["trades"]) if chunk["trades"]["t"].size else pd.DataFrame()
+
+    final_pnl = state["cash"] + state["inventory"] * float(mids[-1])
+
+    return _with_mid(cfg, {
+        "timeseries": ts,
+        "trades": trades_df,
+        "final_inventory": state["inventory"],
+        "final_cash": state["cash"],
+        "final_pnl": float(final_pnl),
+    }, mids)
+
+
+def iter_simulation_chunks(
+    cfg: MMConfig,
+    chunk_size: int = 100_000,
+    timings: Dict[str, float] | None = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Streaming-Variante von run_simulation: liefert Blöcke von höchstens chunk_size Steps.
+    Speicherbedarf O(chunk_size), unabhängig von n_steps.
+
+    Jeder Block ist ein Dict:
+        "t0"        : erster Step des Blocks
+        "timeseries": Spalten-Arrays (t, mid, r, bid, ask, half_spread, inventory, pnl)
+        "trades"    : Spalten-Arrays (t, side, price, size, mid)
+        "state"     : Zustand nach dem Block (inventory, cash, prev_mid)
+
+    Die Blöcke hintereinander gehängt sind identisch zum In-Memory-Ergebnis von
+    run_simulation (für jede chunk_size): Mid-Pfad und Fill-Uniforms kommen aus getrennten
+    Generatoren (rng.run_generators; im Legacy-Layout ist der Fill-Generator eine per
+    advance() hinter die n_steps-1 Preis-Draws gesprungene Kopie des Streams).
+
+    timings: wie bei run_simulation ("price_s", "loop_s"), über alle Blöcke summiert.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be >= 1")
+    if cfg.engine != "discrete":
+        raise ValueError("streaming mode supports engine='discrete' only")
+    _check_horizon(cfg)
+
+    price_rng, fill_rng = run_generators(cfg)
+
+    if cfg.replay_path is not None:
+        # Replay: Tape blockweise lesen (Memory-Map / Batches), nie komplett im Speicher
+        mid_chunks = replay_tape(cfg).iter_chunks(chunk_size, stop=cfg.n_steps)
+    else:
+        mid_chunks = iter_rw_paper_chunks(
+            s0=cfg.s0,
+            mu=cfg.mu,
+            sigma=cfg.sigma,
+            dt=cfg.dt_seconds,
+            n_steps=cfg.n_steps,
+            rng=price_rng,
+            chunk_size=chunk_size,
+        )
+
+    state = _initial_state()
+    t0 = 0
+    while True:
+        t_start = time.perf_counter()
+        mids = next(mid_chunks, None)
+        if mids is None:
+            break
+        t_price = _lap(timings, "price_s", t_start)
+        uniforms = fill_rng.random(mids.size)
+        chunk = _simulate_chunk(cfg, state, mids, uniforms, t0=t0)
+        _lap(timings, "loop_s", t_price)
+        chunk["t0"] = t0
+        chunk["state"] = dict(state)
+        yield chunk
+        t0 += mids.size
+
+
+def run_simulation_streaming(
+    cfg: MMConfig,
+    sinks: Sequence[Any] = (),
+    chunk_size: int = 100_000,
+    timings: Dict[str, float] | None = None,
+) -> Dict[str, Any]:
+    """
+    Führt iter_simulation_chunks aus und reicht jeden Block an alle sinks weiter
+    (siehe mm_sandbox.sinks: Datei-Writer, Ring-Buffer, KPI-Akkumulator).
+    Hält selbst nur den aktuellen Block im Speicher.
+
+    timings: wie iter_simulation_chunks, plus "sink:<Klassenname>" pro Sink (consume + close).
+
+    Rückgabe: finale Kennzahlen wie bei run_simulation (ohne timeseries/trades).
+    """
+    state = _initial_state()
+    last_mid = cfg.s0
+    n_trades = 0
+    for chunk in iter_simulation_chunks(cfg, chunk_size=chunk_size, timings=timings):
+        for sink in sinks:
+            t_sink = time.perf_counter()
+            sink.consume(chunk)
+            _lap(timings, f"sink:{type(sink).__name__}", t_sink)
+        state = chunk["state"]
+        last_mid = float(chunk["timeseries"]["mid"][-1])
+        n_trades += int(chunk["trades"]["t"].size)
+
+    for sink in sinks:
+        t_sink = time.perf_counter()
+        sink.close()
+        _lap(timings, f"sink:{type(sink).__name__}", t_sink)
+
+    return {
+        "final_inventory": state["inventory"],
+        "final_cash": state["cash"],
+        "final_pnl": float(state["cash"] + state["inventory"] * last_mid),
+        "n_trades": n_trades,
+    }
+
+
+def simulate_inputs(cfg: MMConfig) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Zufalls-Eingaben eines diskreten Runs: Mid-Pfad und ein Fill-Uniform pro Step
+    (je Länge n_steps), genau wie run_simulation sie intern erzeugt.
+    """
+    price_rng, fill_rng = run_generators(cfg)
+    mids = _mid_path(cfg, price_rng)
+    # ein Uniform pro Step; als Block gezogen = gleiche Werte wie rng.random() im Loop
+    return mids, fill_rng.random(cfg.n_steps)
+
+
+def _mid_path(cfg: MMConfig, price_rng: np.random.Generator) -> np.ndarray:
+    """Mid-Pfad eines Runs: Random Walk aus price_rng oder die ersten n_steps Ticks des Replay-Tapes."""
+    if cfg.replay_path is not None:
+        return replay_tape(cfg).read(cfg.n_steps)
+    return simulate_rw_paper(
         s0=cfg.s0,
         mu=cfg.mu,
         sigma=cfg.sigma,
         dt=cfg.dt_seconds,
         n_steps=cfg.n_steps,
-        rng=rng,
+        rng=price_rng,
     )
 
-    inventory = 0.0
-    cash = 0.0
-    trades: List[Trade] = []
-    inventory_path = []
-    pnl_path = []
-    bid_path = []
-    ask_path = []
-    r_path = []
-    half_spread_path = []
 
-    dt = cfg.dt_seconds
+def _inputs(
+    cfg: MMConfig,
+    timings: Dict[str, float] | None,
+    mids: np.ndarray | None,
+    uniforms: np.ndarray | None,
+) -> tuple[np.ndarray, np.ndarray, float]:
+    """(mids, uniforms, Zeitpunkt nach der Preis-Phase): erzeugen oder vorgegebene prüfen."""
+    t_start = time.perf_counter()
+    if mids is None:
+        mids, uniforms = simulate_inputs(cfg)
+    elif mids.shape != (cfg.n_steps,) or uniforms.shape != (cfg.n_steps,):
+        raise ValueError(f"mids/uniforms must have shape ({cfg.n_steps},)")
+    return mids, uniforms, _lap(timings, "price_s", t_start)
 
-    for t in range(cfg.n_steps):
-        mid = float(mids[t])
 
-        T_steps = int(round(cfg.T_seconds / cfg.dt_seconds))
-        if T_steps <= 0:
-            raise ValueError("T_seconds too small vs dt_seconds")
+def _with_mid(cfg: MMConfig, res: Dict[str, Any], mids: np.ndarray) -> Dict[str, Any]:
+    """
+    Ohne vollständige Timeseries (recording != "full") hängt der ganze Mid-Pfad als
+    res["mid"] am Ergebnis -> KPIs/VaR bleiben exakt (metrics.kpi_timeseries).
+    Immer als Kopie: mids kann ein fremder Puffer sein (z.B. Shared-Memory-Block in
+    shm.run_shared, der nach dem Run geschlossen wird).
+    """
+    if cfg.recording != "full":
+        res["mid"] = np.array(mids, dtype=float)
+    return res
 
-        t_seconds = t * cfg.dt_seconds
-        tau_seconds = max(cfg.T_seconds - t_seconds, 0.0)  # Restzeit bis T
 
-        mid_quote = float(mids[t-1]) if t > 0 else float(mids[0])
-        q, r, half_spread = make_quote_as(
-            mid=mid_quote,
-            sigma=cfg.sigma,
-            inventory=inventory,
-            gamma=cfg.gamma,
-            k=cfg.k,
-            tau_seconds=tau_seconds,
-        )
+def _lap(timings: Dict[str, float] | None, key: str, t_start: float) -> float:
+    """Wall-Time seit t_start auf timings[key] addieren (falls timings gesetzt); gibt jetzt zurück."""
+    now = time.perf_counter()
+    if timings is not None:
+        timings[key] = timings.get(key, 0.0) + (now - t_start)
+    return now
 
-        # Logging für Plot/Erklärung
-        bid_path.append(q.bid)
-        ask_path.append(q.ask)
-        r_path.append(r)
-        half_spread_path.append(half_spread)
 
-        delta_bid = max(mid - q.bid, 0.0)
-        delta_ask = max(q.ask - mid, 0.0)
+def _check_horizon(cfg: MMConfig) -> None:
+    T_steps = int(round(cfg.T_seconds / cfg.dt_seconds))
+    if T_steps <= 0:
+        raise ValueError("T_seconds too small vs dt_seconds")
+
+
+def _initial_state() -> Dict[str, Any]:
+    # prev_mid=None -> im ersten Step wird auf den aktuellen Mid gequoted (wie t=0 im Paper-Loop)
+    return {"inventory": 0.0, "cash": 0.0, "prev_mid": None}
+
+
+def _simulate_chunk(
+    cfg: MMConfig,
+    state: Dict[str, Any],
+    mids: np.ndarray,
+    uniforms: np.ndarray,
+    t0: int,
+    recording: str = "full",
+    record_every: int = 1,
+) -> Dict[str, Any]:
+    """
+    Skalarer Paper-Loop über einen Block von Steps [t0, t0 + len(mids)).
+    Aktualisiert state (inventory, cash, prev_mid) in-place, damit der nächste Block
+    nahtlos anschließt.
+
+    recording (MMConfig.recording) bestimmt die Timeseries-Zeilen des Blocks:
+      "full"     : jeder Step, in vorab allokierte Arrays der Länge len(mids)
+      "decimated": nur Steps mit t % record_every == 0, Fill-Steps und der letzte Step
+                   des Blocks, direkt in wachsende Arrays (PathLog) -> Speicher ~ behaltene Zeilen
+      "kpi_only" : keine Zeilen (leere Spalten), nur Trades + state
+    (Streaming-Blöcke nutzen immer "full".)
+    """
+    if recording not in ("full", "decimated", "kpi_only"):
+        raise ValueError(f"unknown recording level {recording!r}")
+    inventory = state["inventory"]
+    cash = state["cash"]
+    prev_mid = state["prev_mid"]
+
+    # Aufzeichnung in vorab allokierte Arrays; geschrieben/gelesen über memoryviews
+    # (Python-float rein/raus ohne numpy-Skalare), Trades in ein wachsendes strukturiertes Array
+    n = mids.size
+    mids = np.ascontiguousarray(mids, dtype=float)
+    mid_v = memoryview(mids)
+    u_v = memoryview(np.ascontiguousarray(uniforms, dtype=float))
+    full = recording == "full"
+    paths = {name: np.empty(n if full else 0) for name in PathLog.PATH_COLUMNS}
+    r_v, bid_v, ask_v, half_spread_v, inventory_v, pnl_v = (memoryview(a) for a in paths.values())
+    rows = PathLog(n // record_every + 64) if recording == "decimated" else None
+    every = record_every
+    last = n - 1
+    trades = TradeLog()
+
+    dt = cfg.dt_seconds
+    size = cfg.trade_size
+    fee = cfg.fee_bps / 10_000.0
+
+    # Quotes: invariante AS-Terme einmal pro Block, tau/Halbspread als Tabelle über die Steps des Blocks
+    engine = QuoteEngine(sigma=cfg.sigma, gamma=cfg.gamma, k=cfg.k)
+    engine.set_tau_grid(T_seconds=cfg.T_seconds, dt_seconds=dt, t0=t0, n_steps=n)
+    quote = engine.quote_step
+
+    # Hot-Path-Timer: Uhr nur, wenn aktiv (sonst ein None-Check pro Abschnitt)
+    hot = _HOT_PATH
+    clock = time.perf_counter
+    quote_s = fill_s = book_s = 0.0
+
+    for j in range(n):
+        if hot is not None:
+            c0 = clock()
+        t = t0 + j
+        mid = mid_v[j]
+
+        # gequoted wird auf den Mid des Vor-Steps (t=0: aktueller Mid); tau = max(T - t*dt, 0)
+        mid_quote = prev_mid if prev_mid is not None else mid
+        quote(mid_quote, inventory, j)
+        bid = engine.bid
+        ask = engine.ask
+        if hot is not None:
+            c1 = clock()
+
+        delta_bid = max(mid - bid, 0.0)
+        delta_ask = max(ask - mid, 0.0)
 
         p_bid = fill_prob_paper(cfg.A, cfg.k, delta_bid, dt)
         p_ask = fill_prob_paper(cfg.A, cfg.k, delta_ask, dt)
-        
-        u = rng.random()
+
+        u = u_v[j]
         p_total = min(p_bid + p_ask, 1.0)
+        if hot is not None:
+            c2 = clock()
 
-        if u < p_total:
+        filled = u < p_total
+        if filled:
             # choose side proportional to p_bid vs p_ask
             if u < p_ask:
-                # BID filled -> buy
-                price = q.ask
-                size = cfg.trade_size
+                # ask filled -> sell
+                price = ask
                 inventory -= size
                 cash += price * size
-                cash -= price * size * (cfg.fee_bps / 10_000.0)
-                trades.append(Trade(t=t, side="sell", price=price, size=size, mid=mid))
+                cash -= price * size * fee
+                trades.append(t, SIDE_SELL, price, size, mid)
             else:
-                # bid filled -> sell
-                price = q.bid
-                size = cfg.trade_size
+                # bid filled -> buy
+                price = bid
                 inventory += size
                 cash -= price * size
-                cash -= price * size * (cfg.fee_bps / 10_000.0)
-                trades.append(Trade(t=t, side="buy", price=price, size=size, mid=mid))
-                
+                cash -= price * size * fee
+                trades.append(t, SIDE_BUY, price, size, mid)
 
-        inventory_path.append(inventory)
-        pnl_path.append(cash + inventory * mid)
+        # Logging für Plot/Erklärung
+        if full:
+            bid_v[j] = bid
+            ask_v[j] = ask
+            r_v[j] = engine.r
+            half_spread_v[j] = engine.half_spread
+            inventory_v[j] = inventory
+            pnl_v[j] = cash + inventory * mid
+        elif rows is not None and (filled or t % every == 0 or j == last):
+            rows.append(t, engine.r, bid, ask, engine.half_spread, inventory, cash + inventory * mid)
+        prev_mid = mid
+        if hot is not None:
+            c3 = clock()
+            quote_s += c1 - c0
+            fill_s += c2 - c1
+            book_s += c3 - c2
 
-    ts = pd.DataFrame({"t": range(cfg.n_steps),"mid": mids,"r": r_path,"bid": bid_path,"ask": ask_path,"half_spread": half_spread_path,"inventory": inventory_path,"pnl": pnl_path,})
-    trades_df = pd.DataFrame([tr.__dict__ for tr in trades])
+    if hot is not None:
+        hot.add(quote_s, fill_s, book_s, n)
 
-    final_pnl = cash + inventory * float(mids[-1])
+    state["inventory"] = inventory
+    state["cash"] = cash
+    state["prev_mid"] = prev_mid
 
-    return {
+    if full:
+        timeseries = {"t": np.arange(t0, t0 + n), "mid": mids, **paths}
+    elif rows is not None:
+        cols = rows.columns()
+        timeseries = {"t": cols["t"], "mid": mids[cols["t"] - t0], **{c: cols[c] for c in PathLog.PATH_COLUMNS}}
+    else:
+        timeseries = {c: np.empty(0, dtype=np.int64 if c == "t" else float) for c in TIMESERIES_COLUMNS}
+    return {"timeseries": timeseries, "trades": trades.columns()}
+
+
+def run_simulation_event(cfg: MMConfig, timings: Dict[str, float] | None = None) -> Dict[str, Any]:
+    """
+    Event-getriebene Engine (cfg.engine == "event"): statt pro Step eine Fill-Entscheidung
+    zu ziehen, wird für jede Seite direkt der nächste Fill-Zeitpunkt gesampelt.
+
+    Fills pro Seite sind ein inhomogener Poisson-Prozess mit Intensität
+    λ(δ_t) = A * exp(-k * δ_t) (wie fill_prob_paper). Zwischen zwei Fills ist das Inventory
+    konstant, d.h. Quotes und δ_t hängen nur von Mid-Pfad und tau ab und werden für ein
+    Fenster künftiger Steps vektorisiert berechnet. Pro Seite wird E ~ Exp(1) gezogen;
+    der Fill liegt im ersten Step, in dem die kumulierte Hazard Σ λ(δ_s)*dt >= E ist.
+    Die Python-Schleife läuft damit einmal pro Fill (plus wachsende Fenster ohne Fill),
+    nicht einmal pro Step.
+
+    Für dt -> 0 stimmt die Verteilung mit dem diskreten Loop überein (dort
+    P(Fill im Step) = min((λ_bid + λ_ask) * dt, 1)); bei endlichem dt gibt es Abweichungen
+    der Ordnung λ*dt. Höchstens ein Fill pro Step, wie im diskreten Loop.
+
+    RNG: Mid-Pfad aus dem Preis-Generator (wie run_simulation), je Fill-Event zwei
+    Exp(1)-Draws aus dem Fill-Generator (Legacy-Layout: derselbe Stream hinter dem Mid-Pfad).
+    Rückgabe im selben Format wie run_simulation (timings ebenso).
+    """
+    _check_horizon(cfg)
+    t_start = time.perf_counter()
+    price_rng, rng = run_generators(cfg)
+
+    mids = _mid_path(cfg, price_rng)
+    t_price = _lap(timings, "price_s", t_start)
+
+    n_steps = cfg.n_steps
+    dt = cfg.dt_seconds
+    size = cfg.trade_size
+    fee = cfg.fee_bps / 10_000.0
+
+    # Mid und tau sind vorab bekannt -> alle Step-Größen, die nicht vom Inventory abhängen
+    tau = np.maximum(cfg.T_seconds - np.arange(n_steps) * dt, 0.0)
+    mid_quote = np.concatenate([mids[:1], mids[:-1]])
+    liquidity_term = liquidity_spread(cfg.gamma, cfg.k)
+
+    fills = np.zeros(n_steps, dtype=np.int8)
+    fill_cash: List[float] = [0.0]
+
+    inventory = 0.0
+    cash = 0.0
+    t = 0
+    window = _EVENT_MIN_WINDOW
+    e_bid, e_ask = rng.standard_exponential(2)
+
+    hot = _HOT_PATH
+    clock = time.perf_counter
+    quote_s = fill_s = book_s = 0.0
+
+    while t < n_steps:
+        if hot is not None:
+            c0 = clock()
+        end = min(t + window, n_steps)
+        inv = np.full(end - t, inventory)
+        q = make_quotes_as(
+            mid=mid_quote[t:end],
+            sigma=cfg.sigma,
+            inventory=inv,
+            gamma=cfg.gamma,
+            k=cfg.k,
+            tau_seconds=tau[t:end],
+            liquidity_term=liquidity_term,
+        )
+        bid, ask = q.bid, q.ask
+        if hot is not None:
+            c1 = clock()
+
+        mid = mids[t:end]
+        h_bid = cfg.A * np.exp(-cfg.k * np.maximum(mid - bid, 0.0)) * dt
+        h_ask = cfg.A * np.exp(-cfg.k * np.maximum(ask - mid, 0.0)) * dt
+        c_bid = np.cumsum(h_bid)
+        c_ask = np.cumsum(h_ask)
+        i_bid = int(np.searchsorted(c_bid, e_bid))
+        i_ask = int(np.searchsorted(c_ask, e_ask))
+
+        if i_bid >= c_bid.size and i_ask >= c_ask.size:
+            # kein Fill im Fenster: Rest-Hazard mitnehmen, Fenster vergrößern
+            e_bid -= c_bid[-1]
+            e_ask -= c_ask[-1]
+            t = end
+            window *= 2
+            if hot is not None:
+                quote_s += c1 - c0
+                fill_s += clock() - c1
+            continue
+
+        if i_bid == i_ask:
+            # beide Seiten im selben Step: die Seite, deren Schwelle früher im Step liegt
+            frac_bid = (e_bid - (c_bid[i_bid - 1] if i_bid else 0.0)) / h_bid[i_bid]
+            frac_ask = (e_ask - (c_ask[i_ask - 1] if i_ask else 0.0)) / h_ask[i_ask]
+            buy = frac_bid <= frac_ask
+        else:
+            buy = i_bid < i_ask
+        if hot is not None:
+            c2 = clock()
+
+        i = i_bid if buy else i_ask
+        if buy:
+            # bid filled -> buy
+            price = float(bid[i])
+            inventory += size
+            cash -= price * size
+        else:
+            # ask filled -> sell
+            price = float(ask[i])
+            inventory -= size
+            cash += price * size
+        cash -= price * size * fee
+
+        fills[t + i] = 1 if buy else -1
+        fill_cash.append(cash)
+
+        t = t + i + 1
+        window = max(_EVENT_MIN_WINDOW, 2 * (i + 1))
+        e_bid, e_ask = rng.standard_exponential(2)
+        if hot is not None:
+            c3 = clock()
+            quote_s += c1 - c0
+            fill_s += c2 - c1
+            book_s += c3 - c2
+
+    # Pfade aus den Fill-Events rekonstruieren (Inventory stückweise konstant)
+    if hot is not None:
+        c0 = clock()
+    inventory_path = size * np.cumsum(fills, dtype=float)
+    inventory_before = np.concatenate([[0.0], inventory_path[:-1]])
+    cash_path = np.asarray(fill_cash)[np.cumsum(fills != 0)]
+    q = make_quotes_as(
+        mid=mid_quote,
+        sigma=cfg.sigma,
+        inventory=inventory_before,
+        gamma=cfg.gamma,
+        k=cfg.k,
+        tau_seconds=tau,
+        liquidity_term=liquidity_term,
+    )
+    if hot is not None:
+        book_s += clock() - c0
+        hot.add(quote_s, fill_s, book_s, n_steps)
+
+    out = {
+        "mid": mids[None, :],
+        "r": q.r[None, :],
+        "bid": q.bid[None, :],
+        "ask": q.ask[None, :],
+        "half_spread": q.half_spread[None, :],
+        "inventory": inventory_path[None, :],
+        "pnl": (cash_path + inventory_path * mids)[None, :],
+        "fills": fills[None, :],
+        "final_inventory": np.array([inventory]),
+        "final_cash": np.array([cash]),
+        "final_pnl": np.array([cash + inventory * float(mids[-1])]),
+    }
+    result = _single_result(cfg, out, 0)
+    _lap(timings, "loop_s", t_price)
+    return result
+
+
+_EVENT_MIN_WINDOW = 64
+
+
+def run_simulation_batch(cfg: MMConfig, n_paths: int) -> Dict[str, Any]:
+    """
+    Monte-Carlo Batch: n_paths unabhängige Pfade derselben Config, alle Pfade werden
+    pro Zeitschritt gemeinsam als NumPy-Arrays der Form (n_paths,) fortgeschrieben.
+
+    RNG-Layout (cfg.rng_layout):
+        "legacy" : erst alle Mid-Pfade (n_paths, n_steps-1), dann alle Fill-Uniforms
+                   (n_paths, n_steps) aus einem Stream. Für n_paths=1 exakt der Verbrauch
+                   von run_simulation; die Pfade hängen aber von n_paths ab.
+        "streams": Pfad p nutzt die Streams (p, price) und (p, fills) -> Pfad p ist
+                   unabhängig von n_paths, Pfad 0 reproduziert den Einzel-Run.
+
+    Rückgabe: gestapelte Arrays (n_paths, n_steps) für mid/r/bid/ask/half_spread/
+    inventory/pnl, "fills" (+1 buy, -1 sell, 0 kein Fill) sowie pro Pfad
+    n_trades, final_inventory, final_cash, final_pnl.
+    """
+    if n_paths < 1:
+        raise ValueError("n_paths must be >= 1")
+    if cfg.replay_path is not None:
+        raise ValueError("run_simulation_batch simulates random paths; replay_path is not supported")
+
+    if cfg.rng_layout == "legacy":
+        price_rng, fill_rng = run_generators(cfg, n_paths=n_paths)
+        mids = simulate_rw_paper(
+            s0=cfg.s0,
+            mu=cfg.mu,
+            sigma=cfg.sigma,
+            dt=cfg.dt_seconds,
+            n_steps=cfg.n_steps,
+            rng=price_rng,
+            n_paths=n_paths,
+        )
+        uniforms = fill_rng.random((n_paths, cfg.n_steps))
+    else:
+        mids = np.empty((n_paths, cfg.n_steps))
+        uniforms = np.empty((n_paths, cfg.n_steps))
+        for p in range(n_paths):
+            price_rng, fill_rng = run_generators(cfg, path=p)
+            mids[p] = simulate_rw_paper(
+                s0=cfg.s0,
+                mu=cfg.mu,
+                sigma=cfg.sigma,
+                dt=cfg.dt_seconds,
+                n_steps=cfg.n_steps,
+                rng=price_rng,
+            )
+            uniforms[p] = fill_rng.random(cfg.n_steps)
+
+    return _simulate_paths(cfg, mids, uniforms)
+
+
+def _run_simulation_gammas(
+    cfg: MMConfig,
+    gammas: Sequence[float],
+    timings: Dict[str, float] | None = None,
+    mids: np.ndarray | None = None,
+    uniforms: np.ndarray | None = None,
+) -> List[Dict[str, Any]]:
+    """
+    Gamma-Sweep: Mid-Pfad + Uniform-Folge einmal erzeugt, dann der skalare Loop
+    (_simulate_chunk) einmal pro gamma darüber. Ein über gamma vektorisierter Loop
+    (_simulate_paths) lohnt sich bei ~5 gammas nicht: der NumPy-Overhead pro Step ist
+    größer als der skalare Step selbst (run_benchmarks: gamma_sweep vs. separate Runs).
+    """
+    gamma_arr = np.asarray(gammas, dtype=float)
+    if gamma_arr.ndim != 1 or gamma_arr.size == 0:
+        raise ValueError("gammas must be a non-empty 1-D sequence")
+    if np.any(gamma_arr <= 0):
+        raise ValueError("gammas must be > 0")
+
+    # gleiche Eingaben wie der Einzel-Run: Mid-Pfad, dann ein Uniform pro Step
+    mids, uniforms, t_price = _inputs(cfg, timings, mids, uniforms)
+
+    results = [_run_discrete(cfg.model_copy(update={"gamma": g}), mids, uniforms) for g in gamma_arr.tolist()]
+    _lap(timings, "loop_s", t_price)
+    return results
+
+
+def _single_result(cfg: MMConfig, out: Dict[str, Any], i: int) -> Dict[str, Any]:
+    """Zeile i aus _simulate_paths in das Ergebnis-Format von run_simulation übersetzen."""
+    mids = out["mid"][i if out["mid"].shape[0] > 1 else 0]
+    fills = out["fills"][i]
+    t_fill = np.flatnonzero(fills)
+
+    ts = timeseries_frame(cfg.recording, cfg.record_every, {
+        "t": np.arange(mids.size),
+        "mid": mids,
+        "r": out["r"][i],
+        "bid": out["bid"][i],
+        "ask": out["ask"][i],
+        "half_spread": out["half_spread"][i],
+        "inventory": out["inventory"][i],
+        "pnl": out["pnl"][i],
+    }, t_fill)
+
+    if t_fill.size:
+        is_buy = fills[t_fill] > 0
+        trades_df = pd.DataFrame({
+            "t": t_fill,
+            "side": np.where(is_buy, "buy", "sell"),
+            "price": np.where(is_buy, out["bid"][i, t_fill], out["ask"][i, t_fill]),
+            "size": cfg.trade_size,
+            "mid": mids[t_fill],
+        })
+    else:
+        trades_df = pd.DataFrame()
+
+    return _with_mid(cfg, {
         "timeseries": ts,
         "trades": trades_df,
+        "final_inventory": float(out["final_inventory"][i]),
+        "final_cash": float(out["final_cash"][i]),
+        "final_pnl": float(out["final_pnl"][i]),
+    }, mids)
+
+
+def _simulate_paths(
+    cfg: MMConfig,
+    mids: np.ndarray,
+    uniforms: np.ndarray,
+) -> Dict[str, Any]:
+    """
+    Vektorisierte Variante der Schleife aus run_simulation über eine Pfad-Achse
+    (Monte-Carlo Batch). mids und uniforms haben die Form (n_paths, n_steps) oder
+    (1, n_steps) und werden dann über alle Pfade geteilt.
+
+    Gleiche Rechenreihenfolge wie make_quote_as / fill_prob_paper, damit eine einzelne
+    Zeile dieselben Quotes und Fills liefert wie der skalare Loop.
+    """
+    gamma = cfg.gamma
+    n_steps = mids.shape[1]
+    n_paths = max(mids.shape[0], uniforms.shape[0])
+    dt = cfg.dt_seconds
+    liquidity_term = liquidity_spread(gamma, cfg.k)
+    fee = cfg.fee_bps / 10_000.0
+    size = cfg.trade_size
+
+    inventory = np.zeros(n_paths)
+    cash = np.zeros(n_paths)
+
+    r_path = np.empty((n_paths, n_steps))
+    bid_path = np.empty((n_paths, n_steps))
+    ask_path = np.empty((n_paths, n_steps))
+    half_spread_path = np.empty((n_paths, n_steps))
+    inventory_path = np.empty((n_paths, n_steps))
+    pnl_path = np.empty((n_paths, n_steps))
+    fills = np.zeros((n_paths, n_steps), dtype=np.int8)
+
+    hot = _HOT_PATH
+    clock = time.perf_counter
+    quote_s = fill_s = book_s = 0.0
+
+    for t in range(n_steps):
+        if hot is not None:
+            c0 = clock()
+        mid = mids[:, t]
+        mid_quote = mids[:, t - 1] if t > 0 else mids[:, 0]
+        tau_seconds = max(cfg.T_seconds - t * dt, 0.0)
+
+        q = make_quotes_as(
+            mid=mid_quote,
+            sigma=cfg.sigma,
+            inventory=inventory,
+            gamma=gamma,
+            k=cfg.k,
+            tau_seconds=tau_seconds,
+            liquidity_term=liquidity_term,
+        )
+        bid, ask = q.bid, q.ask
+        if hot is not None:
+            c1 = clock()
+
+        # Fill-Wahrscheinlichkeiten (siehe fill_prob_paper)
+        delta_bid = np.maximum(mid - bid, 0.0)
+        delta_ask = np.maximum(ask - mid, 0.0)
+        p_bid = np.minimum(cfg.A * np.exp(-cfg.k * delta_bid) * dt, 1.0)
+        p_ask = np.minimum(cfg.A * np.exp(-cfg.k * delta_ask) * dt, 1.0)
+
+        u = uniforms[:, t]
+        p_total = np.minimum(p_bid + p_ask, 1.0)
+
+        filled = u < p_total
+        sell = filled & (u < p_ask)
+        buy = filled & ~sell
+        if hot is not None:
+            c2 = clock()
+
+        r_path[:, t] = q.r
+        bid_path[:, t] = bid
+        ask_path[:, t] = ask
+        half_spread_path[:, t] = q.half_spread
+
+        notional = np.where(sell, ask, bid) * size
+        cash = np.where(sell, cash + notional, np.where(buy, cash - notional, cash))
+        cash = np.where(filled, cash - notional * fee, cash)
+        inventory = np.where(sell, inventory - size, np.where(buy, inventory + size, inventory))
+
+        fills[buy, t] = 1
+        fills[sell, t] = -1
+        inventory_path[:, t] = inventory
+        pnl_path[:, t] = cash + inventory * mid
+        if hot is not None:
+            c3 = clock()
+            quote_s += c1 - c0
+            fill_s += c2 - c1
+            book_s += c3 - c2
+
+    if hot is not None:
+        hot.add(quote_s, fill_s, book_s, n_paths * n_steps)
+
+    return {
+        "mid": mids,
+        "r": r_path,
+        "bid": bid_path,
+        "ask": ask_path,
+        "half_spread": half_spread_path,
+        "inventory": inventory_path,
+        "pnl": pnl_path,
+        "fills": fills,
+        "n_trades": np.count_nonzero(fills, axis=1),
         "final_inventory": inventory,
         "final_cash": cash,
-        "final_pnl": float(final_pnl),
+        "final_pnl": cash + inventory * mids[:, -1],
     }
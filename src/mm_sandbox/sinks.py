@@ -0,0 +1,145 @@
+from __future__ import annotations
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, Protocol
+
+import numpy as np
+import pandas as pd
+
+from .io import ensure_dir
+from .recording import TIMESERIES_COLUMNS, TRADE_COLUMNS
+
+
+class Sink(Protocol):
+    """
+    Empfänger für Blöcke aus simulator.iter_simulation_chunks.
+    consume() wird pro Block aufgerufen, close() einmal am Ende des Runs.
+    """
+
+    def consume(self, chunk: Dict[str, Any]) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class CsvSink:
+    """
+    Schreibt timeseries.csv und trades.csv blockweise (append) in outdir.
+    Die Dateien sind byte-identisch zu write_outputs(...) nach einem In-Memory-Run.
+    """
+
+    def __init__(self, outdir: str | Path):
+        out = ensure_dir(outdir)
+        self._ts_file = open(out / "timeseries.csv", "w", encoding="utf-8", newline="")
+        self._trades_file = open(out / "trades.csv", "w", encoding="utf-8", newline="")
+        self._ts_header = True
+        self._trades_header = True
+
+    def consume(self, chunk: Dict[str, Any]) -> None:
+        pd.DataFrame(chunk["timeseries"]).to_csv(self._ts_file, header=self._ts_header, index=False)
+        self._ts_header = False
+
+        if chunk["trades"]["t"].size:
+            pd.DataFrame(chunk["trades"]).to_csv(self._trades_file, header=self._trades_header, index=False)
+            self._trades_header = False
+
+    def close(self) -> None:
+        if self._trades_header:
+            # keine Trades im ganzen Run -> gleiche Ausgabe wie pd.DataFrame().to_csv
+            pd.DataFrame().to_csv(self._trades_file, index=False)
+        self._ts_file.close()
+        self._trades_file.close()
+
+
+class RingBufferSink:
+    """
+    Hält nur die letzten `capacity` Steps der Timeseries (und die letzten
+    `trade_capacity` Trades) im Speicher, z.B. für Live-Plots oder Debugging langer Runs.
+    """
+
+    def __init__(self, capacity: int, trade_capacity: int | None = None):
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self.capacity = int(capacity)
+        self._cols = {c: np.empty(self.capacity, dtype=np.int64 if c == "t" else float) for c in TIMESERIES_COLUMNS}
+        self._n_seen = 0
+        self._trades: deque = deque(maxlen=trade_capacity or self.capacity)
+
+    def consume(self, chunk: Dict[str, Any]) -> None:
+        ts = chunk["timeseries"]
+        n = ts["t"].size
+        # von einem Block größer als der Puffer reicht der Schwanz
+        take = min(n, self.capacity)
+        pos = (self._n_seen + n - take) % self.capacity
+        idx = (pos + np.arange(take)) % self.capacity
+        for c in TIMESERIES_COLUMNS:
+            self._cols[c][idx] = ts[c][n - take:]
+        self._n_seen += n
+
+        tr = chunk["trades"]
+        self._trades.extend(zip(*(tr[c] for c in TRADE_COLUMNS)))
+
+    def close(self) -> None:
+        pass
+
+    def timeseries(self) -> pd.DataFrame:
+        """Gepufferte Steps in zeitlicher Reihenfolge."""
+        n = min(self._n_seen, self.capacity)
+        start = (self._n_seen - n) % self.capacity
+        idx = (start + np.arange(n)) % self.capacity
+        return pd.DataFrame({c: self._cols[c][idx] for c in TIMESERIES_COLUMNS})
+
+    def trades(self) -> pd.DataFrame:
+        if not self._trades:
+            return pd.DataFrame()
+        return pd.DataFrame(list(self._trades), columns=TRADE_COLUMNS)
+
+
+class KpiSink:
+    """
+    Akkumuliert Kennzahlen blockweise, ohne Timeseries oder Trades zu behalten.
+    Ergebnis über result().
+    """
+
+    def __init__(self):
+        self.n_steps = 0
+        self.n_trades = 0
+        self.n_buys = 0
+        self.n_sells = 0
+        self.final_pnl = float("nan")
+        self.final_inventory = 0.0
+        self.max_abs_inventory = 0.0
+        self.min_pnl = float("inf")
+        self.max_pnl = float("-inf")
+
+    def consume(self, chunk: Dict[str, Any]) -> None:
+        ts = chunk["timeseries"]
+        inv = ts["inventory"]
+        pnl = ts["pnl"]
+        self.n_steps += int(inv.size)
+        self.final_pnl = float(pnl[-1])
+        self.final_inventory = float(inv[-1])
+        self.max_abs_inventory = max(self.max_abs_inventory, float(np.abs(inv).max()))
+        self.min_pnl = min(self.min_pnl, float(pnl.min()))
+        self.max_pnl = max(self.max_pnl, float(pnl.max()))
+
+        sides = chunk["trades"]["side"]
+        n_buys = int(np.count_nonzero(sides == "buy"))
+        self.n_trades += int(sides.size)
+        self.n_buys += n_buys
+        self.n_sells += int(sides.size) - n_buys
+
+    def close(self) -> None:
+        pass
+
+    def result(self) -> dict:
+        return {
+            "final_pnl": self.final_pnl,
+            "final_inventory": self.final_inventory,
+            "n_trades": self.n_trades,
+            "n_buys": self.n_buys,
+            "n_sells": self.n_sells,
+            "max_abs_inventory": self.max_abs_inventory,
+            "min_pnl": self.min_pnl,
+            "max_pnl": self.max_pnl,
+            "n_steps": self.n_steps,
+        }
@@ -0,0 +1,205 @@
+from __future__ import annotations
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+from typing import Iterable
+
+import pandas as pd
+import yaml
+
+from .config import MMConfig
+from .io import config_yaml, ensure_dir, frame_from_npz_bytes, frame_to_npz_bytes
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id   INTEGER PRIMARY KEY,
+    scenario TEXT NOT NULL,
+    gamma    REAL NOT NULL,
+    config   TEXT NOT NULL,
+    summary  TEXT NOT NULL,
+    UNIQUE (scenario, gamma)
+);
+CREATE INDEX IF NOT EXISTS runs_scenario ON runs (scenario, gamma);
+CREATE TABLE IF NOT EXISTS frames (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    name   TEXT NOT NULL,
+    data   BLOB NOT NULL,
+    sha256 TEXT,
+    PRIMARY KEY (run_id, name)
+);
+"""
+
+
+class ExperimentStore:
+    """
+    Ein Experiment als eine Datei (SQLite) statt eines Ordners pro Run.
+
+    Pro Run ein Datensatz mit Key (scenario, gamma): Config (YAML wie config_used.yaml),
+    KPIs (JSON wie summary.json) und die Tabellen timeseries/trades als komprimierte
+    Spalten-Blobs (npz). Abfragen nach Szenario laufen über einen Index und laden nur
+    die Runs (und Tabellen), die angefragt werden.
+
+    Mehrere Prozesse dürfen gleichzeitig schreiben (WAL-Modus + busy timeout).
+    """
+
+    def __init__(self, path: str | Path, timeout: float = 60.0):
+        self.path = Path(path)
+        ensure_dir(self.path.parent)
+        self._con = sqlite3.connect(self.path, timeout=timeout)
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.execute("PRAGMA foreign_keys=ON")
+        self._con.executescript(_SCHEMA)
+        # Stores von vor frames.sha256: Spalte nachziehen, Hashes füllt fingerprints() bei Bedarf
+        if "sha256" not in {r[1] for r in self._con.execute("PRAGMA table_info(frames)")}:
+            self._con.execute("ALTER TABLE frames ADD COLUMN sha256 TEXT")
+
+    def close(self) -> None:
+        self._con.close()
+
+    def __enter__(self) -> "ExperimentStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # -----------------------------
+    # Schreiben
+    # -----------------------------
+    def put_run(
+        self,
+        scenario: str,
+        gamma: float,
+        cfg: MMConfig,
+        timeseries: pd.DataFrame,
+        trades: pd.DataFrame,
+        summary: dict,
+        *,
+        float32: bool = False,
+    ) -> None:
+        """Run anlegen bzw. ersetzen (gleicher Key (scenario, gamma))."""
+        with self._con:
+            self._con.execute("DELETE FROM runs WHERE scenario = ? AND gamma = ?", (scenario, float(gamma)))
+            cur = self._con.execute(
+                "INSERT INTO runs (scenario, gamma, config, summary) VALUES (?, ?, ?, ?)",
+                (scenario, float(gamma), config_yaml(cfg), json.dumps(summary)),
+            )
+            run_id = cur.lastrowid
+            blobs = {
+                "timeseries": frame_to_npz_bytes(timeseries, float32=float32),
+                "trades": frame_to_npz_bytes(trades, float32=float32),
+            }
+            # Hash beim Schreiben ablegen -> fingerprints() liest keine Blobs
+            self._con.executemany(
+                "INSERT INTO frames (run_id, name, data, sha256) VALUES (?, ?, ?, ?)",
+                [(run_id, name, data, _sha256(data)) for name, data in blobs.items()],
+            )
+
+    def set_summary(self, scenario: str, gamma: float, summary: dict) -> None:
+        """summary eines bestehenden Runs ersetzen (z.B. um Telemetrie nachzutragen)."""
+        with self._con:
+            self._con.execute(
+                "UPDATE runs SET summary = ? WHERE scenario = ? AND gamma = ?",
+                (json.dumps(summary), scenario, float(gamma)),
+            )
+
+    # -----------------------------
+    # Lesen
+    # -----------------------------
+    def scenarios(self) -> list[str]:
+        return [r[0] for r in self._con.execute("SELECT DISTINCT scenario FROM runs ORDER BY scenario")]
+
+    def gammas(self, scenario: str | None = None) -> list[float]:
+        if scenario is None:
+            rows = self._con.execute("SELECT DISTINCT gamma FROM runs ORDER BY gamma")
+        else:
+            rows = self._con.execute("SELECT gamma FROM runs WHERE scenario = ? ORDER BY gamma", (scenario,))
+        return [r[0] for r in rows]
+
+    def summary_table(self, scenario: str | None = None) -> pd.DataFrame:
+        """KPIs aller (bzw. eines Szenarios) Runs als Tabelle wie experiment_summary.csv (ohne Telemetrie)."""
+        rows = []
+        for sc, g, summary in self._select("scenario, gamma, summary", scenario):
+            kpis = json.loads(summary)
+            kpis.pop("telemetry", None)
+            rows.append({"scenario": sc, "gamma": g, **kpis})
+        return pd.DataFrame(rows)
+
+    def load_runs(
+        self,
+        scenario: str,
+        tables: Iterable[str] = ("timeseries", "trades"),
+        columns: list[str] | None = None,
+    ) -> list[dict]:
+        """
+        Alle Runs eines Szenarios, nach gamma sortiert:
+          [{"gamma", "kpi", "config", "ts", "trades"}, ...]
+        tables/columns begrenzen, welche Tabellen bzw. Spalten dekodiert werden.
+        """
+        tables = list(tables)
+        runs = []
+        for run_id, g, config, summary in self._select("run_id, gamma, config, summary", scenario):
+            run = {"gamma": g, "kpi": json.loads(summary), "config": yaml.safe_load(config)}
+            frames = self._frames(run_id, tables)
+            if "timeseries" in tables:
+                run["ts"] = frame_from_npz_bytes(frames["timeseries"], columns=columns)
+            if "trades" in tables:
+                run["trades"] = frame_from_npz_bytes(frames["trades"])
+            runs.append(run)
+        return runs
+
+    def fingerprints(self, scenario: str | None = None) -> dict[tuple[str, float], dict[str, str]]:
+        """
+        Inhalts-Hashes pro Run ohne Dekodieren der Tabellen:
+          {(scenario, gamma): {"config", "kpi", "timeseries", "trades"}}  (sha256 hex)
+        Tabellen-Hashes kommen aus frames.sha256 (bei put_run berechnet); Blobs werden nur
+        für Runs aus älteren Stores ohne Hash einmal gelesen und der Hash nachgetragen.
+        """
+        out: dict[tuple[str, float], dict[str, str]] = {}
+        ids = {}
+        for run_id, sc, g, config, summary in self._select("run_id, scenario, gamma, config, summary", scenario):
+            out[(sc, g)] = {"config": _sha256(config.encode()), "kpi": summary_fingerprint(summary)}
+            ids[run_id] = (sc, g)
+
+        query = "SELECT f.run_id, f.name, f.sha256 FROM frames f JOIN runs r ON r.run_id = f.run_id"
+        rows = self._con.execute(query) if scenario is None else self._con.execute(query + " WHERE r.scenario = ?", (scenario,))
+        missing = []
+        for run_id, name, sha in rows.fetchall():
+            if sha is None:
+                missing.append((run_id, name))
+            else:
+                out[ids[run_id]][name] = sha
+        if missing:
+            with self._con:
+                for run_id, name in missing:
+                    (data,) = self._con.execute(
+                        "SELECT data FROM frames WHERE run_id = ? AND name = ?", (run_id, name)
+                    ).fetchone()
+                    sha = out[ids[run_id]][name] = _sha256(data)
+                    self._con.execute("UPDATE frames SET sha256 = ? WHERE run_id = ? AND name = ?", (sha, run_id, name))
+        return out
+
+    def _select(self, cols: str, scenario: str | None):
+        if scenario is None:
+            return self._con.execute(f"SELECT {cols} FROM runs ORDER BY scenario, gamma")
+        return self._con.execute(f"SELECT {cols} FROM runs WHERE scenario = ? ORDER BY gamma", (scenario,))
+
+    def _frames(self, run_id: int, names: list[str]) -> dict[str, bytes]:
+        if not names:
+            return {}
+        marks = ",".join("?" * len(names))
+        rows = self._con.execute(
+            f"SELECT name, data FROM frames WHERE run_id = ? AND name IN ({marks})", (run_id, *names)
+        )
+        return dict(rows)
+
+
+def summary_fingerprint(summary_json: str) -> str:
+    """sha256 der KPIs aus summary.json; Telemetrie (Laufzeiten, ändert sich bei jedem Lauf) zählt nicht."""
+    kpis = json.loads(summary_json)
+    kpis.pop("telemetry", None)
+    return _sha256(json.dumps(kpis, sort_keys=True).encode())
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
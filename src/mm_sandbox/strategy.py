@@ -2,6 +2,8 @@ from __future__ import annotations
 import math
 from dataclasses import dataclass
 
+import numpy as np
+
 
 @dataclass(frozen=True)
 class Quote:
@@ -54,3 +56,145 @@ def make_quote_as(
         half_spread = eps
 
     return Quote(bid=bid, ask=ask), r, half_spread
+
+
+class QuoteEngine:
+    """
+    Zustandsbehaftete Variante von make_quote_as für den Loop (ein Quote pro Tick).
+
+    Pro (γ, σ, k) einmal vorberechnet: σ², γ·σ² (Risiko-Term des Spreads) und der
+    Liquiditäts-Term (2/γ)·ln(1+γ/k). quote()/quote_step() schreiben bid, ask, r und
+    half_spread in die Attribute der Instanz (__slots__, kein Quote-Objekt pro Tick).
+    Rechenreihenfolge wie make_quote_as -> bitgleiche Werte, inkl. bid >= ask Fallback.
+
+    Optional Lookup-Tabelle über das tau-Raster der Session (set_tau_grid): tau und
+    Halbspread pro Step liegen dann vorab vor, quote_step(mid, inventory, i) rechnet nur
+    noch den Reservation Price.
+    """
+
+    __slots__ = (
+        "sigma", "gamma", "k", "sigma2", "gamma_sigma2", "liquidity_term",
+        "bid", "ask", "r", "half_spread", "_tau", "_half_spread",
+    )
+
+    def __init__(self, *, sigma: float, gamma: float, k: float):
+        self.bid = self.ask = self.r = self.half_spread = math.nan
+        self._tau = self._half_spread = None
+        self.set_params(sigma=sigma, gamma=gamma, k=k)
+
+    def set_params(self, *, sigma: float, gamma: float, k: float) -> None:
+        """Invariante Terme für neue (γ, σ, k) berechnen; eine vorhandene tau-Tabelle wird verworfen."""
+        self.sigma = float(sigma)
+        self.gamma = float(gamma)
+        self.k = float(k)
+        self.sigma2 = self.sigma ** 2
+        self.gamma_sigma2 = self.gamma * self.sigma2
+        self.liquidity_term = liquidity_spread(self.gamma, self.k)
+        self._tau = self._half_spread = None
+
+    def set_tau_grid(self, *, T_seconds: float, dt_seconds: float, t0: int = 0, n_steps: int) -> None:
+        """
+        Lookup-Tabelle für die Steps t0 .. t0+n_steps-1 (tau = max(T - t*dt, 0) wie im Loop);
+        Index i in quote_step ist relativ zu t0. Speicher: 2 * 8 Bytes pro Step.
+        """
+        tau = np.maximum(T_seconds - np.arange(t0, t0 + n_steps) * dt_seconds, 0.0)
+        half_spread = 0.5 * (self.gamma_sigma2 * tau + self.liquidity_term)
+        self._tau = memoryview(tau)
+        self._half_spread = memoryview(half_spread)
+
+    def quote(self, mid: float, inventory: float, tau_seconds: float) -> None:
+        """make_quote_as(mid, σ, inventory, γ, k, tau) -> self.bid/ask/r/half_spread."""
+        r = mid - inventory * self.gamma * self.sigma2 * tau_seconds
+        half_spread = 0.5 * (self.gamma_sigma2 * tau_seconds + self.liquidity_term)
+        bid = r - half_spread
+        ask = r + half_spread
+        # Invariant: bid < ask (numerische Sicherheit), Fallback wie make_quote_as
+        if bid >= ask:
+            bid, ask, r, half_spread = mid - 1e-6, mid + 1e-6, mid, 1e-6
+        self.bid = bid
+        self.ask = ask
+        self.r = r
+        self.half_spread = half_spread
+
+    def quote_step(self, mid: float, inventory: float, i: int) -> None:
+        """Wie quote(), tau und Halbspread aus der Tabelle (set_tau_grid) für Step t0 + i."""
+        r = mid - inventory * self.gamma * self.sigma2 * self._tau[i]
+        half_spread = self._half_spread[i]
+        bid = r - half_spread
+        ask = r + half_spread
+        if bid >= ask:
+            bid, ask, r, half_spread = mid - 1e-6, mid + 1e-6, mid, 1e-6
+        self.bid = bid
+        self.ask = ask
+        self.r = r
+        self.half_spread = half_spread
+
+
+@dataclass(frozen=True)
+class QuoteArrays:
+    bid: np.ndarray
+    ask: np.ndarray
+    r: np.ndarray
+    half_spread: np.ndarray
+
+
+def liquidity_spread(gamma, k: float):
+    """
+    Liquiditätskomponente des AS-Spreads: (2/γ) * ln(1 + γ/k).
+    gamma darf ein Array sein; gerechnet wird mit math.log pro distinct gamma,
+    damit das Ergebnis bitgleich zu make_quote_as ist.
+    """
+    if np.ndim(gamma) == 0:
+        g = float(gamma)
+        return (2.0 / g) * math.log(1.0 + g / k)
+    values, inverse = np.unique(np.asarray(gamma, dtype=float), return_inverse=True)
+    terms = np.array([(2.0 / g) * math.log(1.0 + g / k) for g in values.tolist()])
+    return terms[inverse].reshape(np.shape(gamma))
+
+
+def make_quotes_as(
+    *,
+    mid,
+    sigma: float,
+    inventory,
+    gamma,
+    k: float,
+    tau_seconds,
+    liquidity_term=None,
+) -> QuoteArrays:
+    """
+    Array-Variante von make_quote_as: mid, inventory, tau_seconds und optional gamma
+    dürfen Arrays sein (NumPy-Broadcasting), z.B. alle Steps eines Horizonts oder
+    alle Pfade/gammas eines Batch-Steps. Gleiche Formeln und Rechenreihenfolge wie
+    make_quote_as -> elementweise bitgleich, inkl. bid >= ask Fallback.
+
+    liquidity_term: optional vorberechnetes liquidity_spread(gamma, k)
+                    (spart die Neuberechnung bei vielen Aufrufen mit gleichem gamma).
+    """
+    mid = np.asarray(mid, dtype=float)
+    if liquidity_term is None:
+        liquidity_term = liquidity_spread(gamma, k)
+
+    # 1) Reservation Price r = s - q * γ * σ^2 * τ
+    r = mid - inventory * gamma * (sigma ** 2) * tau_seconds
+
+    # 2) Total Spread Δ = γ * σ^2 * τ + (2/γ) * ln(1 + γ/k), Halbspread Δ/2
+    half_spread = 0.5 * (gamma * (sigma ** 2) * tau_seconds + liquidity_term)
+
+    bid = r - half_spread
+    ask = r + half_spread
+
+    shape = np.broadcast_shapes(np.shape(bid), np.shape(ask))
+    r = np.broadcast_to(r, shape)
+    half_spread = np.broadcast_to(half_spread, shape)
+
+    # Invariant: bid < ask (numerische Sicherheit), Fallback wie make_quote_as
+    crossed = bid >= ask
+    if np.any(crossed):
+        eps = 1e-6
+        bid = np.where(crossed, mid - eps, bid)
+        ask = np.where(crossed, mid + eps, ask)
+        r = np.where(crossed, mid, r)
+        half_spread = np.where(crossed, eps, half_spread)
+
+    return QuoteArrays(bid=bid, ask=ask, r=r, half_spread=half_spread)
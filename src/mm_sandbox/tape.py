@@ -0,0 +1,138 @@
+from __future__ import annotations
+import zipfile
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import numpy as np
+
+from .config import MMConfig
+
+# Dateiendungen für rohe Binär-Tapes: flaches Array ohne Header (Standard: float64 little-endian)
+RAW_SUFFIXES = (".bin", ".f64", ".f8", ".dat")
+
+
+class MidTape:
+    """
+    Aufgezeichnete Mid-Preise (ein Wert pro Tick) für Replay-Runs, ohne das Tape zu laden.
+
+    Formate (an der Endung erkannt):
+      .npy                 -> np.load(mmap_mode="r")
+      .bin/.f64/.f8/.dat   -> np.memmap (rohes Array, dtype Standard "<f8")
+      .parquet             -> pyarrow, spaltenweise in Batches gelesen (Spalte column)
+      .npz / Ordner *.npz  -> eine Datei nach der anderen (Array column), Ordner nach Namen sortiert;
+                              z.B. timeseries.npz eines früheren Runs
+
+    Memory-Maps halten nur die gerade gelesenen Seiten im Speicher, Parquet/npz nur einen
+    Batch bzw. eine Datei. iter_chunks liefert immer float64-Kopien.
+    """
+
+    def __init__(self, path: str | Path, column: str = "mid", dtype: str = "<f8"):
+        self.path = Path(path)
+        self.column = column
+        self._mmap = None
+        self._files: list[Path] = []
+        self._lengths: list[int] = []
+
+        if self.path.is_dir() or self.path.suffix == ".npz":
+            self._files = sorted(self.path.glob("*.npz")) if self.path.is_dir() else [self.path]
+            if not self._files:
+                raise FileNotFoundError(f"no .npz chunks in {self.path}")
+            self._lengths = [_npz_length(p, column) for p in self._files]
+            self._n = sum(self._lengths)
+        elif self.path.suffix == ".npy":
+            self._mmap = np.load(self.path, mmap_mode="r")
+            self._n = self._mmap.shape[0]
+        elif self.path.suffix in RAW_SUFFIXES:
+            self._mmap = np.memmap(self.path, dtype=np.dtype(dtype), mode="r")
+            self._n = self._mmap.shape[0]
+        elif self.path.suffix == ".parquet":
+            pq = _parquet()
+            self._n = pq.ParquetFile(self.path).metadata.num_rows
+        else:
+            raise ValueError(f"unknown tape format {self.path.suffix!r} ({self.path})")
+
+        if self._mmap is not None and self._mmap.ndim != 1:
+            raise ValueError(f"tape {self.path} must be 1-D, got shape {self._mmap.shape}")
+
+    def __len__(self) -> int:
+        return self._n
+
+    def iter_chunks(self, chunk_size: int, stop: int | None = None) -> Iterator[np.ndarray]:
+        """Ticks [0, stop) in Blöcken von genau chunk_size (letzter Block kürzer), als float64."""
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be >= 1")
+        stop = self._n if stop is None else min(stop, self._n)
+        if self._mmap is not None:
+            for start in range(0, stop, chunk_size):
+                yield np.array(self._mmap[start:min(start + chunk_size, stop)], dtype=np.float64)
+        elif self._files:
+            yield from _rechunk((_npz_column(p, self.column) for p in self._files), chunk_size, stop)
+        else:
+            pf = _parquet().ParquetFile(self.path)
+            batches = pf.iter_batches(batch_size=chunk_size, columns=[self.column])
+            yield from _rechunk((b.column(0).to_numpy() for b in batches), chunk_size, stop)
+
+    def read(self, stop: int | None = None) -> np.ndarray:
+        """Ticks [0, stop) als ein float64-Array (In-Memory-Runs)."""
+        stop = self._n if stop is None else min(stop, self._n)
+        if self._mmap is not None:
+            return np.array(self._mmap[:stop], dtype=np.float64)
+        return np.concatenate(list(self.iter_chunks(max(stop, 1), stop)) or [np.empty(0)])
+
+
+def replay_tape(cfg: MMConfig) -> MidTape:
+    """Tape aus cfg.replay_path; muss mindestens cfg.n_steps Ticks haben."""
+    if cfg.replay_path is None:
+        raise ValueError("cfg.replay_path is not set")
+    tape = MidTape(cfg.replay_path, column=cfg.replay_column)
+    if len(tape) < cfg.n_steps:
+        raise ValueError(f"tape {cfg.replay_path} has {len(tape)} ticks, n_steps={cfg.n_steps}")
+    return tape
+
+
+def _rechunk(blocks: Iterable[np.ndarray], chunk_size: int, stop: int) -> Iterator[np.ndarray]:
+    """Blöcke beliebiger Länge -> Blöcke von genau chunk_size (bis stop), float64."""
+    pending: list[np.ndarray] = []
+    n_pending = 0
+    remaining = stop
+    for block in blocks:
+        if remaining <= 0:
+            break
+        block = np.asarray(block, dtype=np.float64)[:remaining]
+        remaining -= block.size
+        pending.append(block)
+        n_pending += block.size
+        if n_pending < chunk_size:
+            continue
+        buf = np.concatenate(pending)
+        n_full = buf.size - buf.size % chunk_size
+        for start in range(0, n_full, chunk_size):
+            yield buf[start:start + chunk_size]
+        pending = [buf[n_full:]]
+        n_pending = pending[0].size
+    if n_pending:
+        yield np.concatenate(pending)
+
+
+def _npz_length(path: Path, column: str) -> int:
+    """Länge des Arrays column in einer npz-Datei, nur aus dem .npy-Header gelesen."""
+    with zipfile.ZipFile(path) as zf, zf.open(f"{column}.npy") as f:
+        version = np.lib.format.read_magic(f)
+        read_header = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+        shape, _, _ = read_header(f)
+    if len(shape) != 1:
+        raise ValueError(f"{path}:{column} must be 1-D, got shape {shape}")
+    return shape[0]
+
+
+def _npz_column(path: Path, column: str) -> np.ndarray:
+    with np.load(path, allow_pickle=False) as npz:
+        return npz[column]
+
+
+def _parquet():
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("parquet tapes require pyarrow (pip install pyarrow); use .npy/.bin or npz chunks otherwise") from e
+    return pq
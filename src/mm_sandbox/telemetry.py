@@ -0,0 +1,123 @@
+from __future__ import annotations
+import math
+import sys
+from pathlib import Path
+from typing import Dict
+
+# Linux: Peak-RSS (VmHWM) pro Job zurücksetzbar, siehe reset_peak_rss
+_PROC_STATUS = Path("/proc/self/status")
+_PROC_CLEAR_REFS = Path("/proc/self/clear_refs")
+
+try:  # Unix; unter Windows bleibt peak_rss_mb None
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
+
+# Spalten der Profil-Tabelle (experiment_profile.csv) nach scenario/gamma
+PROFILE_COLUMNS = [
+    "cache_hit",
+    "batch_size",
+    "n_steps",
+    "n_trades",
+    "price_s",
+    "loop_s",
+    "kpi_s",
+    "write_s",
+    "total_s",
+    "steps_per_sec",
+    "fills_per_sec",
+    "peak_rss_mb",
+    "peak_rss_scope",
+]
+
+# True, sobald reset_peak_rss den Höchststand in diesem Prozess zurücksetzen konnte
+_peak_reset = False
+
+
+def reset_peak_rss() -> bool:
+    """
+    Setzt den RSS-Höchststand (VmHWM) dieses Prozesses auf den aktuellen RSS zurück
+    (Linux, /proc/self/clear_refs = 5). Danach misst peak_rss_mb den Peak seit dem Reset,
+    also pro Job statt über die ganze Prozess-Lebenszeit.
+    False, wenn das System das nicht unterstützt (macOS, Windows, gesperrtes /proc).
+    """
+    global _peak_reset
+    try:
+        _PROC_CLEAR_REFS.write_text("5")
+    except OSError:
+        return False
+    _peak_reset = True
+    return True
+
+
+def peak_rss_mb() -> float | None:
+    """
+    RSS-Höchststand in MB: seit dem letzten reset_peak_rss (VmHWM), sonst seit Prozessstart
+    (ru_maxrss). Enthält immer den Grundbedarf des Prozesses (Interpreter, numpy, pandas).
+    """
+    if _peak_reset:
+        for line in _PROC_STATUS.read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux: KiB, macOS: Bytes
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def run_telemetry(
+    *,
+    n_steps: int,
+    n_trades: int,
+    timings: Dict[str, float],
+    batch_size: int = 1,
+    kpi_s: float | None = None,
+    write_s: float | None = None,
+    cache_hit: bool = False,
+) -> dict:
+    """
+    Telemetrie eines Runs für summary.json["telemetry"].
+
+    timings   : Phasen aus run_simulation(..., timings=) ("price_s", "loop_s")
+    batch_size: Anzahl Runs, die sich Preis-Pfad und Loop geteilt haben (Gamma-Sweep in
+                einem Durchlauf) -> price_s/loop_s werden gleichmäßig aufgeteilt
+    Durchsatz: steps_per_sec = n_steps / loop_s, fills_per_sec = n_trades / loop_s
+    (NaN, wenn nicht simuliert wurde, z.B. bei einem Cache-Treffer).
+    peak_rss_scope: "job" = peak_rss_mb gilt seit dem letzten reset_peak_rss (Aufrufer setzt
+    vor jedem Job/Run zurück), "process" = Höchststand seit Prozessstart (Reset nicht möglich).
+    """
+    price_s = timings.get("price_s", 0.0) / batch_size
+    loop_s = timings.get("loop_s", 0.0) / batch_size
+    parts = [price_s, loop_s, kpi_s or 0.0, write_s or 0.0]
+    return {
+        "cache_hit": cache_hit,
+        "batch_size": batch_size,
+        "n_steps": int(n_steps),
+        "n_trades": int(n_trades),
+        "price_s": price_s,
+        "loop_s": loop_s,
+        "kpi_s": kpi_s,
+        "write_s": write_s,
+        "total_s": sum(parts),
+        "steps_per_sec": n_steps / loop_s if loop_s > 0 else math.nan,
+        "fills_per_sec": n_trades / loop_s if loop_s > 0 else math.nan,
+        "peak_rss_mb": peak_rss_mb(),
+        "peak_rss_scope": "job" if _peak_reset else "process",
+    }
+
+
+def replay_telemetry(*, n_ticks: int, timings: Dict[str, float]) -> dict:
+    """
+    Durchsatz eines Replay-Runs (cfg.replay_path) für summary.json["telemetry"]["replay"].
+
+    price_s ist bei Replay die Zeit für das Lesen des Tapes (+ Fill-Uniforms);
+    ticks_per_sec = n_ticks / (price_s + loop_s), also Lesen + Quote-/Fill-Loop zusammen.
+    """
+    read_s = timings.get("price_s", 0.0)
+    busy_s = read_s + timings.get("loop_s", 0.0)
+    return {
+        "ticks": int(n_ticks),
+        "read_s": read_s,
+        "ticks_per_sec": n_ticks / busy_s if busy_s > 0 else math.nan,
+    }
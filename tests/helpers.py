@@ -0,0 +1,17 @@
+"""Gemeinsame Test-Helfer (per [tool.pytest.ini_options] pythonpath importierbar, unabhängig vom Import-Modus)."""
+from mm_sandbox.config import MMConfig
+
+# Kleines Paper-Setup für Tests: T=1s, dt=0.005 (200 Steps), ohne Drift und Fees
+TEST_PARAMS = dict(
+    seed=42, dt_seconds=0.005, n_steps=200, T_seconds=1.0, trade_size=1.0,
+    s0=100.0, mu=0.0, sigma=2.0, gamma=0.1, A=140.0, k=1.5, fee_bps=0.0,
+    adverse_horizon_steps=10, var_horizon_seconds=0.05,
+)
+
+# Variante mit Trend + Fees über 300 Steps (Fills auf beiden Seiten, PnL mit Fees)
+TREND = dict(n_steps=300, T_seconds=1.5, mu=10.0, fee_bps=0.5)
+
+
+def make_cfg(**kw) -> MMConfig:
+    """MMConfig aus TEST_PARAMS; jedes Feld per Keyword überschreibbar (z.B. make_cfg(**TREND, seed=4))."""
+    return MMConfig(**{**TEST_PARAMS, **kw})
@@ -0,0 +1,49 @@
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from mm_sandbox.simulator import run_simulation, run_simulation_batch
+
+from helpers import make_cfg
+
+
+_cfg = partial(make_cfg, seed=11, fee_bps=1.0)
+
+
+def test_batch_single_path_reproduces_run_simulation():
+    cfg = _cfg()
+    res = run_simulation(cfg)
+    batch = run_simulation_batch(cfg, n_paths=1)
+
+    ts = res["timeseries"]
+    for col in ["mid", "r", "bid", "ask", "half_spread", "inventory", "pnl"]:
+        np.testing.assert_array_equal(batch[col][0], ts[col].to_numpy())
+    assert batch["n_trades"][0] == len(res["trades"])
+    assert batch["final_pnl"][0] == res["final_pnl"]
+    assert batch["final_inventory"][0] == res["final_inventory"]
+
+
+def test_batch_shapes_and_path_independence():
+    cfg = _cfg(sigma=10.0)
+    batch = run_simulation_batch(cfg, n_paths=64)
+    assert batch["pnl"].shape == (64, 200)
+    assert batch["final_pnl"].shape == (64,)
+    np.testing.assert_array_equal(batch["final_pnl"], batch["pnl"][:, -1])
+    np.testing.assert_array_equal(
+        batch["final_inventory"], cfg.trade_size * batch["fills"].sum(axis=1)
+    )
+    # unterschiedliche Pfade -> unterschiedliche Ergebnisse
+    assert np.unique(batch["final_pnl"]).size > 1
+
+
+def test_gamma_vector_matches_individual_runs():
+    cfg = _cfg(mu=10.0)
+    gammas = [0.001, 0.05, 0.3]
+    results = run_simulation(cfg, gammas=gammas)
+    assert len(results) == len(gammas)
+    for g, res in zip(gammas, results):
+        single = run_simulation(cfg.model_copy(update={"gamma": g}))
+        pd.testing.assert_frame_equal(res["timeseries"], single["timeseries"])
+        pd.testing.assert_frame_equal(res["trades"], single["trades"])
+        assert res["final_pnl"] == single["final_pnl"]
@@ -0,0 +1,58 @@
+import math
+import os
+from functools import partial
+
+import pandas as pd
+
+from mm_sandbox.cache import ResultCache, cache_key
+from mm_sandbox.config import MMConfig
+from mm_sandbox.simulator import run_simulation
+
+from helpers import make_cfg
+
+
+_cfg = partial(make_cfg, seed=3)
+
+
+def _put(cache: ResultCache, cfg: MMConfig) -> dict:
+    res = run_simulation(cfg)
+    summary = {"final_pnl": res["final_pnl"], "n_trades": len(res["trades"]), "adverse_selection_rate": math.nan}
+    cache.put(cfg, res["timeseries"], res["trades"], summary)
+    return res
+
+
+def test_cache_roundtrip_and_key(tmp_path):
+    cfg = _cfg()
+    assert cache_key(cfg) == cache_key(_cfg())
+    assert cache_key(cfg) != cache_key(_cfg(gamma=0.2))
+    assert cache_key(cfg) != cache_key(cfg, version="other")
+
+    cache = ResultCache(tmp_path)
+    assert cache.get(cfg) is None
+    res = _put(cache, cfg)
+
+    hit = cache.get(cfg)
+    pd.testing.assert_frame_equal(hit["timeseries"], res["timeseries"])
+    pd.testing.assert_frame_equal(hit["trades"], res["trades"], check_dtype=False)
+    assert hit["summary"]["final_pnl"] == res["final_pnl"]
+    assert hit["summary"]["n_trades"] == len(res["trades"])
+    assert math.isnan(hit["summary"]["adverse_selection_rate"])
+    assert cache.get(_cfg(gamma=0.2)) is None
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = ResultCache(tmp_path)
+    cfgs = [_cfg(seed=s) for s in range(3)]
+    for i, cfg in enumerate(cfgs):
+        _put(cache, cfg)
+        entry = tmp_path / cache_key(cfg)[:2] / cache_key(cfg)
+        os.utime(entry, (1_000 + i, 1_000 + i))
+
+    # Treffer auf den ältesten Eintrag macht ihn zum jüngsten
+    assert cache.get(cfgs[0]) is not None
+    sizes = {path.name: size for path, _, size in cache.entries()}
+    cache.evict(cache.size_bytes() - sizes[cache_key(cfgs[1])])
+
+    assert cache.get(cfgs[1]) is None
+    assert cache.get(cfgs[0]) is not None
+    assert cache.get(cfgs[2]) is not None
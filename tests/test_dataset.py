@@ -0,0 +1,51 @@
+from functools import partial
+
+import numpy as np
+
+from mm_sandbox.dataset import RunDataset, folder_fingerprints
+from mm_sandbox.io import write_outputs
+from mm_sandbox.simulator import run_simulation
+from mm_sandbox.store import ExperimentStore
+
+from helpers import make_cfg
+
+
+_cfg = partial(make_cfg, seed=6)
+
+
+def test_folder_and_store_load_the_same_runs(tmp_path):
+    gammas = [0.01, 0.1, 0.3]
+    with ExperimentStore(tmp_path / "exp.sqlite") as store:
+        for scenario, sigma in [("calm", 2.0), ("turbulent", 10.0)]:
+            cfg = _cfg(sigma=sigma)
+            for g, res in zip(gammas, run_simulation(cfg, gammas=gammas)):
+                cfg_run = cfg.model_copy(update={"gamma": g})
+                kpi = {"final_pnl": res["final_pnl"]}
+                write_outputs(tmp_path / scenario / f"gamma_{g}", cfg_run, res["timeseries"], res["trades"], kpi)
+                store.put_run(scenario, g, cfg_run, res["timeseries"], res["trades"], kpi)
+        from_store = RunDataset.from_store(store, ["calm", "turbulent", "uptrend"])
+        store_fp = store.fingerprints()
+
+    from_folder = RunDataset.from_folder(tmp_path, ["calm", "turbulent", "uptrend"], max_workers=4)
+
+    for ds in (from_folder, from_store):
+        assert len(ds) == 6
+        assert ds.gammas() == gammas
+        assert [r["gamma"] for r in ds.runs("turbulent")] == gammas
+        assert ds.runs("uptrend") == []
+        assert ds.get("calm", 0.1)["config"]["sigma"] == 2.0
+
+    # Achsenlimits aus den vorab berechneten Spalten-Statistiken
+    all_pnl = np.concatenate([r["ts"]["pnl"].to_numpy() for sc in ["calm", "turbulent"] for r in from_folder.runs(sc)])
+    assert from_folder.value_range(["pnl"]) == (all_pnl.min(), all_pnl.max())
+    assert from_folder.value_range(["bid", "ask"]) == from_store.value_range(["bid", "ask"])
+    calm_mid = from_folder.runs("calm")[0]["ts"]["mid"]
+    assert from_folder.value_range(["mid"], ["calm"], first_run_only=True) == (calm_mid.min(), calm_mid.max())
+
+    # Fingerprints: gleiche Keys in Ordner und Store; Änderung trifft nur die betroffene Datei
+    folder_fp = folder_fingerprints(tmp_path, ["calm", "turbulent"])
+    assert folder_fp.keys() == store_fp.keys()
+    (tmp_path / "calm" / "gamma_0.1" / "summary.json").write_text('{"final_pnl": 0.0}', encoding="utf-8")
+    changed = folder_fingerprints(tmp_path, ["calm", "turbulent"])
+    diff = {(key, part) for key in changed for part in changed[key] if changed[key][part] != folder_fp[key][part]}
+    assert diff == {(("calm", 0.1), "kpi")}
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+
+from mm_sandbox.decimate import decimate_frame, minmax_indices
+
+
+def test_minmax_keeps_extremes_and_bounds_size():
+    rng = np.random.default_rng(2)
+    y = np.cumsum(rng.normal(size=1_000_003))
+    y[123_457] = 1e6   # Spike
+    y[777_777] = -1e6
+    y[5] = np.nan
+
+    idx = minmax_indices(y, 2_000)
+    assert len(idx) <= 2_002
+    assert np.all(np.diff(idx) > 0)
+    assert idx[0] == 0 and idx[-1] == y.size - 1
+    assert {123_457, 777_777} <= set(idx.tolist())
+
+    # jedes Bucket-Extremum der vollen Reihe bleibt erhalten
+    size = -(-y.size // 1_000)
+    for start in range(0, y.size, size * 97):
+        block = y[start:start + size]
+        kept = y[idx[(idx >= start) & (idx < start + size)]]
+        assert np.nanmax(kept) == np.nanmax(block) and np.nanmin(kept) == np.nanmin(block)
+
+
+def test_decimate_frame_passthrough_for_short_series():
+    df = pd.DataFrame({"t": np.arange(100), "bid": np.arange(100.0), "ask": np.arange(100.0) + 1})
+    assert decimate_frame(df, ["bid", "ask"], 500) is df
+    assert decimate_frame(df, ["bid", "ask"], 0) is df
+    out = decimate_frame(df, ["bid", "ask"], 10)
+    assert out["t"].is_monotonic_increasing and len(out) <= 12
@@ -0,0 +1,76 @@
+from functools import lru_cache
+
+import numpy as np
+
+from mm_sandbox.config import MMConfig
+from mm_sandbox.simulator import run_simulation, run_simulation_batch
+
+from helpers import make_cfg
+
+
+def _cfg(dt: float, **kw) -> MMConfig:
+    # T = 1s bei variablem dt
+    return make_cfg(**{"seed": 1, "dt_seconds": dt, "n_steps": int(round(1.0 / dt)), **kw})
+
+
+@lru_cache(maxsize=None)
+def _samples(dt: float, n_runs: int = 200) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+    """Pro Größe (n_trades, final_pnl, final_inventory): (diskret, 2000 Pfade), (event, n_runs Seeds)."""
+    cfg = _cfg(dt)
+    batch = run_simulation_batch(cfg, n_paths=2_000)
+    runs = [run_simulation(cfg.model_copy(update={"engine": "event", "seed": s})) for s in range(n_runs)]
+    event = {
+        "n_trades": [len(r["trades"]) for r in runs],
+        "final_pnl": [r["final_pnl"] for r in runs],
+        "final_inventory": [r["final_inventory"] for r in runs],
+    }
+    return {k: (np.asarray(batch[k], dtype=float), np.asarray(v, dtype=float)) for k, v in event.items()}
+
+
+def _mean_trades(dt: float) -> tuple[float, float]:
+    discrete, event = _samples(dt)["n_trades"]
+    return float(discrete.mean()), float(event.mean())
+
+
+def _se_std(x: np.ndarray) -> float:
+    # Standardfehler der Stichproben-Std, mit Kurtosis (nicht nur Normalverteilung)
+    kurt = np.mean((x - x.mean()) ** 4) / x.var() ** 2
+    return float(x.std(ddof=1) * np.sqrt((kurt - 1) / (4 * x.size)))
+
+
+def test_event_engine_output_is_consistent():
+    cfg = _cfg(0.005, engine="event", sigma=10.0)
+    res = run_simulation(cfg)
+    ts, trades = res["timeseries"], res["trades"]
+    assert len(ts) == cfg.n_steps
+    assert trades["t"].is_unique
+    side = np.where(trades["side"] == "buy", 1.0, -1.0)
+    assert res["final_inventory"] == side.sum() * cfg.trade_size
+    assert res["final_pnl"] == ts["pnl"].iloc[-1]
+    assert (ts["bid"] < ts["ask"]).all()
+
+
+def test_event_engine_converges_to_discrete_engine():
+    # Fill-Intensität stimmt nur bis auf O(λ*dt) überein -> Abstand schrumpft mit dt
+    d_coarse, e_coarse = _mean_trades(0.005)
+    d_fine, e_fine = _mean_trades(0.0005)
+
+    gap_coarse = abs(e_coarse - d_coarse) / d_coarse
+    gap_fine = abs(e_fine - d_fine) / d_fine
+    assert gap_fine < gap_coarse / 4
+    assert gap_fine < 0.04
+
+
+def test_event_engine_matches_discrete_pnl_and_inventory_distribution():
+    # Mittelwert und Std von final_pnl/final_inventory bei feinem dt: Abstand innerhalb
+    # 4 Standardfehlern; beim PnL-Mittel zusätzlich 3 % Budget für den O(λ*dt)-Bias der
+    # Fill-Intensität (wie beim Trade-Count oben, der PnL kommt aus denselben Fills)
+    samples = _samples(0.0005)
+    for name, bias in (("final_pnl", 0.03), ("final_inventory", 0.0)):
+        discrete, event = samples[name]
+        se_mean = np.sqrt(discrete.var(ddof=1) / discrete.size + event.var(ddof=1) / event.size)
+        tol_mean = 4 * se_mean + bias * abs(discrete.mean())
+        assert abs(event.mean() - discrete.mean()) < tol_mean, name
+
+        se_std = np.hypot(_se_std(discrete), _se_std(event))
+        assert abs(event.std(ddof=1) - discrete.std(ddof=1)) < 4 * se_std, name
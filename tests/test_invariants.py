@@ -1,13 +1,16 @@
-from mm_sandbox.strategy import make_quote
+from mm_sandbox.strategy import make_quote_as
 
 
 def test_bid_less_than_ask():
-    q = make_quote(
-        mid=100.0,
-        vol_est=0.1,
-        inventory=0.0,
-        base_half_spread_bps=5.0,
-        vol_widening_bps=30.0,
-        inventory_skew_bps=8.0,
-    )
-    assert q.bid < q.ask
+    for inventory in (-20.0, 0.0, 20.0):
+        q, r, half_spread = make_quote_as(
+            mid=100.0,
+            sigma=2.0,
+            inventory=inventory,
+            gamma=0.1,
+            k=1.5,
+            tau_seconds=0.5,
+        )
+        assert q.bid < q.ask
+        assert q.bid < r < q.ask
+        assert half_spread > 0
@@ -0,0 +1,52 @@
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mm_sandbox.io import find_frame, read_frame, write_outputs
+from mm_sandbox.simulator import run_simulation
+
+from helpers import make_cfg
+
+
+_cfg = partial(make_cfg, seed=3)
+
+
+@pytest.mark.parametrize("fmt", ["csv", "npz", "parquet"])
+def test_roundtrip_keeps_schema(tmp_path, fmt):
+    if fmt == "parquet":
+        pytest.importorskip("pyarrow")
+    cfg = _cfg()
+    res = run_simulation(cfg)
+    write_outputs(tmp_path, cfg, res["timeseries"], res["trades"], {}, fmt=fmt)
+
+    ts = read_frame(tmp_path, "timeseries")
+    trades = read_frame(tmp_path, "trades")
+    assert list(ts.columns) == list(res["timeseries"].columns)
+    assert list(trades.columns) == list(res["trades"].columns)
+    np.testing.assert_allclose(ts["pnl"].to_numpy(), res["timeseries"]["pnl"].to_numpy(), rtol=1e-12)
+    assert trades["side"].tolist() == res["trades"]["side"].tolist()
+
+
+def test_float32_and_format_switch_replaces_stale_file(tmp_path):
+    cfg = _cfg()
+    res = run_simulation(cfg)
+    write_outputs(tmp_path, cfg, res["timeseries"], res["trades"], {}, fmt="csv")
+    write_outputs(tmp_path, cfg, res["timeseries"], res["trades"], {}, fmt="npz", float32=True)
+
+    assert find_frame(tmp_path, "timeseries").suffix == ".npz"
+    assert not (tmp_path / "timeseries.csv").exists()
+    ts = read_frame(tmp_path, "timeseries", columns=["t", "mid"])
+    assert list(ts.columns) == ["t", "mid"]
+    assert ts["mid"].dtype == np.float32
+    assert ts["t"].dtype == np.int64
+
+
+def test_run_without_trades_roundtrips(tmp_path):
+    cfg = _cfg(A=1e-6)
+    res = run_simulation(cfg)
+    assert res["trades"].empty
+    for fmt in ["csv", "npz"]:
+        write_outputs(tmp_path / fmt, cfg, res["timeseries"], res["trades"], {}, fmt=fmt)
+        assert read_frame(tmp_path / fmt, "trades").empty
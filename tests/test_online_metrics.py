@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from mm_sandbox.config import MMConfig
+from mm_sandbox.metrics import compute_kpis, compute_var_es, var_es_kpis
+from mm_sandbox.online_metrics import OnlineKpis, QuantileSketch
+from mm_sandbox.simulator import run_simulation, run_simulation_streaming
+
+
+def _bound(x, q, alpha, min_value):
+    xs = np.sort(x)
+    pos = q * (xs.size - 1)
+    lo, hi = int(np.floor(pos)), int(np.ceil(pos))
+    return alpha * max(abs(xs[lo]), abs(xs[hi])) + min_value
+
+
+@pytest.mark.parametrize("q", [0.0, 0.01, 0.05, 0.5, 0.95, 1.0])
+def test_sketch_within_documented_bound(q):
+    rng = np.random.default_rng(0)
+    x = np.concatenate([rng.standard_t(3, 20_000), np.zeros(5_000)])
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    for part in np.array_split(rng.permutation(x), 7):
+        sketch.add(part)
+    err = abs(sketch.quantile(q) - np.quantile(x, q))
+    assert err <= _bound(x, q, 0.01, sketch.min_value) * (1 + 1e-9)
+
+
+def test_online_kpis_match_in_memory_run():
+    cfg = MMConfig(
+        seed=9, dt_seconds=0.005, n_steps=2_000, T_seconds=10.0, trade_size=1.0,
+        s0=100.0, mu=0.0, sigma=10.0, gamma=0.01, A=140.0, k=1.5, fee_bps=0.0,
+        adverse_horizon_steps=10, var_horizon_seconds=0.05, risk_horizons_seconds=[0.01, 0.25],
+    )
+    res = run_simulation(cfg)
+    exact = compute_kpis(
+        timeseries=res["timeseries"], trades=res["trades"], final_pnl=res["final_pnl"],
+        final_inventory=res["final_inventory"], horizon_steps=cfg.adverse_horizon_steps,
+    )
+    exact.update(var_es_kpis(compute_var_es(
+        mid=res["timeseries"]["mid"], inventory=res["timeseries"]["inventory"],
+        horizons_seconds=[cfg.var_horizon_seconds, *cfg.risk_horizons_seconds],
+        dt_seconds=cfg.dt_seconds, levels=cfg.var_levels,
+    )))
+
+    online = OnlineKpis.from_config(cfg)
+    run_simulation_streaming(cfg, [online], chunk_size=333)
+    got = online.result()
+
+    assert got.keys() == exact.keys()
+    for key in ["final_pnl", "final_inventory", "n_trades", "adverse_selection_rate"]:
+        assert got[key] == exact[key]
+    for key in [k for k in exact if k.startswith(("var_", "es_"))]:
+        assert got[key] == pytest.approx(exact[key], rel=0.005, abs=1e-9)
@@ -0,0 +1,46 @@
+import numpy as np
+
+from mm_sandbox.price_process import iter_rw_paper_chunks, simulate_rw_paper
+
+
+def _rw(rng, **kw):
+    params = dict(s0=100.0, mu=0.0, sigma=2.0, dt=0.005, n_steps=500)
+    params.update(kw)
+    return simulate_rw_paper(rng=rng, **params)
+
+
+def test_vectorized_matches_legacy_loop_and_rng_consumption():
+    r_vec = np.random.default_rng(7)
+    r_old = np.random.default_rng(7)
+    vec = _rw(r_vec)
+    old = _rw(r_old, legacy_loop=True)
+    assert vec.shape == (500,)
+    assert np.array_equal(vec, old)
+    # Folge-Draws (z.B. Fill-Uniforms) bleiben identisch
+    assert r_vec.random() == r_old.random()
+
+
+
+def test_vectorized_matches_legacy_loop_exactly_with_drift():
+    for mu in (10.0, -10.0, 0.37):
+        drift_vec = _rw(np.random.default_rng(7), mu=mu, n_steps=20_000)
+        drift_old = _rw(np.random.default_rng(7), mu=mu, n_steps=20_000, legacy_loop=True)
+        assert np.array_equal(drift_vec, drift_old)
+
+        batch = _rw(np.random.default_rng(7), mu=mu, n_steps=300, n_paths=3)
+        assert np.array_equal(batch, _rw(np.random.default_rng(7), mu=mu, n_steps=300, n_paths=3, legacy_loop=True))
+
+        chunks = iter_rw_paper_chunks(
+            s0=100.0, mu=mu, sigma=2.0, dt=0.005, n_steps=20_000, rng=np.random.default_rng(7), chunk_size=777
+        )
+        assert np.array_equal(np.concatenate(list(chunks)), drift_old)
+
+
+def test_n_paths_shape_and_rows_follow_stream():
+    paths = _rw(np.random.default_rng(3), n_paths=4)
+    assert paths.shape == (4, 500)
+    assert np.all(paths[:, 0] == 100.0)
+
+    rng = np.random.default_rng(3)
+    rows = [_rw(rng) for _ in range(4)]
+    assert np.array_equal(paths, np.vstack(rows))
@@ -0,0 +1,42 @@
+import json
+from functools import partial
+
+import pandas as pd
+
+from mm_sandbox.profiling import profile_run
+from mm_sandbox.simulator import hot_path_timer, run_simulation
+
+from helpers import make_cfg
+
+
+_cfg = partial(make_cfg, seed=8)
+
+
+def test_hot_path_timer_sections_and_results_unchanged():
+    for engine in ("discrete", "event"):
+        plain = run_simulation(_cfg(engine=engine))
+        with hot_path_timer() as hot:
+            timed = run_simulation(_cfg(engine=engine))
+        pd.testing.assert_frame_equal(plain["timeseries"], timed["timeseries"])
+        assert hot.steps == 200
+        assert all(sec > 0 for sec in hot.seconds.values())
+
+    # Gamma-Sweep: Steps pro Zeile; außerhalb des with-Blocks wird nichts mehr gezählt
+    with hot_path_timer() as hot:
+        run_simulation(_cfg(), gammas=[0.01, 0.1, 1.0])
+    run_simulation(_cfg())
+    assert hot.steps == 600
+
+
+def test_profile_run_writes_per_mode(tmp_path):
+    expected = {"cprofile": "profile.pstats", "tracemalloc": "tracemalloc.txt", "lines": "profile_lines.txt"}
+    for mode, filename in expected.items():
+        with profile_run(mode, tmp_path / mode) as prof:
+            run_simulation(_cfg())
+        assert (tmp_path / mode / filename).exists()
+        hot = json.loads((tmp_path / mode / "hot_path.json").read_text(encoding="utf-8"))["hot_path"]
+        assert hot["steps"] == prof["hot_path"]["steps"] == 200
+
+    with profile_run(None, tmp_path / "off") as prof:
+        run_simulation(_cfg())
+    assert prof == {} and not (tmp_path / "off").exists()
@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+from mm_sandbox.recording import SIDE_BUY, SIDE_SELL, TRADE_DTYPE, PathLog, TradeLog
+
+
+def test_trade_log_grows_and_builds_columns():
+    log = TradeLog(capacity=2)
+    for t in range(5):
+        log.append(t, SIDE_BUY if t % 2 else SIDE_SELL, 100.0 + t, 1.0, 99.5 + t)
+
+    assert len(log) == 5 and log.array.dtype == TRADE_DTYPE and TRADE_DTYPE.itemsize == 32
+    cols = log.columns()
+    np.testing.assert_array_equal(cols["t"], np.arange(5))
+    assert cols["t"].dtype == np.int64
+    assert cols["side"].tolist() == ["sell", "buy", "sell", "buy", "sell"]
+    np.testing.assert_array_equal(cols["price"], 100.0 + np.arange(5))
+
+    frame = log.frame()
+    assert list(frame.columns) == ["t", "side", "price", "size", "mid"]
+    assert frame["side"].dtype == object
+
+    pd.testing.assert_frame_equal(TradeLog().frame(), pd.DataFrame())
+
+
+def test_path_log_grows_and_trims_columns():
+    log = PathLog(capacity=2)
+    for t in range(0, 50, 10):
+        log.append(t, 1.0 * t, 99.0, 101.0, 1.0, -t, 0.5 * t)
+
+    assert len(log) == 5
+    cols = log.columns()
+    assert list(cols) == ["t", *PathLog.PATH_COLUMNS]
+    assert cols["t"].dtype == np.int64 and all(a.size == 5 for a in cols.values())
+    np.testing.assert_array_equal(cols["t"], np.arange(0, 50, 10))
+    np.testing.assert_array_equal(cols["inventory"], -np.arange(0, 50, 10.0))
@@ -0,0 +1,49 @@
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mm_sandbox.metrics import compute_kpis, compute_var_es, kpi_timeseries, var_es_kpis
+from mm_sandbox.simulator import run_simulation
+
+from helpers import TREND, make_cfg
+
+
+_cfg = partial(make_cfg, **{**TREND, "seed": 11, "n_steps": 400, "T_seconds": 2.0})
+
+
+def _kpis(cfg, res) -> dict:
+    ts = kpi_timeseries(res)
+    kpis = compute_kpis(
+        timeseries=ts, trades=res["trades"], final_pnl=res["final_pnl"],
+        final_inventory=res["final_inventory"], horizon_steps=cfg.adverse_horizon_steps,
+    )
+    risk = compute_var_es(
+        mid=ts["mid"].to_numpy(dtype=float), inventory=ts["inventory"].to_numpy(dtype=float),
+        horizons_seconds=[cfg.var_horizon_seconds, 0.25], dt_seconds=cfg.dt_seconds,
+    )
+    return {**kpis, **var_es_kpis(risk)}
+
+
+@pytest.mark.parametrize("engine,gammas", [("discrete", None), ("discrete", [0.01, 0.1, 1.0]), ("event", None)])
+def test_recording_levels_keep_kpis(engine, gammas):
+    runs = {}
+    for level in ("full", "decimated", "kpi_only"):
+        cfg = _cfg(engine=engine, recording=level, record_every=50)
+        out = run_simulation(cfg, gammas=gammas) if gammas else [run_simulation(cfg)]
+        runs[level] = [(cfg, res) for res in out]
+
+    for (cfg, full), (_, dec), (_, kpi) in zip(runs["full"], runs["decimated"], runs["kpi_only"]):
+        assert len(full["trades"]) > 0
+        assert _kpis(cfg, dec) == _kpis(cfg, full) == _kpis(cfg, kpi)
+        pd.testing.assert_frame_equal(dec["trades"], full["trades"])
+
+        ts_full = full["timeseries"]
+        np.testing.assert_array_equal(kpi_timeseries(kpi)["inventory"], ts_full["inventory"].to_numpy())
+
+        rows = dec["timeseries"]["t"].to_numpy()
+        assert set(rows) == set(range(0, cfg.n_steps, 50)) | set(full["trades"]["t"]) | {cfg.n_steps - 1}
+        pd.testing.assert_frame_equal(dec["timeseries"].reset_index(drop=True), ts_full.iloc[rows].reset_index(drop=True))
+
+        assert kpi["timeseries"].empty and list(kpi["timeseries"].columns) == list(ts_full.columns)
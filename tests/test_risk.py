@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from mm_sandbox.metrics import compute_var_es, compute_var_inventory_horizon, var_es_kpis
+
+
+def test_var_es_table_matches_direct_definition():
+    rng = np.random.default_rng(4)
+    mid = 100.0 + np.cumsum(rng.normal(0.0, 0.1, (3, 400)), axis=1)
+    inv = rng.integers(-5, 6, (3, 400)).astype(float)
+
+    table = compute_var_es(mid=mid, inventory=inv, horizons_seconds=[0.05, 0.25], dt_seconds=0.005)
+    assert list(table["horizon_steps"]) == [10, 10, 50, 50]
+
+    for row in table.itertuples():
+        h = row.horizon_steps
+        shocks = (inv[:, :-h] * (mid[:, h:] - mid[:, :-h])).ravel()  # gepoolt, nie über Pfadgrenzen
+        alpha = 1.0 - row.level
+        k = int(np.ceil(alpha * shocks.size - 1e-9))
+        assert row.n_shocks == shocks.size
+        assert row.var == -np.quantile(shocks, alpha)
+        assert row.es == -np.sort(shocks)[:k].mean()
+        assert row.es >= row.var
+
+    kpis = var_es_kpis(table)
+    assert list(kpis)[:2] == ["var_95_inv_0.05s", "var_99_inv_0.05s"]
+    assert "es_99_inv_0.25s" in kpis
+
+
+def test_single_horizon_var_unchanged():
+    rng = np.random.default_rng(5)
+    ts = pd.DataFrame({"mid": 100.0 + np.cumsum(rng.normal(0.0, 0.1, 500)), "inventory": rng.integers(-5, 6, 500)})
+    h = 10
+    mid, inv = ts["mid"].to_numpy(), ts["inventory"].to_numpy(float)
+    shocks = inv[:-h] * (mid[h:] - mid[:-h])
+    out = compute_var_inventory_horizon(ts, horizon_seconds=0.05, dt_seconds=0.005)
+    assert out == {
+        "var_95_inv_0.05s": float(-np.quantile(shocks, 1 - 0.95)),
+        "var_99_inv_0.05s": float(-np.quantile(shocks, 1 - 0.99)),
+    }
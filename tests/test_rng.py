@@ -0,0 +1,57 @@
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+
+from mm_sandbox.io import write_config
+from mm_sandbox.rng import stream, stream_seed
+from mm_sandbox.simulator import run_simulation, run_simulation_batch, run_simulation_streaming
+from mm_sandbox.sinks import CsvSink
+
+from helpers import TREND, make_cfg
+
+
+_cfg = partial(make_cfg, **TREND, seed=5, gamma=0.05, rng_layout="streams")
+
+
+def test_streams_are_spawned_tree_with_skip_ahead():
+    root = np.random.SeedSequence(7)
+    spawned = root.spawn(3)[2].spawn(2)[1]
+    assert stream_seed(7, "fills", path=2).generate_state(4).tolist() == spawned.generate_state(4).tolist()
+
+    full = stream(7, "fills").random(100)
+    np.testing.assert_array_equal(stream(7, "fills", skip=60).random(40), full[60:])
+    assert not np.array_equal(stream(7, "price").random(100), full)
+
+
+def test_streams_layout_independent_of_batch_size_and_chunking(tmp_path):
+    cfg = _cfg()
+    res = run_simulation(cfg)
+
+    # Pfad p hängt nicht von n_paths ab; Pfad 0 = Einzel-Run
+    small, large = run_simulation_batch(cfg, n_paths=2), run_simulation_batch(cfg, n_paths=5)
+    np.testing.assert_array_equal(small["pnl"], large["pnl"][:2])
+    np.testing.assert_array_equal(large["pnl"][0], res["timeseries"]["pnl"].to_numpy())
+    assert not np.array_equal(large["mid"][0], large["mid"][1])
+
+    for chunk_size in (1, 37, 1000):
+        out = run_simulation_streaming(cfg, [CsvSink(tmp_path / str(chunk_size))], chunk_size=chunk_size)
+        assert out["final_pnl"] == res["final_pnl"]
+        ts = pd.read_csv(tmp_path / str(chunk_size) / "timeseries.csv")
+        np.testing.assert_allclose(ts["pnl"].to_numpy(), res["timeseries"]["pnl"].to_numpy(), rtol=0, atol=1e-9)
+
+    # anderes Layout -> andere Draws; Layout steht in config_used.yaml
+    assert run_simulation(_cfg(rng_layout="legacy"))["final_pnl"] != res["final_pnl"]
+    write_config(tmp_path / "cfg", cfg)
+    used = yaml.safe_load((tmp_path / "cfg" / "config_used.yaml").read_text(encoding="utf-8"))
+    assert used["rng_layout"] == "streams"
+    assert used["rng_streams"]["purposes"] == {"price": 0, "fills": 1}
+
+
+@pytest.mark.parametrize("engine", ["discrete", "event"])
+def test_streams_layout_deterministic(engine):
+    a = run_simulation(_cfg(engine=engine))
+    b = run_simulation(_cfg(engine=engine))
+    pd.testing.assert_frame_equal(a["timeseries"], b["timeseries"])
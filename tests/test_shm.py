@@ -0,0 +1,63 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mm_sandbox.metrics import kpi_timeseries
+from mm_sandbox.shm import SharedPaths, run_shared
+from mm_sandbox.simulator import run_simulation
+
+from helpers import TREND, make_cfg
+
+
+_cfg = partial(make_cfg, **TREND, seed=3)
+
+
+def _final_pnl(args):
+    handle, gamma = args
+    return run_shared(handle, _cfg(gamma=gamma))["final_pnl"]
+
+
+@pytest.mark.parametrize("rng_layout", ["legacy", "streams"])
+def test_shared_paths_match_run_simulation(rng_layout):
+    gammas = [0.01, 0.1, 1.0]
+    expected = [run_simulation(_cfg(gamma=g, rng_layout=rng_layout)) for g in gammas]
+
+    with SharedPaths(_cfg(rng_layout=rng_layout)) as shared:
+        single = run_shared(shared.handle, _cfg(gamma=0.1, rng_layout=rng_layout))
+        sweep = run_shared(shared.handle, _cfg(rng_layout=rng_layout), gammas=gammas)
+
+    pd.testing.assert_frame_equal(single["timeseries"], expected[1]["timeseries"])
+    for got, exp in zip(sweep, expected):
+        pd.testing.assert_frame_equal(got["timeseries"], exp["timeseries"])
+        assert got["final_pnl"] == exp["final_pnl"]
+
+
+def test_shared_paths_in_worker_processes():
+    gammas = [0.01, 0.1, 1.0]
+    with SharedPaths(_cfg()) as shared:
+        with ProcessPoolExecutor(max_workers=2) as ex:
+            got = list(ex.map(_final_pnl, [(shared.handle, g) for g in gammas]))
+    assert got == [run_simulation(_cfg(gamma=g))["final_pnl"] for g in gammas]
+
+    with pytest.raises(ValueError):
+        run_shared(shared.handle, _cfg(n_steps=299))
+    with pytest.raises(ValueError):
+        SharedPaths(_cfg(engine="event"))
+
+
+@pytest.mark.parametrize("recording", ["decimated", "kpi_only"])
+def test_shared_paths_results_outlive_block(recording):
+    cfg = _cfg(recording=recording)
+    with SharedPaths(cfg) as shared:
+        single = run_shared(shared.handle, cfg)
+        sweep = run_shared(shared.handle, cfg, gammas=[0.01, 1.0])
+
+    # Block ist geschlossen + entfernt; Ergebnisse dürfen nicht mehr darauf zeigen
+    expected = run_simulation(cfg)
+    for res in (single, *sweep):
+        assert res["mid"].base is None or res["mid"].flags.owndata
+        np.testing.assert_array_equal(res["mid"], expected["mid"])
+    pd.testing.assert_frame_equal(kpi_timeseries(single), kpi_timeseries(expected))
@@ -0,0 +1,69 @@
+import hashlib
+import sqlite3
+from functools import partial
+
+import pandas as pd
+
+from mm_sandbox.simulator import run_simulation
+from mm_sandbox.store import ExperimentStore
+
+from helpers import make_cfg
+
+
+_cfg = partial(make_cfg, seed=4)
+
+
+def test_store_roundtrip_and_partition_filter(tmp_path):
+    path = tmp_path / "exp.sqlite"
+    cfg = _cfg()
+    gammas = [0.01, 0.1]
+    with ExperimentStore(path) as store:
+        for scenario, sigma in [("calm", 2.0), ("turbulent", 10.0)]:
+            cfg_sc = cfg.model_copy(update={"sigma": sigma})
+            for g, res in zip(gammas, run_simulation(cfg_sc, gammas=gammas)):
+                store.put_run(scenario, g, cfg_sc.model_copy(update={"gamma": g}),
+                              res["timeseries"], res["trades"], {"final_pnl": res["final_pnl"]})
+        # gleicher Key ersetzt den Run
+        store.put_run("calm", 0.1, cfg, res["timeseries"], res["trades"], {"final_pnl": -1.0})
+
+    with ExperimentStore(path) as store:
+        assert store.scenarios() == ["calm", "turbulent"]
+        assert store.gammas("calm") == gammas
+        assert len(store.summary_table()) == 4
+        assert store.summary_table("calm")["final_pnl"].iloc[-1] == -1.0
+
+        runs = store.load_runs("turbulent", tables=["timeseries"], columns=["t", "inventory"])
+        assert [r["gamma"] for r in runs] == gammas
+        assert list(runs[1]["ts"].columns) == ["t", "inventory"]
+        assert "trades" not in runs[1]
+        assert runs[1]["config"]["sigma"] == 10.0
+
+        full = store.load_runs("turbulent")[1]
+        pd.testing.assert_frame_equal(full["ts"], res["timeseries"])
+        pd.testing.assert_frame_equal(full["trades"], res["trades"])
+
+
+def test_fingerprints_use_stored_hashes(tmp_path):
+    path = tmp_path / "exp.sqlite"
+    cfg = _cfg()
+    with ExperimentStore(path) as store:
+        for scenario in ("calm", "turbulent"):
+            res = run_simulation(cfg)
+            store.put_run(scenario, 0.1, cfg, res["timeseries"], res["trades"], {"final_pnl": res["final_pnl"]})
+        calm = store.fingerprints("calm")
+        assert calm.keys() == {("calm", 0.1)}
+        assert calm.items() <= store.fingerprints().items()
+
+    con = sqlite3.connect(path)
+    blob = con.execute("SELECT data FROM frames f JOIN runs r USING (run_id) WHERE scenario = 'calm' AND name = 'trades'").fetchone()[0]
+    assert calm[("calm", 0.1)]["trades"] == hashlib.sha256(blob).hexdigest()
+
+    # älterer Store ohne Hash: wird beim ersten Lesen nachgetragen
+    con.execute("UPDATE frames SET sha256 = NULL")
+    con.commit()
+    con.close()
+    with ExperimentStore(path) as store:
+        assert store.fingerprints("calm") == calm
+    # nur calm nachgetragen, turbulent-Blobs wurden nicht gelesen
+    with sqlite3.connect(path) as con:
+        assert con.execute("SELECT COUNT(*) FROM frames WHERE sha256 IS NULL").fetchone()[0] == 2
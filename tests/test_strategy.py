@@ -0,0 +1,51 @@
+import numpy as np
+
+from mm_sandbox.strategy import QuoteEngine, make_quote_as, make_quotes_as
+
+
+def test_array_quotes_match_scalar_function_exactly():
+    rng = np.random.default_rng(0)
+    n = 500
+    mid = 100.0 + rng.normal(0.0, 2.0, n)
+    inventory = rng.integers(-20, 21, n).astype(float)
+    gamma = rng.choice([0.001, 0.01, 0.1, 0.3], n)
+    # negative tau erzwingt den bid >= ask Fallback für einen Teil der Zustände
+    tau = rng.uniform(-50.0, 1.0, n)
+
+    q = make_quotes_as(mid=mid, sigma=2.0, inventory=inventory, gamma=gamma, k=1.5, tau_seconds=tau)
+
+    crossed = 0
+    for i in range(n):
+        qs, r, hs = make_quote_as(
+            mid=mid[i], sigma=2.0, inventory=inventory[i], gamma=gamma[i], k=1.5, tau_seconds=tau[i],
+        )
+        assert (q.bid[i], q.ask[i], q.r[i], q.half_spread[i]) == (qs.bid, qs.ask, r, hs)
+        crossed += hs == 1e-6
+    assert 0 < crossed < n
+
+
+def test_array_quotes_broadcast_scalar_gamma():
+    tau = np.linspace(1.0, 0.0, 201)
+    q = make_quotes_as(mid=100.0, sigma=2.0, inventory=3.0, gamma=0.1, k=1.5, tau_seconds=tau)
+    assert q.bid.shape == q.half_spread.shape == (201,)
+    assert np.all(q.bid < q.ask)
+
+
+def test_quote_engine_matches_scalar_function_exactly():
+    rng = np.random.default_rng(1)
+    engine = QuoteEngine(sigma=2.0, gamma=0.1, k=1.5)
+    # negative tau -> bid >= ask Fallback
+    for mid, inv, tau in zip(100.0 + rng.normal(0.0, 2.0, 300), rng.integers(-20, 21, 300) * 1.0, rng.uniform(-50.0, 1.0, 300)):
+        engine.quote(mid, inv, tau)
+        q, r, hs = make_quote_as(mid=mid, sigma=2.0, inventory=inv, gamma=0.1, k=1.5, tau_seconds=tau)
+        assert (engine.bid, engine.ask, engine.r, engine.half_spread) == (q.bid, q.ask, r, hs)
+
+    # tau-Tabelle ab Step t0 (z.B. ein Streaming-Block), Raster über T hinaus -> tau = 0
+    engine.set_params(sigma=1.5, gamma=0.3, k=2.0)
+    engine.set_tau_grid(T_seconds=1.0, dt_seconds=0.005, t0=150, n_steps=100)
+    for i in range(100):
+        tau = max(1.0 - (150 + i) * 0.005, 0.0)
+        engine.quote_step(100.0, 3.0, i)
+        q, r, hs = make_quote_as(mid=100.0, sigma=1.5, inventory=3.0, gamma=0.3, k=2.0, tau_seconds=tau)
+        assert (engine.bid, engine.ask, engine.r, engine.half_spread) == (q.bid, q.ask, r, hs)
+    assert not hasattr(engine, "__dict__")
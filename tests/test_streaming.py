@@ -0,0 +1,44 @@
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mm_sandbox.io import write_outputs
+from mm_sandbox.simulator import run_simulation, run_simulation_streaming
+from mm_sandbox.sinks import CsvSink, KpiSink, RingBufferSink
+
+from helpers import TREND, make_cfg
+
+
+_cfg = partial(make_cfg, **TREND, seed=5, gamma=0.05)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 37, 300, 1000])
+def test_streaming_matches_in_memory(tmp_path, chunk_size):
+    cfg = _cfg()
+    res = run_simulation(cfg)
+    write_outputs(tmp_path / "mem", cfg, res["timeseries"], res["trades"], {})
+
+    kpi = KpiSink()
+    ring = RingBufferSink(capacity=50)
+    out = run_simulation_streaming(cfg, [kpi, ring, CsvSink(tmp_path / "stream")], chunk_size=chunk_size)
+
+    assert out["final_pnl"] == res["final_pnl"]
+    assert out["final_inventory"] == res["final_inventory"]
+    assert kpi.result()["n_trades"] == len(res["trades"])
+    assert kpi.result()["n_steps"] == cfg.n_steps
+
+    for name in ["timeseries.csv", "trades.csv"]:
+        assert (tmp_path / "stream" / name).read_bytes() == (tmp_path / "mem" / name).read_bytes()
+
+    tail = res["timeseries"].tail(50).reset_index(drop=True)
+    pd.testing.assert_frame_equal(ring.timeseries(), tail)
+
+
+def test_ring_buffer_trades_keep_latest():
+    cfg = _cfg(sigma=10.0)
+    res = run_simulation(cfg)
+    ring = RingBufferSink(capacity=10, trade_capacity=3)
+    run_simulation_streaming(cfg, [ring], chunk_size=64)
+    np.testing.assert_array_equal(ring.trades()["t"].to_numpy(), res["trades"]["t"].tail(3).to_numpy())
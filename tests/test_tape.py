@@ -0,0 +1,69 @@
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mm_sandbox.simulator import run_simulation, run_simulation_batch, run_simulation_streaming, simulate_inputs
+from mm_sandbox.sinks import RingBufferSink
+from mm_sandbox.tape import MidTape
+
+from helpers import TREND, make_cfg
+
+
+_cfg = partial(make_cfg, **TREND, seed=4)
+
+
+def _write_tape(tmp_path, fmt: str, mids: np.ndarray):
+    if fmt == "npy":
+        path = tmp_path / "tape.npy"
+        np.save(path, mids)
+    elif fmt == "bin":
+        path = tmp_path / "tape.bin"
+        mids.astype("<f8").tofile(path)
+    elif fmt == "npz":
+        # ungleich lange Chunk-Dateien, Reihenfolge über den Dateinamen
+        path = tmp_path / "chunks"
+        path.mkdir()
+        for i, (a, b) in enumerate([(0, 50), (50, 51), (51, 250), (250, mids.size)]):
+            np.savez(path / f"part_{i:03d}.npz", mid=mids[a:b], t=np.arange(a, b))
+    else:
+        pytest.importorskip("pyarrow")
+        path = tmp_path / "tape.parquet"
+        pd.DataFrame({"t": np.arange(mids.size), "mid": mids}).to_parquet(path, row_group_size=64)
+    return path
+
+
+@pytest.mark.parametrize("fmt", ["npy", "bin", "npz", "parquet"])
+def test_replay_matches_synthetic_run(tmp_path, fmt):
+    cfg = _cfg()
+    mids, _ = simulate_inputs(cfg)
+    # Tape länger als n_steps: nur die ersten n_steps Ticks werden gespielt
+    path = _write_tape(tmp_path, fmt, np.concatenate([mids, mids[::-1]]))
+
+    tape = MidTape(path)
+    assert len(tape) == 2 * cfg.n_steps
+    chunks = list(tape.iter_chunks(37, stop=cfg.n_steps))
+    assert [c.size for c in chunks] == [37] * 8 + [4]
+    np.testing.assert_array_equal(np.concatenate(chunks), mids)
+
+    expected = run_simulation(cfg)
+    replay_cfg = _cfg(replay_path=str(path), s0=1.0, mu=0.0)
+    res = run_simulation(replay_cfg)
+    pd.testing.assert_frame_equal(res["timeseries"], expected["timeseries"])
+    pd.testing.assert_frame_equal(res["trades"], expected["trades"])
+
+    ring = RingBufferSink(capacity=cfg.n_steps)
+    out = run_simulation_streaming(replay_cfg, [ring], chunk_size=37)
+    assert out["final_pnl"] == expected["final_pnl"]
+    pd.testing.assert_frame_equal(ring.timeseries(), expected["timeseries"])
+
+
+def test_replay_rejects_short_tape_and_batches(tmp_path):
+    path = _write_tape(tmp_path, "npy", np.full(100, 100.0))
+    with pytest.raises(ValueError, match="100 ticks"):
+        run_simulation(_cfg(replay_path=str(path)))
+    with pytest.raises(ValueError):
+        run_simulation_batch(_cfg(replay_path=str(path), n_steps=100), n_paths=2)
+    with pytest.raises(ValueError):
+        MidTape(tmp_path / "tape.csv")
@@ -0,0 +1,51 @@
+import math
+from functools import partial
+
+import numpy as np
+import pytest
+
+from mm_sandbox.simulator import run_simulation, run_simulation_streaming
+from mm_sandbox.sinks import KpiSink
+from mm_sandbox.telemetry import PROFILE_COLUMNS, peak_rss_mb, reset_peak_rss, run_telemetry
+
+from helpers import make_cfg
+
+
+_cfg = partial(make_cfg, seed=8)
+
+
+def test_simulation_phase_timings():
+    for engine in ("discrete", "event"):
+        timings = {}
+        res = run_simulation(_cfg(engine=engine), timings=timings)
+        assert timings.keys() == {"price_s", "loop_s"}
+        assert all(v > 0 for v in timings.values())
+
+        tel = run_telemetry(n_steps=200, n_trades=len(res["trades"]), timings=timings, kpi_s=0.5, write_s=0.25)
+        assert list(tel) == PROFILE_COLUMNS
+        assert tel["total_s"] == timings["price_s"] + timings["loop_s"] + 0.75
+        assert tel["steps_per_sec"] == 200 / timings["loop_s"]
+
+    # Gamma-Sweep: Zeiten einmal gemessen, pro Run geteilt
+    timings = {}
+    run_simulation(_cfg(), gammas=[0.01, 0.1], timings=timings)
+    assert run_telemetry(n_steps=200, n_trades=0, timings=timings, batch_size=2)["loop_s"] == timings["loop_s"] / 2
+
+    timings = {}
+    run_simulation_streaming(_cfg(), [KpiSink()], chunk_size=64, timings=timings)
+    assert timings.keys() == {"price_s", "loop_s", "sink:KpiSink"}
+
+    hit = run_telemetry(n_steps=200, n_trades=10, timings={}, cache_hit=True)
+    assert math.isnan(hit["steps_per_sec"]) and hit["cache_hit"]
+
+
+def test_peak_rss_is_reset_per_job():
+    big = np.ones(50_000_000)  # ~400 MB
+    big_peak = peak_rss_mb()
+    del big
+    if not reset_peak_rss():
+        pytest.skip("peak RSS reset needs Linux /proc/self/clear_refs")
+
+    # nach dem Reset zählt der frühere große Block nicht mehr mit
+    assert peak_rss_mb() < big_peak - 300
+    assert run_telemetry(n_steps=200, n_trades=0, timings={})["peak_rss_scope"] == "job"